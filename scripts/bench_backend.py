@@ -0,0 +1,78 @@
+"""Compare per-update cost of local cache & rate backends.
+
+Usage: PYTHONPATH=src python scripts/bench_backend.py [updates] [redis_url]
+(Redis backend is measured only if url is passed & `redis` package is installed.)
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from aiogram.types import User
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater.caches import (
+	MemoryRateBackend,
+	RedisRateBackend,
+	SharedMemoryRateBackend,
+)
+
+if TYPE_CHECKING:
+	from typing import Any
+
+	from aiogram_middlewares.rater.caches import AsyncRateBackend
+
+UPDATES = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+REDIS_URL = sys.argv[2] if len(sys.argv) > 2 else None  # noqa: PLR2004
+USERS = 1000
+
+
+async def handler(event: Any, data: dict[str, Any]) -> None:
+	pass
+
+
+async def measure(name: str, backend: AsyncRateBackend | None = None) -> None:
+	middleware = RateMiddleware(
+		period_sec=60, after_handle_count=5,
+		cooldown_message=None, calmed_message=None,
+		backend=backend,
+	)
+	datas = [
+		{'event_from_user': User(id=user_id, is_bot=False, first_name='User'), 'bot': None}
+		for user_id in range(1, USERS + 1)
+	]
+
+	start = perf_counter()
+	for i in range(UPDATES):
+		await middleware(handler, None, datas[i % USERS])  # type: ignore
+	took = perf_counter() - start
+	print(f'{name:<26} {took / UPDATES * 1e6:8.2f} us/update')  # noqa: T201
+
+
+async def measure_batch(name: str, backend: AsyncRateBackend, size: int = 100) -> None:
+	keys = [i % USERS + 1 for i in range(size)]
+	start = perf_counter()
+	for _ in range(UPDATES // size):
+		await backend.hit_many(keys, 60, 5)
+	took = perf_counter() - start
+	print(f'{name:<26} {took / UPDATES * 1e6:8.2f} us/update')  # noqa: T201
+
+
+async def main() -> None:
+	print(f'Python {sys.version.split()[0]}, {UPDATES} updates by {USERS} users')  # noqa: T201
+	await measure('LazyMemoryCache')
+	await measure('MemoryRateBackend', MemoryRateBackend())
+	await measure_batch('MemoryRateBackend (x100)', MemoryRateBackend())
+	backend = SharedMemoryRateBackend()
+	await measure('SharedMemoryRateBackend', backend)
+	await backend.close()
+	if REDIS_URL:
+		backend = RedisRateBackend(REDIS_URL)
+		await measure('RedisRateBackend', backend)
+		await measure_batch('RedisRateBackend (x100)', backend)
+		await backend.close()
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
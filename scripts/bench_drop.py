@@ -0,0 +1,95 @@
+"""Measure throughput of dropped updates (flooders over the limit) per rater mode.
+
+Every user is over the limit after warm-up updates, so measured ones are dropped
+(throttle - by full `drop_newest` queue, GCRA - rejected). Outer path (what dispatcher
+calls) vs generic chain of rater stages.
+
+Usage: PYTHONPATH=src python scripts/bench_drop.py [updates]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from aiogram.types import User
+from aiogram_middlewares import RateMiddleware
+
+if TYPE_CHECKING:
+	from typing import Any, Awaitable, Callable
+
+UPDATES = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+USERS = 100
+LIMIT = 3
+REPEATS = 5
+
+MODES: dict[str, dict[str, Any]] = {
+	'antiflood': {'cooldown_message': None, 'calmed_message': None},
+	'antiflood notify': {},
+	'antiflood nodebounce': {'topping_up': False, 'cooldown_message': None, 'calmed_message': None},
+	'antiflood nodebounce notify': {'topping_up': False},
+	'sliding_log notify': {'algorithm': 'sliding_log'},
+	'throttle queue full': {
+		'throttling_mode': True, 'sem_period': 30, 'max_queue': 1,
+		'cooldown_message': None, 'calmed_message': None,
+	},
+	'throttle notify queue full': {'throttling_mode': True, 'sem_period': 30, 'max_queue': 1},
+	'throttle nodebounce notify': {
+		'throttling_mode': True, 'sem_period': 30, 'max_queue': 1, 'topping_up': False,
+	},
+	'gcra notify': {'throttling_mode': 'gcra', 'max_delay': 0},
+}
+
+
+class FakeBot:
+	id = 1  # noqa: A003  # Notices are queued by bot & chat
+
+	async def send_message(self: FakeBot, chat_id: int, text: str, **kwargs: Any) -> None:
+		pass
+
+
+async def handler(event: Any, data: dict[str, Any]) -> None:
+	pass
+
+
+async def measure(options: dict[str, Any], *, outer: bool) -> float:
+	bot = FakeBot()
+	datas = [
+		{'event_from_user': User(id=user_id, is_bot=False, first_name='User'), 'bot': bot}
+		for user_id in range(1, USERS + 1)
+	]
+	best = float('inf')
+	for _ in range(REPEATS):
+		middleware = RateMiddleware(period_sec=600, after_handle_count=LIMIT, **options)
+		call: Callable[..., Awaitable[Any]] = middleware if outer else middleware._call  # noqa: SLF001
+		# Reach the limit (throttle: fill the slots & the queue)
+		queued = []  # Referenced till they're cancelled
+		for data in datas:
+			for _ in range(LIMIT):
+				await call(handler, None, data)
+			if options.get('throttling_mode') is True:
+				queued.append(asyncio.ensure_future(call(handler, None, data)))
+		await asyncio.sleep(0)
+		start = perf_counter()
+		for i in range(UPDATES):
+			await call(handler, None, datas[i % USERS])
+		best = min(best, perf_counter() - start)
+		for task in asyncio.all_tasks() - {asyncio.current_task()}:
+			task.cancel()
+	return UPDATES / best
+
+
+async def main() -> None:
+	print(f'Python {sys.version.split()[0]}, {UPDATES} dropped updates by {USERS} users')  # noqa: T201
+	print(f'{"mode":<28} {"chain":>12} {"outer":>12}')  # noqa: T201
+	for name, options in MODES.items():
+		chain = await measure(options, outer=False)
+		outer = await measure(options, outer=True)
+		print(  # noqa: T201
+			f'{name:<28} {chain:12,.0f} {outer:12,.0f} updates/s x{outer / chain:.2f}',
+		)
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
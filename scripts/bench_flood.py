@@ -0,0 +1,79 @@
+"""Check memory of throttle queues under single user flood (unbounded vs `max_queue`).
+
+Every update is a task (like in polling/webhook dispatcher) holding its `data` dict.
+
+Usage: PYTHONPATH=src python scripts/bench_flood.py [updates per second] [seconds] [max_queue]
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from aiogram.types import User
+from aiogram_middlewares import RateMiddleware
+
+if TYPE_CHECKING:
+	from typing import Any
+
+RATE = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+SECONDS = int(sys.argv[2]) if len(sys.argv) > 2 else 5  # noqa: PLR2004
+MAX_QUEUE = int(sys.argv[3]) if len(sys.argv) > 3 else 100  # noqa: PLR2004
+TICK = 0.01
+USER = User(id=1, is_bot=False, first_name='Flooder')
+
+
+async def handler(event: Any, data: dict[str, Any]) -> None:
+	pass
+
+
+async def flood(name: str, **kwargs: Any) -> None:
+	middleware = RateMiddleware(
+		period_sec=10, after_handle_count=5, sem_period=1,
+		throttling_mode=True, cooldown_message=None, calmed_message=None,
+		**kwargs,
+	)
+	tasks: set[asyncio.Task] = set()
+	per_tick = int(RATE * TICK)
+
+	gc.collect()
+	tracemalloc.start()
+	base = tracemalloc.get_traced_memory()[0]
+	start = perf_counter()
+	row = []
+	for second in range(1, SECONDS + 1):
+		while perf_counter() - start < second:
+			for _ in range(per_tick):
+				# Payload is per update, like `Update` & handler data
+				data = {'event_from_user': USER, 'bot': None, 'payload': bytearray(256)}
+				task = asyncio.create_task(middleware(handler, None, data))  # type: ignore
+				tasks.add(task)
+				task.add_done_callback(tasks.discard)
+			await asyncio.sleep(TICK)
+		row.append(f'{(tracemalloc.get_traced_memory()[0] - base) / 2**20:7.1f}')
+	tracemalloc.stop()
+
+	gauges = middleware.queue_gauges()
+	print(  # noqa: T201
+		f'{name:<24} MiB by second: {" ".join(row)}'
+		f' | queued {gauges["queued"]}, dropped {gauges["dropped"]}, tasks {len(tasks)}',
+	)
+	for task in tasks:
+		task.cancel()
+	await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def main() -> None:
+	print(  # noqa: T201
+		f'Python {sys.version.split()[0]}, {RATE} updates/s by one user, {SECONDS} s',
+	)
+	await flood('unbounded')
+	for policy in ('drop_newest', 'drop_oldest', 'reject'):
+		await flood(f'{policy} ({MAX_QUEUE})', max_queue=MAX_QUEUE, queue_policy=policy)
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
@@ -0,0 +1,62 @@
+"""Measure CPU spent on idle throttled users (shared leak scheduler vs task per user).
+
+Every user takes one permit & stays cached (idle) for the rest of the run.
+"Task per user" reproduces the old leak loop (`asyncio.sleep` by delay while cached).
+
+Usage: PYTHONPATH=src python scripts/bench_leak.py [users] [seconds]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+from time import perf_counter, process_time
+
+from aiogram_middlewares.rater.extensions.throttling import LeakScheduler, ThrottleSemaphore
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+SECONDS = float(sys.argv[2]) if len(sys.argv) > 2 else 5  # noqa: PLR2004
+MAX_RATE = 5
+SEM_PERIOD = 1
+
+
+async def legacy_leak(sem: ThrottleSemaphore, delay: float) -> None:
+	while True:
+		await asyncio.sleep(delay)
+		if sem._value < MAX_RATE:  # noqa: SLF001
+			sem.release()
+
+
+async def idle_cpu(name: str, *, legacy: bool) -> None:
+	original = ThrottleSemaphore(MAX_RATE, SEM_PERIOD)
+	sems = [original.copy() for _ in range(USERS)]
+	tasks = []
+	for sem in sems:
+		if legacy:
+			sem._value -= 1  # noqa: SLF001
+			tasks.append(asyncio.create_task(legacy_leak(sem, SEM_PERIOD / MAX_RATE)))
+		else:
+			await sem.acquire()
+	await asyncio.sleep(SEM_PERIOD)  # Permits are leaked back, users are idle now
+
+	cpu, wall = process_time(), perf_counter()
+	await asyncio.sleep(SECONDS)
+	cpu, wall = process_time() - cpu, perf_counter() - wall
+	scheduled = len(LeakScheduler.of(asyncio.get_running_loop()))
+	print(  # noqa: T201
+		f'{name:<16} {cpu / wall * 100:6.1f} % CPU,'
+		f' {cpu / wall / USERS * 1e9:8.1f} ns CPU per idle user per second,'
+		f' {scheduled} scheduled leaks',
+	)
+	for task in tasks:
+		task.cancel()
+	await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def main() -> None:
+	print(f'Python {sys.version.split()[0]}, {USERS} idle users, {SECONDS} s')  # noqa: T201
+	await idle_cpu('Task per user', legacy=True)
+	await idle_cpu('LeakScheduler', legacy=False)
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Count cache lookups per update & time the trigger step of raters.
+
+Cache's item storage is replaced by a dict counting probes (`get`, `[]`, `in`),
+so lookups made by rater (trigger, debouncing, semaphore) are visible for the
+generic chain & the compiled pipeline. First update of every user creates its item.
+
+Usage: PYTHONPATH=src python scripts/bench_lookups.py [updates]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from aiogram.types import User
+from aiogram_middlewares import RateMiddleware
+
+if TYPE_CHECKING:
+	from typing import Any, Awaitable, Callable
+
+UPDATES = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+USERS = 1000
+LIMIT = 1_000_000
+
+MODES: dict[str, dict[str, Any]] = {
+	'antiflood': {},
+	'antiflood nodebounce': {'topping_up': False},
+	'throttle': {'throttling_mode': True, 'sem_period': 30},
+	'throttle nodebounce': {'throttling_mode': True, 'sem_period': 30, 'topping_up': False},
+	'gcra': {'throttling_mode': 'gcra'},
+}
+
+
+class CountingDict(dict):
+
+	probes = 0
+
+	def get(self: CountingDict, key: Any, default: Any = None) -> Any:
+		self.probes += 1
+		return super().get(key, default)
+
+
+	def __getitem__(self: CountingDict, key: Any) -> Any:
+		self.probes += 1
+		return super().__getitem__(key)
+
+
+	def __contains__(self: CountingDict, key: object) -> bool:
+		self.probes += 1
+		return super().__contains__(key)
+
+
+async def handler(event: Any, data: dict[str, Any]) -> None:
+	pass
+
+
+async def measure(options: dict[str, Any], *, compiled: bool) -> tuple[float, float]:
+	middleware = RateMiddleware(period_sec=60, after_handle_count=LIMIT, **options)
+	storage = CountingDict()
+	middleware._cache._cache = storage  # noqa: SLF001
+	call: Callable[..., Awaitable[Any]] = middleware if compiled else middleware._call  # noqa: SLF001
+	datas = [
+		{'event_from_user': User(id=user_id, is_bot=False, first_name='User'), 'bot': None}
+		for user_id in range(1, USERS + 1)
+	]
+	start = perf_counter()
+	for i in range(UPDATES):
+		await call(handler, None, datas[i % USERS])
+	took = perf_counter() - start
+	return storage.probes / UPDATES, took / UPDATES * 1e6
+
+
+async def main() -> None:
+	print(f'Python {sys.version.split()[0]}, {UPDATES} updates by {USERS} users')  # noqa: T201
+	print(f'{"mode":<22} {"chain":>20} {"compiled":>20}')  # noqa: T201
+	for name, options in MODES.items():
+		chain_probes, chain_us = await measure(options, compiled=False)
+		probes, us = await measure(options, compiled=True)
+		print(  # noqa: T201
+			f'{name:<22} {chain_probes:6.2f} probes {chain_us:5.2f} us'
+			f' {probes:6.2f} probes {us:5.2f} us',
+		)
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
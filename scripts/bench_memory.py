@@ -0,0 +1,48 @@
+"""Measure cache memory per tracked user (tracemalloc).
+
+Usage: PYTHONPATH=src python scripts/bench_memory.py [users]
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import sys
+import tracemalloc
+from functools import partial
+
+from aiogram_middlewares.rater.caches import LazyDeadlineCache, LazyMemoryCache, TimerWheel
+from aiogram_middlewares.rater.models import RateData
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+PERIOD = 60
+
+
+async def measure(name: str, factory: partial) -> float:
+	user_ids = list(range(10**9, 10**9 + USERS))  # Ids are owned by updates, not by cache
+	cache = factory(ttl=PERIOD)
+	gc.collect()
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+
+	for user_id in user_ids:
+		# Like `_trigger` + debouncing
+		cache.set(user_id, RateData(), ttl=PERIOD)
+		cache.expire(user_id, PERIOD)
+
+	gc.collect()
+	used = tracemalloc.get_traced_memory()[0] - before
+	tracemalloc.stop()
+	per_user = used / USERS
+	print(f'{name:<28} {per_user:8.1f} bytes/user')  # noqa: T201
+	return per_user
+
+
+async def main() -> None:
+	print(f'Python {sys.version.split()[0]}, {USERS} users')  # noqa: T201
+	await measure('LazyMemoryCache', partial(LazyMemoryCache))
+	await measure('LazyMemoryCache+TimerWheel', partial(LazyMemoryCache, timer_wheel=TimerWheel()))
+	await measure('LazyDeadlineCache', partial(LazyDeadlineCache))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
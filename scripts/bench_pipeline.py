@@ -0,0 +1,128 @@
+"""Compare flattened (compiled) middleware pipeline vs generic chain for option sets.
+
+Throttle & GCRA limits are high, so nobody waits (per-update overhead only), antiflood
+ones reach the limit & notify (through the fake bot). Best of `REPEATS` fresh raters.
+Serializing & backend raters are listed to show they fall back to the generic chain.
+
+Usage: PYTHONPATH=src python scripts/bench_pipeline.py [updates]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+from itertools import product
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from aiogram.types import User
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater.caches import MemoryRateBackend
+from aiogram_middlewares.utils import BrotliedPickleSerializer
+
+if TYPE_CHECKING:
+	from typing import Any, Awaitable, Callable
+
+UPDATES = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+USERS = 1000
+LIMIT = 5
+REPEATS = 3
+
+NOTIFY = {
+	'none': {'cooldown_message': None, 'calmed_message': None},
+	'cooldown': {'calmed_message': None},
+	'calmed': {'cooldown_message': None},
+	'both': {},
+}
+
+
+class FakeBot:
+	id = 1  # noqa: A003  # Notices are queued by bot & chat
+
+	async def send_message(self: FakeBot, chat_id: int, text: str, **kwargs: Any) -> None:
+		pass
+
+
+async def handler(event: Any, data: dict[str, Any]) -> None:
+	pass
+
+
+def combinations() -> list[tuple[str, dict[str, Any]]]:
+	combos: list[tuple[str, dict[str, Any]]] = []
+	for algorithm, topping_up, notify in product(
+		('fixed', 'sliding_window', 'sliding_log', 'multi_window'), (True, False), NOTIFY,
+	):
+		if algorithm != 'fixed' and not topping_up:
+			continue  # Always debounced
+		options: dict[str, Any] = {'topping_up': topping_up, **NOTIFY[notify]}
+		if algorithm == 'multi_window':
+			options['windows'] = ((1, LIMIT), (60, LIMIT * 10))
+		else:
+			options.update(period_sec=60, after_handle_count=LIMIT, algorithm=algorithm)
+		name = f'{algorithm}{"" if topping_up else " nodebounce"} {notify}'
+		combos.append((name, options))
+	combos.extend(
+		(
+			f'throttle{"" if topping_up else " nodebounce"} {notify}',
+			{
+				'period_sec': 60, 'after_handle_count': UPDATES, 'throttling_mode': True,
+				'sem_period': 30, 'topping_up': topping_up, **NOTIFY[notify],
+			},
+		)
+		for topping_up, notify in product((True, False), NOTIFY)
+	)
+	combos.extend(
+		(
+			f'gcra {notify}',
+			{
+				'period_sec': 60, 'after_handle_count': UPDATES, 'throttling_mode': 'gcra',
+				**NOTIFY[notify],
+			},
+		)
+		for notify in NOTIFY
+	)
+	combos.append((
+		'serializer',
+		{
+			'period_sec': 60, 'after_handle_count': LIMIT,
+			'data_serializer': BrotliedPickleSerializer,
+		},
+	))
+	combos.append((
+		'backend',
+		{'period_sec': 60, 'after_handle_count': LIMIT, 'backend': MemoryRateBackend()},
+	))
+	return combos
+
+
+async def measure(options: dict[str, Any], *, compiled: bool) -> float:
+	bot = FakeBot()
+	datas = [
+		{'event_from_user': User(id=user_id, is_bot=False, first_name='User'), 'bot': bot}
+		for user_id in range(1, USERS + 1)
+	]
+	best = float('inf')
+	for _ in range(REPEATS):
+		middleware = RateMiddleware(**options)
+		call: Callable[..., Awaitable[Any]] = middleware if compiled else middleware._call  # noqa: SLF001
+		start = perf_counter()
+		for i in range(UPDATES):
+			await call(handler, None, datas[i % USERS])
+		best = min(best, perf_counter() - start)
+	return best / UPDATES * 1e6
+
+
+async def main() -> None:
+	print(f'Python {sys.version.split()[0]}, {UPDATES} updates by {USERS} users')  # noqa: T201
+	print(f'{"options":<32} {"chain":>9} {"compiled":>9}')  # noqa: T201
+	for name, options in combinations():
+		chain = await measure(options, compiled=False)
+		middleware = RateMiddleware(**options)
+		if middleware._pipeline == middleware._call:  # noqa: SLF001
+			print(f'{name:<32} {chain:9.2f} {"(chain)":>9}')  # noqa: T201
+			continue
+		compiled = await measure(options, compiled=True)
+		print(f'{name:<32} {chain:9.2f} {compiled:9.2f} us/update x{chain / compiled:.2f}')  # noqa: T201
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
@@ -0,0 +1,103 @@
+"""Compare raw prefilter vs outer middleware path on webhook payloads under flood.
+
+Payloads are recorded-like group text messages (compact JSON as Telegram sends).
+"Middleware" parses every update (`Update.model_validate_json`) & feeds the outer
+middleware, "prefilter" drops limited users' updates before parsing.
+
+Usage: PYTHONPATH=src python scripts/bench_prefilter.py [updates] [flood share] [limit]
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import sys
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from aiogram.types import Update
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater.prefilter import RawPrefilter
+
+if TYPE_CHECKING:
+	from typing import Any
+
+UPDATES = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+FLOOD_SHARE = float(sys.argv[2]) if len(sys.argv) > 2 else 0.9  # noqa: PLR2004
+LIMIT = int(sys.argv[3]) if len(sys.argv) > 3 else 5  # noqa: PLR2004
+USERS = 500
+FLOODERS = 20
+
+
+def payload(update_id: int, user_id: int) -> bytes:
+	user = {
+		'id': user_id, 'is_bot': False, 'first_name': 'User', 'last_name': str(user_id),
+		'username': f'user{user_id}', 'language_code': 'en',
+	}
+	message = {
+		'message_id': update_id, 'from': user,
+		'chat': {'id': -1001234567890, 'title': 'Some group', 'type': 'supergroup'},
+		'date': 1697057916, 'text': f'/start hello from {user_id}',
+		'entities': [{'offset': 0, 'length': 6, 'type': 'bot_command'}],
+	}
+	return json.dumps(
+		{'update_id': update_id, 'message': message}, separators=(',', ':'),
+	).encode()
+
+
+def record() -> list[bytes]:
+	rnd = random.Random(1)
+	return [
+		payload(
+			i, rnd.randint(1, FLOODERS) if rnd.random() < FLOOD_SHARE
+			else rnd.randint(FLOODERS + 1, USERS),
+		)
+		for i in range(UPDATES)
+	]
+
+
+async def handler(event: Any, data: dict[str, Any]) -> None:
+	pass
+
+
+def make_middleware() -> RateMiddleware:
+	return RateMiddleware(
+		period_sec=60, after_handle_count=LIMIT, cooldown_message=None, calmed_message=None,
+	)
+
+
+async def feed(middleware: RateMiddleware, raw: bytes) -> None:
+	update = Update.model_validate_json(raw)
+	data = {'event_from_user': update.message.from_user, 'bot': None}  # type: ignore
+	await middleware(handler, update.message, data)  # type: ignore
+
+
+async def main() -> None:
+	payloads = record()
+	print(  # noqa: T201
+		f'Python {sys.version.split()[0]}, {UPDATES} updates,'
+		f' {FLOOD_SHARE:.0%} by {FLOODERS} flooders, limit {LIMIT}',
+	)
+
+	middleware = make_middleware()
+	start = perf_counter()
+	for raw in payloads:
+		await feed(middleware, raw)
+	took = perf_counter() - start
+	print(f'Middleware {took / UPDATES * 1e6:8.2f} us/update')  # noqa: T201
+
+	middleware = make_middleware()
+	prefilter = RawPrefilter(middleware)
+	start = perf_counter()
+	for raw in payloads:
+		if prefilter.check(raw):
+			await feed(middleware, raw)
+	took_pre = perf_counter() - start
+	print(  # noqa: T201
+		f'Prefilter  {took_pre / UPDATES * 1e6:8.2f} us/update'
+		f' ({prefilter.dropped} dropped unparsed, x{took / took_pre:.1f})',
+	)
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
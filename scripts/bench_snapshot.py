@@ -0,0 +1,51 @@
+"""Measure snapshot & restore time of the caches.
+
+Usage: PYTHONPATH=src python scripts/bench_snapshot.py [users] [path]
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+from functools import partial
+from time import perf_counter
+
+from aiogram_middlewares.rater.caches import LazyDeadlineCache, LazyMemoryCache, TimerWheel
+from aiogram_middlewares.rater.models import RateData
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+PATH = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), 'rater.snapshot')  # noqa: PLR2004,PTH118
+PERIOD = 600
+
+
+async def measure(name: str, factory: partial) -> None:
+	cache = factory(ttl=PERIOD)
+	for user_id in range(1, USERS + 1):
+		cache.set(user_id, RateData(rate=1), ttl=PERIOD - user_id % 60)
+
+	start = perf_counter()
+	cache.snapshot(PATH)
+	took_snapshot = perf_counter() - start
+	del cache
+
+	cache = factory(ttl=PERIOD)
+	start = perf_counter()
+	restored = len(cache.restore(PATH))
+	took_restore = perf_counter() - start
+	print(  # noqa: T201
+		f'{name:<28} snapshot {took_snapshot:6.3f} s, restore {took_restore:6.3f} s'
+		f' ({restored} items, {os.path.getsize(PATH) / 2**20:.1f} MiB)',  # noqa: PTH202
+	)
+
+
+async def main() -> None:
+	print(f'Python {sys.version.split()[0]}, {USERS} users')  # noqa: T201
+	await measure('LazyMemoryCache', partial(LazyMemoryCache))
+	await measure('LazyMemoryCache+TimerWheel', partial(LazyMemoryCache, timer_wheel=TimerWheel()))
+	await measure('LazyDeadlineCache', partial(LazyDeadlineCache))
+	os.remove(PATH)  # noqa: PTH107
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
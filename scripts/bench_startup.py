@@ -0,0 +1,48 @@
+"""Measure startup cost of building many raters (e.g. a `RateLimiter` per handler).
+
+Limiters are built with a few option sets in turn (like handlers with different limits),
+first build of each set assembles its class. Best of `REPEATS`.
+
+Usage: PYTHONPATH=src python scripts/bench_startup.py [limiters]
+"""
+from __future__ import annotations
+
+import sys
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from aiogram_middlewares import RateLimiter, RateMiddleware
+
+if TYPE_CHECKING:
+	from typing import Any, Callable
+
+LIMITERS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+REPEATS = 5
+
+OPTIONS: list[dict[str, Any]] = [
+	{'period_sec': 5, 'after_handle_count': 1},
+	{'period_sec': 10, 'after_handle_count': 3, 'cooldown_message': None},
+	{'period_sec': 60, 'after_handle_count': 20, 'algorithm': 'sliding_window'},
+	{'period_sec': 30, 'after_handle_count': 2, 'throttling_mode': True, 'sem_period': 5},
+]
+
+
+def measure(factory: Callable[..., Any]) -> float:
+	best = float('inf')
+	for _ in range(REPEATS):
+		start = perf_counter()
+		raters = [factory(**OPTIONS[i % len(OPTIONS)]) for i in range(LIMITERS)]
+		best = min(best, perf_counter() - start)
+		del raters
+	return best
+
+
+def main() -> None:
+	print(f'Python {sys.version.split()[0]}, {LIMITERS} raters of {len(OPTIONS)} option sets')  # noqa: T201
+	for name, factory in (('RateLimiter', RateLimiter), ('RateMiddleware', RateMiddleware)):
+		took = measure(factory)
+		print(f'{name:<16} {took * 1e3:8.2f} ms ({took / LIMITERS * 1e6:6.2f} us/rater)')  # noqa: T201
+
+
+if __name__ == '__main__':
+	main()
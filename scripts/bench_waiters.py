@@ -0,0 +1,60 @@
+"""Measure cost of queue operations with many waiters on one semaphore.
+
+`asyncio.Semaphore` has the same linear scans (`locked`, `remove`, wake up)
+as the old throttle semaphore, so it's the baseline.
+
+Usage: PYTHONPATH=src python scripts/bench_waiters.py [waiters]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+from time import perf_counter
+
+from aiogram_middlewares.rater.extensions.throttling import ThrottleSemaphore
+
+WAITERS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+
+async def measure(name: str, sem: asyncio.Semaphore, waiters: int) -> None:
+	await sem.acquire()  # Lock it, leak (if any) is far away
+
+	# Every acquire checks `locked()` & enqueues
+	start = perf_counter()
+	tasks = [asyncio.create_task(sem.acquire()) for _ in range(waiters)]
+	await asyncio.sleep(0)
+	enqueue = perf_counter() - start
+
+	# Cancel every second waiter
+	start = perf_counter()
+	for task in tasks[::2]:
+		task.cancel()
+	await asyncio.sleep(0)
+	cancel = perf_counter() - start
+
+	# Wake up the rest one by one
+	alive = tasks[1::2]
+	start = perf_counter()
+	for _ in alive:
+		sem.release()
+		await asyncio.sleep(0)
+	drain = perf_counter() - start
+	assert all(task.done() for task in tasks)
+
+	print(  # noqa: T201
+		f'{name:<20} {waiters:>7} waiters:'
+		f' enqueue {enqueue / waiters * 1e6:8.2f} us,'
+		f' cancel {cancel / len(tasks[::2]) * 1e6:8.2f} us,'
+		f' release {drain / len(alive) * 1e6:8.2f} us per op',
+	)
+
+
+async def main() -> None:
+	print(f'Python {sys.version.split()[0]}')  # noqa: T201
+	for waiters in (WAITERS // 10, WAITERS):
+		await measure('asyncio.Semaphore', asyncio.Semaphore(1), waiters)
+		await measure('ThrottleSemaphore', ThrottleSemaphore(1, 3600), waiters)
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
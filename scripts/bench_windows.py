@@ -0,0 +1,66 @@
+"""Compare per-update cost of stacked middlewares vs one `multi_window` rater.
+
+Usage: PYTHONPATH=src python scripts/bench_windows.py [updates]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+from functools import partial
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from aiogram.types import User
+from aiogram_middlewares import RateMiddleware
+
+if TYPE_CHECKING:
+	from typing import Any, Awaitable, Callable
+
+UPDATES = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+USERS = 1000
+WINDOWS = ((1, 3_000), (60, 20_000), (3600, 200_000), (86400, 1_000_000))  # Nobody is limited
+
+
+async def handler(event: Any, data: dict[str, Any]) -> None:
+	pass
+
+
+def stacked(windows: tuple[tuple[int, int], ...]) -> Callable[..., Awaitable[Any]]:
+	handle: Callable[..., Awaitable[Any]] = handler
+	for period, limit in windows:
+		middleware = RateMiddleware(
+			period_sec=period, after_handle_count=limit,
+			cooldown_message=None, calmed_message=None,
+		)
+		handle = partial(middleware, handle)
+	return handle
+
+
+def composite(windows: tuple[tuple[int, int], ...]) -> Callable[..., Awaitable[Any]]:
+	middleware = RateMiddleware(windows=windows, cooldown_message=None, calmed_message=None)
+	return partial(middleware, handler)
+
+
+async def measure(name: str, handle: Callable[..., Awaitable[Any]]) -> float:
+	datas = [
+		{'event_from_user': User(id=user_id, is_bot=False, first_name='User'), 'bot': None}
+		for user_id in range(1, USERS + 1)
+	]
+	start = perf_counter()
+	for i in range(UPDATES):
+		await handle(None, datas[i % USERS])
+	took = (perf_counter() - start) / UPDATES * 1e6
+	print(f'{name:<24} {took:8.2f} us/update')  # noqa: T201
+	return took
+
+
+async def main() -> None:
+	print(f'Python {sys.version.split()[0]}, {UPDATES} updates by {USERS} users')  # noqa: T201
+	for count in range(1, len(WINDOWS) + 1):
+		windows = WINDOWS[:count]
+		await measure(f'{count} stacked', stacked(windows))
+		await measure(f'{count} windows composite', composite(windows))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
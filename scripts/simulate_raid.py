@@ -0,0 +1,82 @@
+"""Simulate a raid: many users exceed the limit at once, notifications go through the notifier.
+
+Fake bot answers in 50 ms & raises `TelegramRetryAfter` above 30 messages per second,
+so the update path cost & the real send rate are visible.
+
+Usage: PYTHONPATH=src python scripts/simulate_raid.py [users]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+from collections import deque
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+from aiogram.types import User
+from aiogram_middlewares import RateMiddleware
+
+if TYPE_CHECKING:
+	from typing import Any
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+LATENCY = 0.05
+FLOOD_LIMIT = 30
+
+
+class FakeBot:
+	id = 1  # noqa: A003  # Notices are queued by bot & chat
+
+	def __init__(self: FakeBot) -> None:
+		self.sent: deque[float] = deque()
+		self.flood_errors = 0
+
+
+	async def send_message(self: FakeBot, chat_id: int, text: str) -> None:
+		await asyncio.sleep(LATENCY)
+		now = perf_counter()
+		sent = self.sent
+		while sent and sent[0] < now - 1:
+			sent.popleft()
+		if len(sent) >= FLOOD_LIMIT:
+			self.flood_errors += 1
+			method = SendMessage(chat_id=chat_id, text=text)
+			raise TelegramRetryAfter(method=method, message='Flood control exceeded', retry_after=1)
+		sent.append(now)
+
+
+async def handler(event: Any, data: dict[str, Any]) -> None:
+	pass
+
+
+async def main() -> None:
+	bot = FakeBot()
+	middleware = RateMiddleware(period_sec=3, after_handle_count=1, warnings_count=1)
+	datas = [
+		{'event_from_user': User(id=user_id, is_bot=False, first_name='User'), 'bot': bot}
+		for user_id in range(1, USERS + 1)
+	]
+
+	start = perf_counter()
+	for _ in range(3):  # Pass, cooldown, silent drop
+		for data in datas:
+			await middleware(handler, None, data)  # type: ignore
+	took = perf_counter() - start
+
+	notifier = middleware.get_notifier()
+	start = perf_counter()
+	await asyncio.sleep(middleware.period_sec)
+	await notifier.join()
+	drained = perf_counter() - start
+	stats = notifier.as_dict()
+	print(  # noqa: T201
+		f'{USERS} users, {USERS * 3} updates: {took / (USERS * 3) * 1e6:.1f} us per update\n'
+		f'notifications: {stats}, flood errors {bot.flood_errors}\n'
+		f'{stats["sent"] / drained:.1f} msg/s while draining ({drained:.1f} s)',
+	)
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
@@ -1 +1,4 @@
 from .rater import *  # noqa: F403
+from .utils import lazy_module_getattr as _lazy_getattr
+
+__getattr__ = _lazy_getattr(__name__, {'RawPrefilter': '.rater.prefilter'})
@@ -1,3 +1,8 @@
+from aiogram_middlewares.utils import lazy_module_getattr as _lazy_getattr
+
 from .filters import RateLimiter  # noqa: F401
 from .middlewares import RateMiddleware  # noqa: F401
 from .models import RateData  # noqa: F401
+from .notifier import NotifyScheduler  # noqa: F401
+
+__getattr__ = _lazy_getattr(__name__, {'RawPrefilter': '.prefilter'})
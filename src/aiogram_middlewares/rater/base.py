@@ -7,11 +7,12 @@ from inspect import signature as inspect_signature
 from typing import TYPE_CHECKING
 
 from .caches import LazyMemoryCache, LazyMemoryCacheSerializable
-from .models import RateData
+from .models import RateData, RateVerdict
+from .notifier import NotifyScheduler
 
 if TYPE_CHECKING:
 	from asyncio import AbstractEventLoop
-	from typing import Any, Callable, TypeVar
+	from typing import Any, Callable, Sequence, TypeVar
 
 	from aiogram import Bot
 	from aiogram.types import Update, User
@@ -19,12 +20,17 @@ if TYPE_CHECKING:
 
 	from utils import BaseSerializer
 
+	from .caches import CacheItem
+	from .caches.snapshot import PathType
+	from .caches.stats import CacheStats
+	from .scopes import ScopeLimits
 	from .types import (
 		_RD,
+		CacheFactory,
 		HandleData,
 		HandleType,
-		_BaseThrottleMethod,
 		_ProcHandleMethod,
+		_SyncTriggerMethod,
 		_ThrottleMiddlewareMethod,
 	)
 
@@ -37,6 +43,7 @@ logger = logging.getLogger(__name__)
 
 class RaterAttrsABC(ABC):
 	_cache: LazyMemoryCache
+	get_notifier: Callable[[], NotifyScheduler]
 	period_sec: PositiveInt
 	after_handle_count: PositiveInt
 
@@ -46,13 +53,18 @@ class RaterAttrsABC(ABC):
 
 
 	##
-	_trigger: _BaseThrottleMethod
+	_trigger_sync: _SyncTriggerMethod
+	decide: Callable[[RateData, User, Bot], RateVerdict]
 	proc_handle: _ProcHandleMethod
 
 	# For serializer
 	_middleware: _ThrottleMiddlewareMethod
 	choose_cache: Callable[[_TI], RaterBase]
-	_make_cache: Callable[[int, BaseSerializer], LazyMemoryCache]
+	_make_cache: Callable[[int, BaseSerializer, CacheFactory], LazyMemoryCache]
+
+	# For calmed notice
+	_calmed_in: Callable[[RateData], float | None]
+	_after_calmed: Callable[[int, CacheItem], None]
 
 
 # FIXME: Hints.. Annotations clses..
@@ -60,11 +72,9 @@ class RaterABC(RaterAttrsABC):
 
 	@abstractmethod
 	async def trigger(
-		self: RaterABC, rate_data: _RD | None,
-		event_user: User, ttl: int, bot: Bot,
+		self: RaterABC, event_user: User, ttl: int, bot: Bot,
 	) -> RateData | _RD:
 		raise NotImplementedError
-		return rate_data or RateData()
 
 
 	@abstractmethod
@@ -83,6 +93,9 @@ class RaterABC(RaterAttrsABC):
 class RaterBase(RaterABC):
 
 	_cache: LazyMemoryCache = None  # type: ignore
+	_is_debounced = False  # Set by debouncing extension
+	scopes: ScopeLimits | None = None  # Chat & global limits over the user's one
+	is_compiled = True  # Flattened hot path, if the rater has one (set by `compiled` option)
 
 	def __init__(
 		self: RaterBase,
@@ -92,6 +105,8 @@ class RaterBase(RaterABC):
 		is_cache_unity: bool,  # Because will trigger twice with filters cache.
 
 		loop: AbstractEventLoop | None = None,
+		cache_factory: CacheFactory | None = None,
+		notifier: NotifyScheduler | None = None,
 	) -> None:
 		# TODO: More docstrings!!!
 		# TODO: Cache autocleaner schedule (if during work had network glitch or etc.)
@@ -113,12 +128,15 @@ class RaterBase(RaterABC):
 		self.after_handle_count = after_handle_count
 
 		# FIXME: Mb move to cache choose part.. 
-		self._cache: LazyMemoryCache = self._make_cache(period_sec, data_serializer)
+		self._cache: LazyMemoryCache = self._make_cache(period_sec, data_serializer, cache_factory)
 
 		# For unity cache for all instances
 		#
 		self.__is_cache_unity = is_cache_unity
+		self._is_serializing = data_serializer is not None
 		self._loop = loop##
+		# Default one is shared by the loop (bound on the first notification)
+		self.notifier = notifier
 		self.choose_cache(RaterBase)
 
 
@@ -161,16 +179,31 @@ class RaterBase(RaterABC):
 		return self._signature
 
 
+	def get_notifier(self: RaterBase) -> NotifyScheduler:
+		"""Return outbound notifications queue (call from the loop where bot lives)."""
+		if self.notifier is None:
+			self.notifier = NotifyScheduler.of(asyncio.get_running_loop())
+		return self.notifier
+
+
 	##
 	def _make_cache(
 		self: RaterBase, period_sec: int, data_serializer: BaseSerializer | None = None,
+		cache_factory: CacheFactory | None = None,
 	) -> LazyMemoryCache:
+		# For custom expiry engines, e.g. `partial(LazyMemoryCache, timer_wheel=TimerWheel())`,
+		# serializer is passed only if it's set, so factory must accept it then
+		# like `LazyMemoryCacheSerializable` does
+		if cache_factory is not None:
+			if data_serializer:
+				return cache_factory(ttl=period_sec, data_serializer=data_serializer())
+			return cache_factory(ttl=period_sec)
 		if data_serializer:
 			return LazyMemoryCacheSerializable(
 				ttl=period_sec,  # FIXME: Arg name..
 				# WARNING: If you use disk storage and program will fail,
 				# some items could be still store in memory!
-				data_serializer=data_serializer(),  # TODO: ... & move serializers to different place..
+				data_serializer=data_serializer(),  # TODO: ... & move serializers elsewhere..
 			)
 		return LazyMemoryCache(
 			ttl=period_sec,
@@ -198,40 +231,136 @@ class RaterBase(RaterABC):
 		return self
 
 
+	@property
+	def stats(self: RaterBase) -> CacheStats | None:
+		"""Stats of the rater's cache (shared by raters with unity cache)."""
+		return self._cache.stats
+
+
+	def _compile(self: RaterBase) -> None:
+		"""Build flattened hot path (options are set), front raters override it."""
+
+
+	def enable_stats(self: RaterBase, *, lateness: bool = False) -> CacheStats:
+		return self._cache.enable_stats(lateness=lateness)
+
+
+	def disable_stats(self: RaterBase) -> None:
+		self._cache.disable_stats()
+
+
+	def snapshot(self: RaterBase, path: PathType) -> int:
+		"""Dump users rate data with remaining ttl into the file (e.g. on shutdown)."""
+		return self._cache.snapshot(path)
+
+
+	def restore(self: RaterBase, path: PathType) -> int:
+		"""Load users rate data from `snapshot` file (in running loop, e.g. on startup)."""
+		return len(self._cache.restore(path))
+
+
 	async def trigger(
-		self: RaterBase, rate_data: _RD | None,
-		event_user: User, ttl: int, bot: Bot,
+		self: RaterBase, event_user: User, ttl: int, bot: Bot,  # noqa: ARG002
 	) -> RateData | _RD:
-		return await self._trigger(rate_data, event_user, ttl, bot)
+		"""Async step for raters with out of process state, local ones are synchronous."""
+		return self.trigger_sync(event_user, ttl)
+
+
+	def trigger_sync(self: RaterBase, event_user: User, ttl: int) -> RateData | _RD:
+		return self._trigger_sync(event_user, ttl)
 
 
 	# TODO: Move to another object to avoid duplicating..
-	async def _trigger(
-		self: RaterBase, rate_data: _RD | None,
-		event_user: User, ttl: int, bot: Bot,  # noqa: ARG002
+	def _trigger_sync(
+		self: RaterBase, event_user: User, ttl: int, *,
+		touch: bool = False,
 	) -> RateData | _RD:
-		"""Run at first trigger to create entity, else returns data (usually counters)."""
-		if rate_data or self._cache.has_key(event_user.id):
-			assert rate_data is not None  # plug for linter
-			return rate_data
+		"""Return user's data (usually counters), create entity at first trigger.
 
-		logger.debug(
-			'[%s] Trigger user (begin): %s',
-			self.__class__.__name__, event_user.username,
+		One cache lookup (`touch` resets ttl of existing item, for debouncing).
+		"""
+		# TODO: Clean cache on exceptions.. (to avoid mutes..)
+		cache = self._cache
+		return cache.value_of(
+			cache.get_or_create(event_user.id, self._make_rate_data, ttl, touch=touch),
 		)
 
-		rate_data = RateData()
-		# TODO: Mb make custom variant for that..
-		# TODO: Clean cache on exceptions.. (to avoid mutes..)
-		# Add new item to cache with ttl from initializator.
-		# (`Cache.add` does the same, but with checking in cache..)
-		self._cache.set(
-			event_user.id, rate_data,
-			ttl=ttl,
+
+	def _make_rate_data(self: RaterBase) -> RateData:
+		"""Return new user's counters (fixed window), rate algorithms override it."""
+		return RateData()
+
+
+	def _calmed_in(self: RaterBase, rate_data: RateData) -> float | None:  # noqa: ARG002
+		"""Seconds till exceeded user is allowed again, None - calmed when the record expires."""
+		return None
+
+
+	def _after_calmed(self: RaterBase, key: int, item: CacheItem) -> None:  # noqa: ARG002
+		"""Forget the user's record on calmed notice."""
+		self._cache.delete(key)
+
+
+	def _set_new_many(self: RaterBase, user_ids: list[int], found: dict[int, RateData]) -> None:
+		self._cache.set_many(
+			[(user_id, found[user_id]) for user_id in user_ids], ttl=self.period_sec,
 		)
 
-		assert rate_data is not None  # plug for linter
-		return rate_data
+
+	async def _trigger_many(self: RaterBase, event_users: Sequence[User]) -> list[RateData]:
+		"""Trigger users of the batch in one pass, return rate data per update.
+
+		One cache lookup for all users, new users are set & others are debounced
+		by batch (one timer scheduling for each).
+		"""
+		cache = self._cache
+		user_ids = list(dict.fromkeys(user.id for user in event_users))
+		found: dict[int, RateData] = dict(zip(user_ids, cache.get_many(user_ids)))
+		new_ids = [user_id for user_id, rate_data in found.items() if rate_data is None]
+		if self._is_debounced and len(new_ids) != len(user_ids):
+			cache.expire_many(
+				[user_id for user_id, rate_data in found.items() if rate_data is not None],
+				self.period_sec,
+			)
+		if new_ids:
+			make_rate_data = self._make_rate_data
+			for user_id in new_ids:
+				found[user_id] = make_rate_data()
+			self._set_new_many(new_ids, found)
+		return [found[user.id] for user in event_users]
+
+
+	def _classify(self: RaterBase, rate_data: RateData) -> RateVerdict:
+		if self.after_handle_count > rate_data.rate:
+			rate_data.rate += 1
+			return RateVerdict.PASS
+		return RateVerdict.DROP
+
+
+	def _store_many(self: RaterBase, event_users: Sequence[User], datas: list[RateData]) -> None:
+		if not self._is_serializing:
+			return
+		# Values in cache are copies
+		for user_id, rate_data in dict(zip((user.id for user in event_users), datas)).items():
+			self._cache.uppress(user_id, rate_data)
+
+
+	async def classify_many(
+		self: RaterBase, event_users: Sequence[User],
+	) -> list[RateVerdict]:
+		"""Count batch of updates (e.g. from `get_updates`) in one pass, return verdict per update.
+
+		Passed updates are counted as handled, notifications aren't sent.
+		"""
+		datas = await self._trigger_many(event_users)
+		lock_of = self._cache.lock_of
+		classify = self._classify
+		verdicts = []
+		for event_user, rate_data in zip(event_users, datas):
+			with lock_of(event_user.id):
+				verdicts.append(classify(rate_data))
+		self._store_many(event_users, datas)
+		return verdicts
 
 
 	async def proc_handle(
@@ -241,7 +370,13 @@ class RaterBase(RaterABC):
 		event: Update, event_user: User, data: HandleData,
 	) -> Any:
 		"""Process handle's update."""
-		rate_data.rate += 1
+		scopes = self.scopes
+		if scopes is not None:
+			chat = data.get('event_chat')
+			if not scopes.admit(event_user.id, None if chat is None else chat.id):
+				return None
+		with self._cache.lock_of(event_user.id):
+			rate_data.rate += 1
 		# TODO: Mb log handle's name..
 		logger.debug(
 			'[%s] Handle user (proc): %s',
@@ -263,6 +398,18 @@ class RaterBase(RaterABC):
 		return await self._middleware(handle, event, event_user, data, bot, rate_data)
 
 
+	def decide(
+		self: RaterBase, rate_data: RateData, event_user: User, bot: Bot,  # noqa: ARG002
+	) -> RateVerdict:
+		"""Return verdict for the update (synchronous, extensions notify here).
+
+		Passed update is counted by `proc_handle` (after chat & global scopes).
+		"""
+		if self.after_handle_count > rate_data.rate:
+			return RateVerdict.PASS
+		return RateVerdict.DROP
+
+
 	async def _middleware(
 		self: RaterBase,
 		handle: HandleType,
@@ -273,15 +420,9 @@ class RaterBase(RaterABC):
 		rate_data: RateData,
 	) -> Any | None:
 		"""Main middleware."""
-		# TODO: Mb one more variant(s) for debug..
-
-		# TODO: Data types variants..
-		is_not_exceed_rate = self.after_handle_count > rate_data.rate
-
 		# proc/pass update action (run times from `after_handle_amount`)
-		if is_not_exceed_rate:
+		if self.decide(rate_data, event_user, bot) is RateVerdict.PASS:
 			# count up rate & proc
-			# FIXME: Rename..
 			return await self.proc_handle(
 				handle, rate_data, event, event_user,
 				data,
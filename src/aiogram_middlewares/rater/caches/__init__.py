@@ -1 +1,70 @@
-from .lazy_ttl import CacheItem, LazyMemoryCache, LazyMemoryCacheSerializable  # noqa: F401
+from __future__ import annotations
+
+from aiogram_middlewares.utils import lazy_module_getattr
+
+from .lazy_ttl import (
+	CacheItem,
+	CacheKeyError,
+	ExpiryKind,
+	LazyMemoryCache,
+	LazyMemoryCacheSerializable,
+)
+
+# Other expiry variants, bounds, stats & backends are imported on first access
+_MODULES: dict[str, str] = {
+	'AsyncRateBackend': '.backend',
+	'HitVerdict': '.backend',
+	'MemoryRateBackend': '.backend',
+	'RateHit': '.backend',
+	'BoundedCacheMixin': '.bounded',
+	'BoundedLazyDeadlineCache': '.bounded',
+	'BoundedLazyMemoryCache': '.bounded',
+	'EvictionPolicy': '.bounded',
+	'LFUPolicy': '.bounded',
+	'LRUPolicy': '.bounded',
+	'SoonestExpiryPolicy': '.bounded',
+	'DeadlineItem': '.lazy_deadline',
+	'LazyDeadlineCache': '.lazy_deadline',
+	'LazyDeadlineCacheSerializable': '.lazy_deadline',
+	'RedisRateBackend': '.redis_backend',
+	'ShardedLazyCache': '.sharded',
+	'ThreadSafeShardMixin': '.sharded',
+	'SharedMemoryRateBackend': '.shm_backend',
+	'CacheStats': '.stats',
+	'LatencyHistogram': '.stats',
+	'TimerWheel': '.timer_wheel',
+	'WheelTimer': '.timer_wheel',
+}
+
+__getattr__ = lazy_module_getattr(__name__, _MODULES)
+
+# Star import gets all (imports optional parts)
+__all__ = [
+	'CacheItem',
+	'CacheKeyError',
+	'ExpiryKind',
+	'LazyMemoryCache',
+	'LazyMemoryCacheSerializable',
+	'AsyncRateBackend',
+	'HitVerdict',
+	'MemoryRateBackend',
+	'RateHit',
+	'BoundedCacheMixin',
+	'BoundedLazyDeadlineCache',
+	'BoundedLazyMemoryCache',
+	'EvictionPolicy',
+	'LFUPolicy',
+	'LRUPolicy',
+	'SoonestExpiryPolicy',
+	'DeadlineItem',
+	'LazyDeadlineCache',
+	'LazyDeadlineCacheSerializable',
+	'RedisRateBackend',
+	'ShardedLazyCache',
+	'ThreadSafeShardMixin',
+	'SharedMemoryRateBackend',
+	'CacheStats',
+	'LatencyHistogram',
+	'TimerWheel',
+	'WheelTimer',
+]
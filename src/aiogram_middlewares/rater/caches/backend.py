@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from enum import IntEnum
+from typing import TYPE_CHECKING
+
+from aiogram_middlewares.rater.models import RateData
+from aiogram_middlewares.utils import make_dataclass
+
+from .lazy_deadline import LazyDeadlineCache
+
+if TYPE_CHECKING:
+	from dataclasses import dataclass as make_dataclass
+	from typing import Sequence
+
+	from aiogram_middlewares.rater.types import ttl_type
+
+	from .lazy_ttl import key_obj
+
+
+logger = logging.getLogger(__name__)
+
+
+class HitVerdict(IntEnum):
+	"""Decision made by the backend for one update."""
+
+	PASS = 0  # Rate counted up, handle it
+	WARN = 1  # Rate exceeded, warnings counted up (send cooldown message)
+	DROP = 2  # Rate & warnings exceeded
+
+
+@make_dataclass
+class RateHit(RateData):
+	"""Counters as they were before the hit (so rater's middlewares work as with local cache)."""
+
+	verdict: HitVerdict = HitVerdict.PASS
+	remaining: float = 0  # Seconds left to the key expiry (after the hit)
+
+
+class AsyncRateBackend(ABC):
+	"""Rate state storage out of rater's process (shared by all workers).
+
+	One `hit` is atomic: create key if missing, count up rate or warnings
+	& optionally reset the key's ttl (debouncing) in a single round trip.
+	"""
+
+	@abstractmethod
+	async def hit(
+		self: AsyncRateBackend, key: key_obj, ttl: ttl_type,
+		limit: int, warnings_limit: int = 0, *, debounce: bool = True,
+	) -> RateHit:
+		raise NotImplementedError
+
+
+	async def hit_many(
+		self: AsyncRateBackend, keys: Sequence[key_obj], ttl: ttl_type,
+		limit: int, warnings_limit: int = 0, *, debounce: bool = True,
+	) -> list[RateHit]:
+		"""Hit several keys (backends should pipeline it)."""
+		return [
+			await self.hit(key, ttl, limit, warnings_limit, debounce=debounce)
+			for key in keys
+		]
+
+
+	@abstractmethod
+	async def get(self: AsyncRateBackend, key: key_obj) -> RateData | None:
+		raise NotImplementedError
+
+
+	@abstractmethod
+	async def delete(self: AsyncRateBackend, key: key_obj) -> bool:
+		raise NotImplementedError
+
+
+	async def close(self: AsyncRateBackend) -> None:  # noqa: B027
+		"""Release connections."""
+
+
+class MemoryRateBackend(AsyncRateBackend):
+	"""In-process backend (same semantics as remote ones, for tests & single worker)."""
+
+	def __init__(self: MemoryRateBackend, **cache_kwargs: ttl_type) -> None:
+		# Ttl is always passed explicitly
+		self._cache = LazyDeadlineCache(ttl=1, **cache_kwargs)  # type: ignore
+
+
+	def _hit(
+		self: MemoryRateBackend, key: key_obj, ttl: ttl_type,
+		limit: int, warnings_limit: int, *, debounce: bool,
+	) -> RateHit:
+		cache = self._cache
+		rate_data: RateData | None = cache.get(key)
+		if rate_data is None:
+			rate_data = RateData()
+			cache.set(key, rate_data, ttl=ttl)
+		elif debounce:
+			cache.expire(key, ttl)
+
+		hit = RateHit(rate=rate_data.rate, sent_warning_count=rate_data.sent_warning_count)
+		if rate_data.rate < limit:
+			rate_data.rate += 1
+		elif rate_data.sent_warning_count < warnings_limit:
+			rate_data.sent_warning_count += 1
+			hit.verdict = HitVerdict.WARN
+		else:
+			hit.verdict = HitVerdict.DROP
+		hit.remaining = cache.remaining_of(key)
+		return hit
+
+
+	async def hit(
+		self: MemoryRateBackend, key: key_obj, ttl: ttl_type,
+		limit: int, warnings_limit: int = 0, *, debounce: bool = True,
+	) -> RateHit:
+		return self._hit(key, ttl, limit, warnings_limit, debounce=debounce)
+
+
+	async def hit_many(
+		self: MemoryRateBackend, keys: Sequence[key_obj], ttl: ttl_type,
+		limit: int, warnings_limit: int = 0, *, debounce: bool = True,
+	) -> list[RateHit]:
+		return [self._hit(key, ttl, limit, warnings_limit, debounce=debounce) for key in keys]
+
+
+	async def get(self: MemoryRateBackend, key: key_obj) -> RateData | None:
+		return self._cache.get(key)
+
+
+	async def delete(self: MemoryRateBackend, key: key_obj) -> bool:
+		return self._cache.delete(key)
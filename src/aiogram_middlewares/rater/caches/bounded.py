@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import logging
+import sys
+from abc import ABC, abstractmethod
+from heapq import heapify, heappop, heappush
+from itertools import count
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from .lazy_deadline import LazyDeadlineCache
+from .lazy_ttl import LazyMemoryCache
+
+if TYPE_CHECKING:
+	from typing import Any, Callable, Iterable, Literal
+
+	from aiogram_middlewares.rater.types import ttl_type
+
+	from .lazy_ttl import CacheItem, key_obj, true
+	from .snapshot import Entry
+
+	EvictCallback = Callable[[key_obj, CacheItem], Any]
+	PolicyName = Literal['lru', 'lfu', 'soonest']
+
+
+logger = logging.getLogger(__name__)
+
+
+class EvictionPolicy(ABC):
+	"""Keys order for eviction from bounded cache (all operations must be ~O(1))."""
+
+	@abstractmethod
+	def add(self: EvictionPolicy, key: key_obj, deadline: float) -> None:
+		raise NotImplementedError
+
+
+	def touch(self: EvictionPolicy, key: key_obj) -> None:  # noqa: B027
+		"""Key was read."""
+
+
+	def update(self: EvictionPolicy, key: key_obj, deadline: float) -> None:  # noqa: B027
+		"""Key expiry was moved."""
+
+
+	@abstractmethod
+	def discard(self: EvictionPolicy, key: key_obj) -> None:
+		raise NotImplementedError
+
+
+	@abstractmethod
+	def victim(self: EvictionPolicy) -> key_obj:
+		"""Return key to evict (policy must not be empty)."""
+		raise NotImplementedError
+
+
+class LRUPolicy(EvictionPolicy):
+	"""Least recently used (by dict insertion order)."""
+
+	def __init__(self: LRUPolicy) -> None:
+		self._order: dict[key_obj, None] = {}
+
+
+	def add(self: LRUPolicy, key: key_obj, deadline: float) -> None:  # noqa: ARG002
+		self._order.pop(key, None)
+		self._order[key] = None
+
+
+	def touch(self: LRUPolicy, key: key_obj) -> None:
+		order = self._order
+		if order.pop(key, 0) is None:
+			order[key] = None
+
+
+	def discard(self: LRUPolicy, key: key_obj) -> None:
+		self._order.pop(key, None)
+
+
+	def victim(self: LRUPolicy) -> key_obj:
+		return next(iter(self._order))
+
+
+class LFUPolicy(EvictionPolicy):
+	"""Least frequently used (O(1) frequency buckets, LRU inside a bucket)."""
+
+	def __init__(self: LFUPolicy) -> None:
+		self._freqs: dict[key_obj, int] = {}
+		self._buckets: dict[int, dict[key_obj, None]] = {}
+		self._min_freq = 1
+
+
+	def _bucket_add(self: LFUPolicy, key: key_obj, freq: int) -> None:
+		bucket = self._buckets.get(freq)
+		if bucket is None:
+			bucket = self._buckets[freq] = {}
+		bucket[key] = None
+
+
+	def _bucket_discard(self: LFUPolicy, key: key_obj, freq: int) -> None:
+		bucket = self._buckets[freq]
+		del bucket[key]
+		if not bucket:
+			del self._buckets[freq]
+
+
+	def add(self: LFUPolicy, key: key_obj, deadline: float) -> None:  # noqa: ARG002
+		self.discard(key)
+		self._freqs[key] = 1
+		self._bucket_add(key, 1)
+		self._min_freq = 1
+
+
+	def touch(self: LFUPolicy, key: key_obj) -> None:
+		freq = self._freqs.get(key)
+		if freq is None:
+			return
+		self._bucket_discard(key, freq)
+		self._freqs[key] = freq + 1
+		self._bucket_add(key, freq + 1)
+
+
+	def discard(self: LFUPolicy, key: key_obj) -> None:
+		freq = self._freqs.pop(key, None)
+		if freq is not None:
+			self._bucket_discard(key, freq)
+
+
+	def victim(self: LFUPolicy) -> key_obj:
+		if self._min_freq not in self._buckets:
+			# Distinct frequencies are few, so it's cheap
+			self._min_freq = min(self._buckets)
+		return next(iter(self._buckets[self._min_freq]))
+
+
+class SoonestExpiryPolicy(EvictionPolicy):
+	"""Evict key which expires first anyway (heap with lazy invalidation)."""
+
+	def __init__(self: SoonestExpiryPolicy) -> None:
+		self._deadlines: dict[key_obj, float] = {}
+		self._heap: list[tuple[float, int, key_obj]] = []
+		self._seq = count()
+
+
+	def add(self: SoonestExpiryPolicy, key: key_obj, deadline: float) -> None:
+		self._deadlines[key] = deadline
+		heappush(self._heap, (deadline, next(self._seq), key))
+		self._compact()
+
+
+	def update(self: SoonestExpiryPolicy, key: key_obj, deadline: float) -> None:
+		if key in self._deadlines:
+			self.add(key, deadline)
+
+
+	def discard(self: SoonestExpiryPolicy, key: key_obj) -> None:
+		self._deadlines.pop(key, None)
+
+
+	def _compact(self: SoonestExpiryPolicy) -> None:
+		# Stale entries (moved/removed keys) must not grow the heap forever
+		if len(self._heap) > 2 * len(self._deadlines) + 1024:
+			seq = self._seq
+			self._heap = [(d, next(seq), k) for k, d in self._deadlines.items()]
+			heapify(self._heap)
+
+
+	def victim(self: SoonestExpiryPolicy) -> key_obj:
+		heap = self._heap
+		deadlines = self._deadlines
+		while True:
+			deadline, _, key = heap[0]
+			if deadlines.get(key) == deadline:
+				return key
+			heappop(heap)
+
+
+_POLICIES: dict[str, type[EvictionPolicy]] = {
+	'lru': LRUPolicy,
+	'lfu': LFUPolicy,
+	'soonest': SoonestExpiryPolicy,
+}
+
+
+class BoundedCacheMixin:
+	"""Capacity bound for lazy caches (use it before cache class in bases).
+
+	When new key doesn't fit into `max_items` or (approximate) `max_bytes`,
+	victim from eviction `policy` is removed with its timer cancelled
+	& `on_evict(key, item)` called (e.g. to finish throttle semaphore).
+	Items are sized as stored (encoded by serializable caches), size is kept per key.
+	"""
+
+	# Approximate cost of the item, dict entry & timer without value (see `scripts/bench_memory.py`)
+	ENTRY_OVERHEAD = 256
+
+	_cache: dict[Any, Any]
+
+	def __init__(
+		self: BoundedCacheMixin, *args: Any,
+		max_items: int | None = None, max_bytes: int | None = None,
+		policy: PolicyName | EvictionPolicy = 'lru',
+		on_evict: EvictCallback | None = None,
+		**kwargs: Any,
+	) -> None:
+		if max_items is None and max_bytes is None:
+			msg = 'Expected `max_items` or/and `max_bytes` for bounded cache'
+			raise ValueError(msg)
+		if (max_items is not None and max_items < 1) or (max_bytes is not None and max_bytes < 1):
+			msg = f'Limits must be positive, `{max_items=}`, `{max_bytes=}`'
+			raise ValueError(msg)
+
+		super().__init__(*args, **kwargs)  # type: ignore
+		self.max_items = max_items
+		self.max_bytes = max_bytes
+		if isinstance(policy, str):
+			try:
+				policy = _POLICIES[policy]()
+			except KeyError:
+				msg = f'Unknown eviction policy `{policy}`, expected one of {tuple(_POLICIES)}'
+				raise ValueError(msg) from None
+		self._policy: EvictionPolicy = policy
+		self.on_evict = on_evict
+
+		self.evictions = 0
+		self._bytes = 0
+		self._sizes: dict[key_obj, int] = {}
+
+
+	@property
+	def used_bytes(self: BoundedCacheMixin) -> int:
+		"""Approximate memory used by the items."""
+		return self._bytes
+
+
+	def _size_of(self: BoundedCacheMixin, value: Any) -> int:
+		return self.ENTRY_OVERHEAD + sys.getsizeof(value)
+
+
+	def _is_over(self: BoundedCacheMixin) -> bool:
+		if self.max_items is not None and len(self._cache) > self.max_items:
+			return True
+		return self.max_bytes is not None and self._bytes > self.max_bytes
+
+
+	def _resize(self: BoundedCacheMixin, key: key_obj, item: CacheItem) -> None:
+		size = self._size_of(item.value)
+		self._bytes += size - self._sizes.get(key, 0)
+		self._sizes[key] = size
+
+
+	def _evict(self: BoundedCacheMixin) -> None:
+		key = self._policy.victim()
+		item = self._cache[key]
+		# Expiry action is skipped (it's not expiry), timer just stops
+		self.cancel_handle(key)  # type: ignore
+		self.delete(key)
+		self.evictions += 1
+		if self.on_evict is not None:
+			try:
+				self.on_evict(key, item)
+			except Exception:
+				logger.exception('Error on evict callback of key `%s`', key)
+
+
+	def set(
+		self: BoundedCacheMixin,
+		key: key_obj, value: Any, obj: object = None,
+		ttl: ttl_type = 10,
+	) -> true:
+		if key in self._cache:
+			self.cancel_handle(key)  # type: ignore
+			self.delete(key)
+		super().set(key, value, obj, ttl)  # type: ignore
+		self._resize(key, self._cache[key])
+		# New key isn't in the policy yet, so it's never the victim
+		while len(self._cache) > 1 and self._is_over():
+			self._evict()
+		self._policy.add(key, monotonic() + ttl)
+		return True
+
+
+	def update(
+		self: BoundedCacheMixin, key: key_obj, value: Any,
+	) -> true:
+		super().update(key, value)  # type: ignore
+		self._resize(key, self._cache[key])
+		return True
+
+
+	def delete(self: BoundedCacheMixin, key: key_obj) -> bool:
+		size = self._sizes.pop(key, None)
+		if size is not None:
+			self._bytes -= size
+			self._policy.discard(key)
+		return super().delete(key)  # type: ignore
+
+
+	def update_item(
+		self: BoundedCacheMixin, key: key_obj, item: CacheItem, value: Any,
+	) -> None:
+		super().update_item(key, item, value)  # type: ignore
+		self._resize(key, item)
+
+
+	def _expire_item(
+		self: BoundedCacheMixin, key: key_obj, item: CacheItem, ttl: ttl_type,
+	) -> None:
+		# Both `expire` & touching `get_or_create`
+		super()._expire_item(key, item, ttl)  # type: ignore
+		self._policy.update(key, monotonic() + ttl)
+
+
+	def _restore_items(self: BoundedCacheMixin, entries: Iterable[Entry]) -> list[key_obj]:
+		# One by one to keep the bounds
+		return [
+			key for key, value, obj, remaining in entries
+			if self.set(key, value, obj, ttl=remaining)
+		]
+
+
+	def set_many(
+		self: BoundedCacheMixin, items: Iterable[tuple[key_obj, Any]],
+		ttl: ttl_type = 10, objs: Iterable[object] | None = None,
+	) -> int:
+		# One by one to keep the bounds
+		if objs is None:
+			return sum(self.set(key, value, None, ttl) for key, value in items)
+		return sum(self.set(key, value, obj, ttl) for (key, value), obj in zip(items, objs))
+
+
+	def expire_many(self: BoundedCacheMixin, keys: Iterable[key_obj], ttl: ttl_type) -> int:
+		keys = list(keys)
+		count = super().expire_many(keys, ttl)  # type: ignore
+		deadline = monotonic() + ttl
+		update = self._policy.update
+		for key in keys:
+			update(key, deadline)
+		return count
+
+
+	def delete_many(self: BoundedCacheMixin, keys: Iterable[key_obj]) -> int:
+		cache = self._cache
+		return sum(self.delete(key) for key in keys if key in cache)
+
+
+	def get_many(
+		self: BoundedCacheMixin, keys: Iterable[key_obj], default: Any = None,
+	) -> list[Any]:
+		keys = list(keys)
+		values = super().get_many(keys, default)  # type: ignore
+		touch = self._policy.touch
+		for key in keys:
+			touch(key)
+		return values
+
+
+	def get_item(self: BoundedCacheMixin, key: key_obj, default: Any = None) -> Any | None:
+		item = super().get_item(key, default)  # type: ignore
+		self._policy.touch(key)
+		return item
+
+
+	def get(self: BoundedCacheMixin, key: key_obj, default: Any = None) -> Any | None:
+		value = super().get(key, default)  # type: ignore
+		self._policy.touch(key)
+		return value
+
+
+	def get_or_create(
+		self: BoundedCacheMixin, key: key_obj, factory: Callable[[], Any], ttl: ttl_type, *,
+		touch: bool = False,
+		obj_factory: Callable[[], object] | None = None,
+		callback: Callable[[key_obj, CacheItem], Any] | None = None,
+	) -> CacheItem:
+		item = super().get_or_create(  # type: ignore
+			key, factory, ttl, touch=touch, obj_factory=obj_factory, callback=callback,
+		)
+		self._policy.touch(key)
+		return item
+
+
+	def get_obj(self: BoundedCacheMixin, key: key_obj, default: Any = None) -> Any | None:
+		obj = super().get_obj(key, default)  # type: ignore
+		self._policy.touch(key)
+		return obj
+
+
+class BoundedLazyMemoryCache(BoundedCacheMixin, LazyMemoryCache):
+	"""Lazy cache with event loop timers & capacity bound."""
+
+
+class BoundedLazyDeadlineCache(BoundedCacheMixin, LazyDeadlineCache):
+	"""Timer-free lazy cache with capacity bound."""
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from heapq import heappop, heappush
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from aiogram_middlewares.utils import make_dataclass
+
+from .lazy_ttl import ExpiryKind, LazyMemoryCache, LazyMemoryCacheSerializable
+
+if TYPE_CHECKING:
+	from asyncio import AbstractEventLoop, Handle
+	from dataclasses import dataclass as make_dataclass
+	from typing import Any, Callable, Iterable, Iterator
+
+	from aiogram_middlewares.rater.types import ttl_type
+
+	from .lazy_ttl import key_obj, true
+	from .snapshot import Entry
+
+
+logger = logging.getLogger(__name__)
+
+
+_NEVER = float('inf')
+
+
+@make_dataclass
+class DeadlineItem:
+	"""Dataclass for absolute expiry time with value data."""
+
+	deadline: float  # `time.monotonic` (same as default loop's clock)
+	kind: ExpiryKind = ExpiryKind.DELETE  # Runs on expiry (by read or by sweeper)
+	arg: Any = None
+
+	value: Any = None  # Serializable data
+	obj: object = None  # Not serializable field
+
+
+class LazyDeadlineCache(LazyMemoryCache):
+	"""Timer-free variant of the lazy cache.
+
+	Items keep only absolute deadline: expired keys are treated as missing on read
+	and single background sweeper purges the rest by `sweep_slice` keys per loop iteration.
+	Keys are bucketed by deadline (`sweep_interval` wide), sweeper visits only past buckets,
+	moved deadlines are re-bucketed then (not on every touch).
+	Expiry callbacks (like calmed notifications) are fired by the read or the sweeper,
+	so they can be late up to `sweep_interval` seconds if user is gone.
+	"""
+
+	def __init__(
+		self: LazyDeadlineCache, ttl: ttl_type,
+		loop: AbstractEventLoop | None = None,
+		sweep_interval: ttl_type = 1,
+		sweep_slice: int = 1000,
+	) -> None:
+		if sweep_interval <= 0:
+			msg = f'`sweep_interval` must be positive, `{sweep_interval=}`'
+			raise ValueError(msg)
+		if sweep_slice < 1:
+			msg = f'`sweep_slice` must be positive, `{sweep_slice=}`'
+			raise ValueError(msg)
+
+		super().__init__(ttl=ttl, loop=loop)
+		self._cache: dict[Any, DeadlineItem] = {}  # type: ignore
+
+		self._sweep_interval = sweep_interval
+		self._sweep_slice = sweep_slice
+		self._sweeper: Handle | None = None
+		# Keys by deadline bucket number, stale ones are skipped by sweeper
+		self._buckets: dict[int, list[Any]] = {}
+		self._bucket_heap: list[int] = []
+		self._sweep_due: list[Any] = []  # Keys of popped buckets left to the next slice
+
+
+	def _stats_gauges(self: LazyDeadlineCache) -> tuple[int, int]:
+		# The only timer is the sweeper
+		return len(self._cache), int(self._sweeper is not None)
+
+
+	def _ensure_sweeper(self: LazyDeadlineCache) -> None:
+		if self._sweeper is not None:
+			return
+		if self._loop is None:
+			self._loop = asyncio.get_running_loop()
+		self._sweeper = self._loop.call_later(self._sweep_interval, self._sweep)
+
+
+	def _track(self: LazyDeadlineCache, key: key_obj, deadline: float) -> None:
+		"""Put key into the bucket of its deadline."""
+		if deadline == _NEVER:
+			return
+		bucket = int(deadline // self._sweep_interval)
+		keys = self._buckets.get(bucket)
+		if keys is None:
+			keys = self._buckets[bucket] = []
+			heappush(self._bucket_heap, bucket)
+		keys.append(key)
+
+
+	def _sweep(self: LazyDeadlineCache) -> None:
+		"""Purge one slice of expired keys from past buckets & reschedule itself."""
+		assert self._loop  # plug for linter
+		self._sweeper = None
+		cache = self._cache
+		buckets, heap = self._buckets, self._bucket_heap
+		now = monotonic()
+		# Keys of the current bucket aren't expired yet
+		current = int(now // self._sweep_interval)
+		due = self._sweep_due
+		budget = self._sweep_slice
+		moved: dict[Any, float] = {}
+		while budget > 0:
+			if not due:
+				if not heap or heap[0] >= current:
+					break
+				due = buckets.pop(heappop(heap))
+			chunk = due[-budget:]
+			del due[-budget:]
+			budget -= len(chunk)
+			for key in chunk:
+				item = cache.get(key)
+				if item is not None and item.deadline <= now:
+					self._fire(key, item)
+					item = cache.get(key)
+				if item is not None:
+					# Prolonged by touch or callback
+					moved[key] = item.deadline
+		self._sweep_due = due
+		for key, deadline in moved.items():
+			self._track(key, deadline)
+
+		if due or (heap and heap[0] < current):
+			# Give the loop a breath between slices
+			self._sweeper = self._loop.call_soon(self._sweep)
+		elif cache:
+			# Right after the current bucket is over
+			delay = (current + 1) * self._sweep_interval - now
+			self._sweeper = self._loop.call_later(delay, self._sweep)
+		else:
+			buckets.clear()
+			heap.clear()
+
+
+	def _fire(self: LazyDeadlineCache, key: key_obj, item: DeadlineItem) -> None:
+		"""Run item's expiry action (default is delete)."""
+		try:
+			self._run_expiry(key, item)  # type: ignore
+		except Exception:
+			logger.exception('Error on expiry callback of key `%s`', key)
+		# Callback neither removed nor prolonged the item - drop it
+		if self._cache.get(key) is item and item.deadline <= monotonic():
+			self.delete(key)
+
+
+	def _alive_item(self: LazyDeadlineCache, key: key_obj) -> DeadlineItem | None:
+		item = self._cache.get(key)
+		if item is None or item.deadline > monotonic():
+			return item
+		self._fire(key, item)
+		# Could be prolonged by callback
+		return self._cache.get(key)
+
+
+	def set(
+		self: LazyDeadlineCache,
+		key: key_obj, value: Any, obj: object = None,
+		ttl: ttl_type = 10,
+	) -> true:
+		# Not fires old item callback!
+		deadline = monotonic() + ttl
+		old = self._cache.get(key)
+		self._cache[key] = DeadlineItem(
+			deadline=deadline,
+			value=value, obj=obj,
+		)
+		# Key of the replaced item is already in the bucket of earlier deadline
+		if old is None or deadline < old.deadline:
+			self._track(key, deadline)
+		if self._sweeper is None:
+			self._ensure_sweeper()
+		return True
+
+
+	def has_key(self: LazyDeadlineCache, key: key_obj) -> bool:
+		"""Check if the cache has such a key (& it's not expired)."""
+		return self._alive_item(key) is not None
+
+
+	def get_item(self: LazyDeadlineCache, key: key_obj, default: Any = None) -> Any | None:
+		item = self._alive_item(key)
+		return default if item is None else item
+
+
+	def get(self: LazyDeadlineCache, key: key_obj, default: Any = None) -> Any | None:
+		item = self._alive_item(key)
+		if item is None:
+			return default
+		return item.value or default
+
+
+	def get_obj(self: LazyDeadlineCache, key: key_obj, default: Any = None) -> Any | None:
+		item = self._alive_item(key)
+		if item is None:
+			return default
+		return item.obj or default
+
+
+	def items(self: LazyDeadlineCache) -> Iterator[tuple[key_obj, DeadlineItem]]:
+		"""Iterate over keys & not expired items (expired ones are left to the sweeper)."""
+		now = monotonic()
+		return ((key, item) for key, item in self._cache.items() if item.deadline > now)
+
+
+	def get_or_create(
+		self: LazyDeadlineCache, key: key_obj, factory: Callable[[], Any], ttl: ttl_type, *,
+		touch: bool = False,
+		obj_factory: Callable[[], object] | None = None,
+		callback: Callable[[key_obj, DeadlineItem], Any] | None = None,
+	) -> DeadlineItem:
+		item = self._alive_item(key)
+		if item is None:
+			return self._create_item(key, factory, ttl, obj_factory, callback)  # type: ignore
+		if touch:
+			self._expire_item(key, item, ttl)
+		return item
+
+
+	def delete(self: LazyDeadlineCache, key: key_obj) -> bool:
+		# Tolerant, item could be already purged by read/sweeper
+		return self._cache.pop(key, None) is not None
+
+
+	def expire(
+		self: LazyDeadlineCache,
+		key: key_obj,
+		ttl: ttl_type,
+	) -> true:
+		"""Use if you sure item still in cache (just moves the deadline)."""
+		self._expire_item(key, self._cache[key], ttl)
+		return True
+
+
+	def _expire_item(  # type: ignore
+		self: LazyDeadlineCache, key: key_obj, item: DeadlineItem, ttl: ttl_type,
+	) -> None:
+		deadline = monotonic() + ttl
+		# Later one is re-bucketed by sweeper
+		if deadline < item.deadline:
+			self._track(key, deadline)
+		item.deadline = deadline
+
+
+	def get_many(
+		self: LazyDeadlineCache, keys: Iterable[key_obj], default: Any = None,
+	) -> list[Any]:
+		cache = self._cache
+		now = monotonic()
+		values: list[Any] = []
+		for key in keys:
+			item = cache.get(key)
+			if item is not None and item.deadline <= now:
+				item = self._alive_item(key)
+			values.append(default if item is None else item.value or default)
+		return values
+
+
+	def set_many(
+		self: LazyDeadlineCache, items: Iterable[tuple[key_obj, Any]],
+		ttl: ttl_type = 10, objs: Iterable[object] | None = None,
+	) -> int:
+		cache = self._cache
+		encode = self._encode_value
+		track = self._track
+		deadline = monotonic() + ttl
+		count = 0
+		if objs is None:
+			for key, value in items:
+				cache[key] = DeadlineItem(deadline=deadline, value=encode(value))
+				track(key, deadline)
+				count += 1
+		else:
+			for (key, value), obj in zip(items, objs):
+				cache[key] = DeadlineItem(deadline=deadline, value=encode(value), obj=obj)
+				track(key, deadline)
+				count += 1
+		if self._sweeper is None and cache:
+			self._ensure_sweeper()
+		return count
+
+
+	def expire_many(self: LazyDeadlineCache, keys: Iterable[key_obj], ttl: ttl_type) -> int:
+		cache = self._cache
+		deadline = monotonic() + ttl
+		count = 0
+		for key in keys:
+			item = cache.get(key)
+			if item is not None:
+				if deadline < item.deadline:
+					self._track(key, deadline)
+				item.deadline = deadline
+				count += 1
+		return count
+
+
+	def remaining_of(self: LazyDeadlineCache, key: key_obj) -> float:
+		"""Return seconds left to the key expiry."""
+		return self._get_item_strict(key).deadline - monotonic()
+
+
+	def cancel_handle(
+		self: LazyDeadlineCache, key: key_obj,
+	) -> DeadlineItem:
+		item = self._get_item_strict(key)
+		item.deadline = _NEVER
+		return item
+
+
+	def _remaining_of_item(  # type: ignore
+		self: LazyDeadlineCache, item: DeadlineItem, now: float,
+	) -> float | None:
+		return None if item.deadline == _NEVER else item.deadline - now
+
+
+	def _restore_items(self: LazyDeadlineCache, entries: Iterable[Entry]) -> list[key_obj]:
+		now = monotonic()
+		encode = self._encode_value
+		cache = self._cache
+		keys: list[key_obj] = []
+		for key, value, obj, remaining in entries:
+			cache[key] = DeadlineItem(deadline=now + remaining, value=encode(value), obj=obj)
+			self._track(key, now + remaining)
+			keys.append(key)
+		if cache and self._sweeper is None:
+			self._ensure_sweeper()
+		return keys
+
+
+class LazyDeadlineCacheSerializable(LazyMemoryCacheSerializable, LazyDeadlineCache):
+	"""Timer-free lazy cache wrapper to serialize/deserialize value data."""
@@ -1,20 +1,23 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
 import logging
+from contextlib import nullcontext
 from contextlib import suppress as exception_suppress
-from time import perf_counter
+from enum import IntEnum
+from math import ceil
+from time import monotonic
 from typing import TYPE_CHECKING
 
-from aiogram_middlewares.utils import (
-	BrotliedPickleSerializer,
-	make_dataclass,
-)
+from aiogram_middlewares.utils import make_dataclass
+
+from .snapshot import gc_paused, snapshot_entries, write_snapshot
 
 if TYPE_CHECKING:
-	from asyncio import AbstractEventLoop, Task, TimerHandle
+	from asyncio import AbstractEventLoop, TimerHandle
 	from dataclasses import dataclass as make_dataclass
-	from typing import Any, Callable, Literal
+	from typing import Any, Awaitable, Callable, ContextManager, Iterable, Iterator, Literal
 
 	from aiogram_middlewares.utils import BaseSerializer
 
@@ -23,6 +26,9 @@ if TYPE_CHECKING:
 		PluggedAwaitable,
 		ttl_type,
 	)
+	from .snapshot import Entry, PathType, Record
+	from .stats import CacheStats
+	from .timer_wheel import TimerWheel, WheelTimer
 
 	key_obj = Any
 	true = Literal[True]
@@ -35,37 +41,133 @@ class CacheKeyError(KeyError):
 	...
 
 
+class ExpiryKind(IntEnum):
+	"""Action on item expiry (stored in item instead of per-key closures)."""
+
+	DELETE = 0
+	DELETE_SUBCALL = 1  # Delete & run plugged awaitable from `arg` in task
+	DELETE_SYNC_SUBCALL = 2  # Delete & call `arg()`
+	ITEM_CALLBACK = 3  # Only call `arg(key, item)`
+
+
 @make_dataclass
 class CacheItem:
 	"""Dataclass for timer with value data."""
 
-	handle: TimerHandle  # Timer for ttl & some actions..
-	callback: Callable  # Because TimerHandler._callback is None..
-	callback_args: tuple[...] | None = None
+	handle: TimerHandle | WheelTimer | None  # Timer for ttl (always calls cache's `_on_expire`)
+	kind: ExpiryKind = ExpiryKind.DELETE
+	arg: Any = None  # Callback for the expiry kind
 
 	value: Any = None  # Serializable data
 	obj: object = None  # Not serializable field
 
 
-_NO_ITEM = object()
+# Instead of class in `dict.get` (class attrs became descriptors with slots)
+_NO_ITEM = CacheItem(handle=None)
+_MISSING = object()  # Default of batch get to tell missing keys from stored `None`
+_NO_LOCK = nullcontext()  # Single loop caches need no lock (reusable, it's stateless)
+# Running expiry subcall tasks (loop keeps only weak references to them)
+_subcall_tasks: set[asyncio.Future[Any]] = set()
+
+
+def _run_subcall(awaitable: Awaitable[Any]) -> None:
+	"""Run awaitable of plugged expiry subcall in the task (referenced till it's done)."""
+	task = asyncio.ensure_future(awaitable)
+	_subcall_tasks.add(task)
+	task.add_done_callback(_subcall_tasks.discard)
+
+
+class _GroupTimer:
+	"""Timer of item restored from snapshot or set by batch (fired by group's loop/wheel timer)."""
+
+	__slots__ = ('_when', '_cancelled')
+
+	def __init__(self: _GroupTimer, when: float) -> None:
+		self._when = when
+		self._cancelled = False
+
+
+	def when(self: _GroupTimer) -> float:
+		return self._when
+
+
+	def cancel(self: _GroupTimer) -> None:
+		self._cancelled = True
+
+
+	def cancelled(self: _GroupTimer) -> bool:
+		return self._cancelled
+
+
 # TODO: Make some args as objects..
 # TODO: Add set/update method without ttl for things like throttle?
 
 
 # TODO: Make subclass & abc for some stuff..
 class LazyMemoryCache:
-	"""Async wrapper around dict operations & event loop timers to use it as a ttl cache."""
+	"""Async wrapper around dict operations & event loop timers to use it as a ttl cache.
+
+	Pass `timer_wheel` to keep items timers in the (shareable) `TimerWheel`
+	instead of event loop's scheduler heap (one `call_later` handle per key).
+	"""
+
+	# Restored & batch set items expiring within the same bucket (seconds) share one loop timer
+	GROUP_GRANULARITY = 0.1
+	# Raters change items under `lock_of` key, it locks only if cache is shared by threads
+	is_thread_safe = False
 
 	def __init__(
 		self: LazyMemoryCache, ttl: ttl_type,
 		loop: AbstractEventLoop | None = None,
+		timer_wheel: TimerWheel | None = None,
 	) -> None:
 		self._cache: dict[Any, CacheItem] = {}
 		self._ttl = ttl
 
 		self._loop = loop
+		self._timer_wheel = timer_wheel
 
 		self._make_handle = self._make_handle_with_loop_check
+		# Bound once, so handles share the same callback object
+		self._on_expire_cb = self._on_expire
+		# & one context (loop copies the current one for every handle otherwise)
+		self._timer_context = contextvars.Context()
+
+		self.stats: CacheStats | None = None
+
+
+	def enable_stats(self: LazyMemoryCache, *, lateness: bool = False) -> CacheStats:
+		"""Start counting hits, misses, sets, expirations, callbacks & errors.
+
+		Pass `lateness` to collect histogram of expiry callbacks lateness too.
+		Counting methods are bound to the instance, so disabled stats cost nothing.
+		"""
+		from .stats import instrument, uninstrument
+
+		uninstrument(self)
+		self.stats = instrument(self, lateness=lateness)
+		return self.stats
+
+
+	def disable_stats(self: LazyMemoryCache) -> None:
+		from .stats import uninstrument
+
+		uninstrument(self)
+		self.stats = None
+
+
+	def lock_of(self: LazyMemoryCache, key: key_obj) -> ContextManager[Any]:  # noqa: ARG002
+		"""Return lock to hold around read-modify-write of key's item (no-op for one loop)."""
+		return _NO_LOCK
+
+
+	def _stats_gauges(self: LazyMemoryCache) -> tuple[int, int]:
+		# O(n), but only on stats read
+		timers = sum(
+			1 for item in self._cache.values()
+			if item.handle is not None and not item.handle.cancelled()
+		)
+		return len(self._cache), timers
 
 
 	def _make_handle_(
@@ -74,7 +176,7 @@ class LazyMemoryCache:
 	) -> TimerHandle:
 		"""Wrap around asyncio event loop's `call_later` method."""
 		assert self._loop  # plug for
-		return self._loop.call_later(ttl, callback, *args)
+		return self._loop.call_later(ttl, callback, *args, context=self._timer_context)
 
 
 	def _make_handle_with_loop_check(
@@ -83,27 +185,42 @@ class LazyMemoryCache:
 	) -> TimerHandle:
 		if self._loop is None:
 			self._loop = asyncio.get_running_loop()
-		self._make_handle = self._make_handle_
-		return self._make_handle_(ttl, callable, *args)
+		self._make_handle = (
+			self._make_handle_ if self._timer_wheel is None else self._timer_wheel.call_later
+		)
+		return self._make_handle(ttl, callback, *args)
+
+
+	def _on_expire(self: LazyMemoryCache, key: key_obj) -> None:
+		"""Timer callback for all items."""
+		item = self._cache.get(key)
+		if item is not None:
+			self._run_expiry(key, item)
 
 
-	def _make_handle_delete(
-		self: LazyMemoryCache, key: key_obj, ttl: ttl_type,
-	) -> tuple[
-		TimerHandle,
-		tuple[Callable[[key_obj], true], tuple[key_obj]],
-	]:
-		return self._make_handle(ttl, self.delete, key), (self.delete, (key,))
+	def _run_expiry(self: LazyMemoryCache, key: key_obj, item: CacheItem) -> None:
+		kind = item.kind
+		if kind is ExpiryKind.DELETE:
+			self.delete(key)
+		elif kind is ExpiryKind.DELETE_SUBCALL:
+			# Delete right now (not in the task), else the key could be recreated before
+			self.delete(key)
+			_run_subcall(item.arg())
+		elif kind is ExpiryKind.DELETE_SYNC_SUBCALL:
+			self.delete(key)
+			item.arg()
+		else:
+			item.arg(key, item)
 
 
-	# TODO: Move into dataclass..?
-	def _set_item_callback(
+	def _set_item_kind(
 		self: LazyMemoryCache,
 		item: CacheItem,
-		callback: Callable, args: tuple[...] | None,
+		kind: ExpiryKind, arg: Any,
 	) -> None:
-		item.callback = callback
-		item.callback_args = args
+		"""Replace item's expiry action (handle stays the same)."""
+		item.kind = kind
+		item.arg = arg
 
 
 	def set(
@@ -113,14 +230,10 @@ class LazyMemoryCache:
 	) -> true:
 		# ttl must not be zero!
 		# Not cancels old item handle!
-		handle, _callback = self._make_handle_delete(key, ttl)
-		# WARNNING: Sometimes `handle_calllback` is None!
-		item = CacheItem(
-			value=value, handle=handle,
-			callback=_callback[0], callback_args=_callback[1],
-			obj=obj,
+		self._cache[key] = CacheItem(
+			handle=self._make_handle(ttl, self._on_expire_cb, key),
+			value=value, obj=obj,
 		)
-		self._cache[key] = item
 		return True
 
 
@@ -130,15 +243,52 @@ class LazyMemoryCache:
 
 
 	def get_item(self: LazyMemoryCache, key: key_obj, default: Any = None) -> Any | None:
-		return self._cache.get(key, CacheItem) or default
+		return self._cache.get(key, default)
 
 
 	def get(self: LazyMemoryCache, key: key_obj, default: Any = None) -> Any | None:
-		return self._cache.get(key, CacheItem).value or default
+		return self._cache.get(key, _NO_ITEM).value or default
 
 
 	def get_obj(self: LazyMemoryCache, key: key_obj, default: Any = None) -> Any | None:
-		return self._cache.get(key, CacheItem).obj or default
+		return self._cache.get(key, _NO_ITEM).obj or default
+
+
+	def items(self: LazyMemoryCache) -> Iterator[tuple[key_obj, CacheItem]]:
+		"""Iterate over keys & their items (don't change the cache while iterating)."""
+		return iter(self._cache.items())
+
+
+	def get_or_create(
+		self: LazyMemoryCache, key: key_obj, factory: Callable[[], Any], ttl: ttl_type, *,
+		touch: bool = False,
+		obj_factory: Callable[[], object] | None = None,
+		callback: Callable[[key_obj, CacheItem], Any] | None = None,
+	) -> CacheItem:
+		"""Return item of the key by one lookup, set new one with `factory()` value if missing.
+
+		`touch` resets ttl of the found item (debouncing). `obj_factory` & expiry `callback`
+		(like `replace_handle_sync_callback`) are only for the new item.
+		"""
+		item = self._cache.get(key)
+		if item is None:
+			return self._create_item(key, factory, ttl, obj_factory, callback)
+		if touch:
+			self._expire_item(key, item, ttl)
+		return item
+
+
+	def _create_item(
+		self: LazyMemoryCache, key: key_obj, factory: Callable[[], Any], ttl: ttl_type,
+		obj_factory: Callable[[], object] | None,
+		callback: Callable[[key_obj, CacheItem], Any] | None,
+	) -> CacheItem:
+		# By `set` to keep variants' logic (bounds, encoding, sweeper, stats)
+		self.set(key, factory(), None if obj_factory is None else obj_factory(), ttl)
+		item = self._cache[key]
+		if callback is not None:
+			self._set_item_kind(item, ExpiryKind.ITEM_CALLBACK, callback)
+		return item
 
 
 	# unused..
@@ -147,7 +297,7 @@ class LazyMemoryCache:
 		key: key_obj, value: Any,
 	) -> true:
 		"""Set with default ttl."""
-		return self.set(key, value, self._ttl)
+		return self.set(key, value, ttl=self._ttl)
 
 
 	# TODO: Mb add obj arg.. (don't forget to pass arg into serializable variant too..)
@@ -159,6 +309,13 @@ class LazyMemoryCache:
 		return True
 
 
+	def update_item(
+		self: LazyMemoryCache, key: key_obj, item: CacheItem, value: Any,  # noqa: ARG002
+	) -> None:
+		"""Like update, but for the item of the key got before (no lookup)."""
+		item.value = self._encode_value(value)
+
+
 	def uppress(
 		self: LazyMemoryCache, key: key_obj, value: Any,
 	) -> bool:
@@ -174,7 +331,7 @@ class LazyMemoryCache:
 		ttl: ttl_type = 10,
 	) -> bool:
 		if key not in self._cache:
-			return self.set(key, value, ttl or self._ttl)
+			return self.set(key, value, ttl=ttl or self._ttl)
 		return self.update(key, value)
 
 
@@ -190,54 +347,120 @@ class LazyMemoryCache:
 		ttl: ttl_type,
 	) -> true:
 		"""Use if you sure item still in cache (recomment with cache cleanup scheduling)."""
-		item: CacheItem = self._cache[key]
-		item.handle.cancel()
-		# Reuse old callback
-		item.handle = self._make_handle(ttl, item.callback, *item.callback_args or ())
+		self._expire_item(key, self._cache[key], ttl)
 		return True
 
 
-	async def _delete_with_subcall(
-		self: LazyMemoryCache, key: key_obj, plugged_awaitable: PluggedAwaitable,
-	) -> true:
-		status = self.delete(key)
-		await plugged_awaitable()
-		return status
+	def _expire_item(self: LazyMemoryCache, key: key_obj, item: CacheItem, ttl: ttl_type) -> None:
+		handle = item.handle
+		if self._timer_wheel is not None and handle.__class__ is not _GroupTimer:
+			# Just move the timer to another wheel slot (O(1))
+			self._timer_wheel.move(handle, ttl)
+			return
+		handle.cancel()
+		item.handle = self._make_handle(ttl, self._on_expire_cb, key)
 
 
-	def _delete_with_sync_subcall(
-		self: LazyMemoryCache, key: key_obj, callback: Callable[[], Any],
-	) -> true:
-		status = self.delete(key)
-		callback()
-		return status
+	def _arm_group(
+		self: LazyMemoryCache, items: Iterable[CacheItem], keys: list[key_obj], ttl: ttl_type,
+	) -> None:
+		"""Give items group timers with one loop (or wheel) timer for the batch."""
+		scheduler = self._group_scheduler()
+		when = scheduler.time() + ttl
+		for item in items:
+			item.handle = _GroupTimer(when)
+		if keys:
+			scheduler.call_at(when, self._on_expire_group, keys)
 
 
-	def wrap_delete_with_subcall(
-		self: LazyMemoryCache, key: key_obj, plugged_awaitable: PluggedAwaitable,
-	) -> Callable[[], Task[bool]]:
-		return lambda: asyncio.ensure_future(self._delete_with_subcall(key, plugged_awaitable))
+	def _group_scheduler(self: LazyMemoryCache) -> AbstractEventLoop | TimerWheel:
+		"""Return scheduler of group timers (the wheel keeps them out of loop's heap)."""
+		if self._loop is None:
+			self._loop = asyncio.get_running_loop()
+		return self._loop if self._timer_wheel is None else self._timer_wheel
+
+
+	def get_many(
+		self: LazyMemoryCache, keys: Iterable[key_obj], default: Any = None,
+	) -> list[Any]:
+		get = self._cache.get
+		return [get(key, _NO_ITEM).value or default for key in keys]
+
+
+	def set_many(
+		self: LazyMemoryCache, items: Iterable[tuple[key_obj, Any]],
+		ttl: ttl_type = 10, objs: Iterable[object] | None = None,
+	) -> int:
+		"""Set values (& `objs` in the same order) with one timer scheduling for the batch."""
+		cache = self._cache
+		encode = self._encode_value
+		keys: list[key_obj] = []
+		new_items: list[CacheItem] = []
+		if objs is None:
+			pairs: Iterable[tuple[tuple[key_obj, Any], object]] = ((pair, None) for pair in items)
+		else:
+			pairs = zip(items, objs)
+		for (key, value), obj in pairs:
+			old = cache.get(key)
+			if old is not None and old.handle is not None:
+				# Unlike `set`, else old timer would expire the new item
+				old.handle.cancel()
+			item = cache[key] = CacheItem(handle=None, value=encode(value), obj=obj)
+			keys.append(key)
+			new_items.append(item)
+
+		self._arm_group(new_items, keys, ttl)
+		return len(keys)
+
+
+	def expire_many(self: LazyMemoryCache, keys: Iterable[key_obj], ttl: ttl_type) -> int:
+		"""Reset ttl of keys still in cache (one timer scheduling for the batch)."""
+		cache = self._cache
+		found: list[key_obj] = []
+		items: list[CacheItem] = []
+		for key in keys:
+			item = cache.get(key)
+			if item is not None:
+				found.append(key)
+				items.append(item)
+
+		for item in items:
+			item.handle.cancel()
+		self._arm_group(items, found, ttl)
+		return len(found)
+
+
+	def delete_many(self: LazyMemoryCache, keys: Iterable[key_obj]) -> int:
+		"""Delete keys (missing are skipped) without cancelling timers."""
+		pop = self._cache.pop
+		return sum(pop(key, None) is not None for key in keys)
 
 
-	def wrap_delete_with_sync_subcall(
-		self: LazyMemoryCache, key: key_obj, callback_: Callable[[], Any],
-	) -> Callable[[], Any]:
-		return lambda: self._delete_with_sync_subcall(key, callback_)
+	@staticmethod
+	def calc_remaining_of(handle: TimerHandle | WheelTimer) -> float:
+		# Default event loop clock is `time.monotonic`
+		return handle.when() - monotonic()
 
 
-	@staticmethod
-	def calc_remaining_of(handle: TimerHandle) -> float:
-		return handle.when() - perf_counter()
+	def remaining_of(self: LazyMemoryCache, key: key_obj) -> float:
+		"""Return seconds left to the key expiry."""
+		return self.calc_remaining_of(self._get_item_strict(key).handle)
 
 
-	def cancel_handle(
+	def _get_item_strict(
 		self: LazyMemoryCache, key: key_obj,
 	) -> CacheItem:
 		try:
-			item = self._cache[key]
+			return self._cache[key]
 		except KeyError as ke:
 			msg = f'Key `{key}` not found or removed from cache!'
 			raise CacheKeyError(msg) from ke
+
+
+	def cancel_handle(
+		self: LazyMemoryCache, key: key_obj,
+	) -> CacheItem:
+		item = self._get_item_strict(key)
 		item.handle.cancel()
 		# del item.handle
 		return item
@@ -247,81 +470,157 @@ class LazyMemoryCache:
 		self: LazyMemoryCache, key: key_obj, plugged_awaitable: PluggedAwaitable,
 		ttl: float | int,
 	) -> true:
-		item = self.cancel_handle(key)
-
-		assert self._loop
-		item.handle = self._loop.call_later(
-			ttl,
-			self.wrap_delete_with_subcall(key, plugged_awaitable),
+		self._set_item_kind(
+			self._get_item_strict(key), ExpiryKind.DELETE_SUBCALL, plugged_awaitable,
 		)
-		return True
+		return self.expire(key, ttl)
 
 
 	def set_handle_subcallback(
 		self: LazyMemoryCache, key: key_obj, plugged_awaitable: PluggedAwaitable,
 	) -> true:
-		item = self.cancel_handle(key)
-
-		# NOTE: Hmm..
-		# TODO: Unite to one func..
-		handle_remaining = self.calc_remaining_of(item.handle)
-
-		cb = self.wrap_delete_with_subcall(key, plugged_awaitable)
-
-		item.handle = self._make_handle(
-			handle_remaining,
-			cb,
+		# Timer keeps its deadline & callback, only expiry action is changed
+		self._set_item_kind(
+			self._get_item_strict(key), ExpiryKind.DELETE_SUBCALL, plugged_awaitable,
 		)
-		self._set_item_callback(item, cb, None)
-		#
-
 		return True
 
 
 	def set_handle_sync_subcallback(
 		self: LazyMemoryCache, key: key_obj, callback: Callable[[], Any],
 	) -> true:
-		item = self.cancel_handle(key)
-
-		# NOTE: Hmm..
-		handle_remaining = self.calc_remaining_of(item.handle)
-
-		cb = self.wrap_delete_with_sync_subcall(key, callback)
-
-		item.handle = self._make_handle(
-			handle_remaining,
-			cb,
+		self._set_item_kind(
+			self._get_item_strict(key), ExpiryKind.DELETE_SYNC_SUBCALL, callback,
 		)
-		self._set_item_callback(item, cb, None)
-
 		return True
 
 
-	# TODO: Set what it wraps.. (to avoid things like `method.<locals>.<lambda>`)
 	# TODO: Docstrings & mb rename this method..?
 	def replace_handle_sync_callback(
 		self: LazyMemoryCache, key: key_obj, callback: Callable[[key_obj, CacheItem], Any],
 	) -> true:
-		item = self.cancel_handle(key)
-
-		# NOTE: Hmm..
-		handle_remaining = self.calc_remaining_of(item.handle)
-
-		# TODO: Mb some optional args2callback..
-		cb = lambda: callback(key, item)  # noqa: E731
-
-		# TODO: Add func to make handle &
-		# TODO: set/update (if the same cb+cb_args) CacheItem's callback+callback_args data
-		item.handle = self._make_handle(
-			handle_remaining,
-			cb,
+		"""Call `callback(key, item)` on expiry instead of delete."""
+		self._set_item_kind(
+			self._get_item_strict(key), ExpiryKind.ITEM_CALLBACK, callback,
 		)
-		self._set_item_callback(item, cb, None)
-
 		return True
 
 
 	# TODO: Use as decorator..
+	def _encode_value(self: LazyMemoryCache, value: Any) -> Any:
+		return value
+
+
+	def _decode_value(self: LazyMemoryCache, value: Any) -> Any:
+		return value
+
+
+	def value_of(self: LazyMemoryCache, item: CacheItem) -> Any:
+		"""Return decoded value of the item (e.g. in expiry callback)."""
+		return self._decode_value(item.value)
+
+
+	def _remaining_of_item(self: LazyMemoryCache, item: CacheItem, now: float) -> float | None:
+		handle = item.handle
+		if handle is None or handle.cancelled():
+			return None
+		return handle.when() - now
+
+
+	def _snapshot_records(
+		self: LazyMemoryCache, depth_of: Callable[[Any], int] | None = None,
+		deadline_of: Callable[[Any], float] | None = None,
+	) -> Iterator[Record]:
+		now = monotonic()
+		remaining_of_item = self._remaining_of_item
+		decode = self._decode_value
+		# Copy, because values decoding could expire items
+		for key, item in list(self._cache.items()):
+			if key.__class__ is not int:
+				continue
+			if deadline_of is None:
+				remaining = remaining_of_item(item, now)
+				if remaining is None or remaining <= 0:
+					continue
+				value = decode(item.value)
+			else:
+				value = decode(item.value)
+				remaining = deadline_of(value) - now
+				if remaining <= 0:
+					continue
+			yield (
+				key, remaining,
+				# Sliding window rate is an estimate
+				ceil(getattr(value, 'rate', 0)), getattr(value, 'sent_warning_count', 0),
+				depth_of(item.obj) if depth_of is not None and item.obj is not None else 0,
+			)
+
+
+	def snapshot(
+		self: LazyMemoryCache, path: PathType,
+		depth_of: Callable[[Any], int] | None = None,
+		deadline_of: Callable[[Any], float] | None = None,
+	) -> int:
+		"""Dump items with int keys (rate data, remaining ttl & `depth_of(obj)`) into binary file.
+
+		Pass `deadline_of(value)` if the value knows its expiry better than the timer.
+		"""
+		with gc_paused():
+			return write_snapshot(path, self._snapshot_records(depth_of, deadline_of))
+
+
+	def restore(
+		self: LazyMemoryCache, path: PathType,
+		make_obj: Callable[[int], Any] | None = None,
+	) -> list[key_obj]:
+		"""Load snapshot with expiry re-armed relative to current clock, return restored keys."""
+		with gc_paused():
+			return self._restore_items(snapshot_entries(path, make_obj))
+
+
+	def _restore_items(self: LazyMemoryCache, entries: Iterable[Entry]) -> list[key_obj]:
+		scheduler = self._group_scheduler()
+		now = scheduler.time()
+		granularity = self.GROUP_GRANULARITY
+		encode = self._encode_value
+		cache = self._cache
+		keys: list[key_obj] = []
+		# Timer per item is too slow for millions of items, so per time bucket
+		buckets: dict[int, list[key_obj]] = {}
+		for key, value, obj, remaining in entries:
+			when = now + remaining
+			cache[key] = CacheItem(handle=_GroupTimer(when), value=encode(value), obj=obj)
+			slot = ceil(when / granularity)
+			bucket = buckets.get(slot)
+			if bucket is None:
+				bucket = buckets[slot] = []
+			bucket.append(key)
+			keys.append(key)
+
+		for slot, bucket in buckets.items():
+			scheduler.call_at(slot * granularity, self._on_expire_group, bucket)
+		return keys
+
+
+	def _on_expire_group(self: LazyMemoryCache, keys: list[key_obj]) -> None:
+		"""Timer callback for the group of items (restored or set by batch)."""
+		assert self._loop  # plug for linter
+		deadline = self._loop.time() + self.GROUP_GRANULARITY
+		cache = self._cache
+		for key in keys:
+			item = cache.get(key)
+			if item is None:
+				continue
+			handle = item.handle
+			# Item could be re-set or prolonged (own timer then)
+			if (
+				handle.__class__ is _GroupTimer
+				and not handle._cancelled  # noqa: SLF001
+				and handle._when < deadline  # noqa: SLF001
+			):
+				self._run_expiry(key, item)
+
+
 	def _try_shs(
 		self: LazyMemoryCache, func: Callable[[key_obj, PluggedAwaitable], bool],
 		key: key_obj, callback: Callable,
@@ -360,9 +659,15 @@ class LazyMemoryCacheSerializable(LazyMemoryCache):
 		self: LazyMemoryCacheSerializable, ttl: ttl_type,
 		loop: AbstractEventLoop | None = None,
 		data_serializer: BaseSerializer | None = None,
+		**kwargs: Any,
 	) -> None:
-		super().__init__(ttl=ttl, loop=loop)
-		self._serializer = data_serializer if data_serializer else BrotliedPickleSerializer()
+		# Other kwargs goes to the expiry variant of cache (`timer_wheel`, `sweep_interval`, ..)
+		super().__init__(ttl=ttl, loop=loop, **kwargs)
+		if data_serializer is None:
+			# Default one needs optional `brotli`
+			from aiogram_middlewares.serializers import BrotliedPickleSerializer
+			data_serializer = BrotliedPickleSerializer()
+		self._serializer = data_serializer
 
 
 	def set(
@@ -384,3 +689,21 @@ class LazyMemoryCacheSerializable(LazyMemoryCache):
 
 	def get(self: LazyMemoryCacheSerializable, key: key_obj, default: Any = None) -> Any:
 		return self._serializer.deserialize(super().get(key, default))
+
+
+	def get_many(
+		self: LazyMemoryCacheSerializable, keys: Iterable[key_obj], default: Any = None,
+	) -> list[Any]:
+		deserialize = self._serializer.deserialize
+		return [
+			default if value is _MISSING else deserialize(value)
+			for value in super().get_many(keys, _MISSING)
+		]
+
+
+	def _encode_value(self: LazyMemoryCacheSerializable, value: Any) -> Any:
+		return self._serializer.serialize(value)
+
+
+	def _decode_value(self: LazyMemoryCacheSerializable, value: Any) -> Any:
+		return self._serializer.deserialize(value)
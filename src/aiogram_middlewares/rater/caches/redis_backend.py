@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from aiogram_middlewares.rater.models import RateData
+
+from .backend import AsyncRateBackend, HitVerdict, RateHit
+
+if TYPE_CHECKING:
+	from typing import Any, Sequence
+
+	from redis.asyncio import Redis
+
+	from aiogram_middlewares.rater.types import ttl_type
+
+	from .lazy_ttl import key_obj
+
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS[1] - hash key, ARGV - limit, warnings limit, ttl (ms), debounce flag
+# Returns verdict, rate & warnings before the hit, pttl after it
+HIT_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local warnings_limit = tonumber(ARGV[2])
+local data = redis.call('HMGET', key, 'r', 'w')
+local rate = tonumber(data[1]) or 0
+local warns = tonumber(data[2]) or 0
+local verdict = 2
+if rate < limit then
+	redis.call('HINCRBY', key, 'r', 1)
+	verdict = 0
+elseif warns < warnings_limit then
+	redis.call('HINCRBY', key, 'w', 1)
+	verdict = 1
+end
+if data[1] == false or ARGV[4] == '1' then
+	redis.call('PEXPIRE', key, ARGV[3])
+end
+return {verdict, rate, warns, redis.call('PTTL', key)}
+"""
+
+
+class RedisRateBackend(AsyncRateBackend):
+	"""Redis-protocol backend (each hit is one `EVALSHA` round trip over pooled connections).
+
+	Needs `redis` package (`pip install redis`), works with any server
+	supporting Lua scripts (Redis, KeyDB, Valkey, Dragonfly..).
+	"""
+
+	def __init__(
+		self: RedisRateBackend, url: str = 'redis://localhost:6379/0', *,
+		client: Redis | None = None,
+		prefix: str = 'aiogram_middlewares:rater:',
+		max_connections: int = 32,
+		**pool_kwargs: Any,
+	) -> None:
+		if client is None:
+			try:
+				from redis.asyncio import ConnectionPool, Redis
+			except ImportError as e:
+				msg = '`redis` package is required for `RedisRateBackend` (`pip install redis`)'
+				raise ImportError(msg) from e
+
+			client = Redis(connection_pool=ConnectionPool.from_url(
+				url, max_connections=max_connections, **pool_kwargs,
+			))
+
+		self._client = client
+		self._prefix = prefix
+		# Sends `EVALSHA` (& loads the script once on `NOSCRIPT`)
+		self._script = client.register_script(HIT_SCRIPT)
+
+
+	def _key(self: RedisRateBackend, key: key_obj) -> str:
+		return f'{self._prefix}{key}'
+
+
+	@staticmethod
+	def _args(
+		ttl: ttl_type, limit: int, warnings_limit: int, *, debounce: bool,
+	) -> tuple[int, int, int, int]:
+		return (limit, warnings_limit, int(ttl * 1000), int(debounce))
+
+
+	@staticmethod
+	def _to_hit(reply: list[int], ttl: ttl_type) -> RateHit:
+		verdict, rate, warns, pttl = reply
+		return RateHit(
+			rate=rate, sent_warning_count=warns,
+			verdict=HitVerdict(verdict),
+			remaining=pttl / 1000 if pttl > 0 else ttl,
+		)
+
+
+	async def hit(
+		self: RedisRateBackend, key: key_obj, ttl: ttl_type,
+		limit: int, warnings_limit: int = 0, *, debounce: bool = True,
+	) -> RateHit:
+		reply = await self._script(
+			keys=(self._key(key),), args=self._args(ttl, limit, warnings_limit, debounce=debounce),
+		)
+		return self._to_hit(reply, ttl)
+
+
+	async def hit_many(
+		self: RedisRateBackend, keys: Sequence[key_obj], ttl: ttl_type,
+		limit: int, warnings_limit: int = 0, *, debounce: bool = True,
+	) -> list[RateHit]:
+		"""Hit keys in one pipeline (one round trip for the batch)."""
+		args = self._args(ttl, limit, warnings_limit, debounce=debounce)
+		pipe = self._client.pipeline(transaction=False)
+		for key in keys:
+			await self._script(keys=(self._key(key),), args=args, client=pipe)
+		return [self._to_hit(reply, ttl) for reply in await pipe.execute()]
+
+
+	async def get(self: RedisRateBackend, key: key_obj) -> RateData | None:
+		rate, warns = await self._client.hmget(self._key(key), ('r', 'w'))
+		if rate is None:
+			return None
+		return RateData(rate=int(rate), sent_warning_count=int(warns or 0))
+
+
+	async def delete(self: RedisRateBackend, key: key_obj) -> bool:
+		return bool(await self._client.delete(self._key(key)))
+
+
+	async def close(self: RedisRateBackend) -> None:
+		await self._client.aclose()
@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress as exception_suppress
+from functools import partial
+from threading import RLock
+from typing import TYPE_CHECKING
+
+from .lazy_deadline import LazyDeadlineCache
+from .lazy_ttl import CacheKeyError, _run_subcall
+from .snapshot import gc_paused, snapshot_entries, write_snapshot
+
+if TYPE_CHECKING:
+	from asyncio import AbstractEventLoop
+	from typing import Any, Callable, Iterable, Iterator, Sequence
+
+	from aiogram_middlewares.rater.types import PluggedAwaitable, ttl_type
+
+	from .lazy_deadline import DeadlineItem
+	from .lazy_ttl import key_obj, true
+	from .snapshot import Entry, PathType, Record
+	from .stats import CacheStats
+
+
+logger = logging.getLogger(__name__)
+
+
+_SWEEPER_PENDING: Any = object()  # Sweeper start was requested from another thread
+
+
+def _current_loop() -> AbstractEventLoop | None:
+	try:
+		return asyncio.get_running_loop()
+	except RuntimeError:
+		return None
+
+
+def _run_subcall_on(loop: AbstractEventLoop | None, plugged_awaitable: PluggedAwaitable) -> None:
+	"""Run plugged awaitable on the loop where it was registered (bot session lives there)."""
+	if loop is None or loop is _current_loop():
+		_run_subcall(plugged_awaitable())
+	else:
+		asyncio.run_coroutine_threadsafe(plugged_awaitable(), loop)
+
+
+class ThreadSafeShardMixin:
+	"""Lock & loop affinity for timer-free shard (sweeper runs only on shard's loop)."""
+
+	_loop: AbstractEventLoop | None
+	_sweeper: Any
+
+	def __init__(self: ThreadSafeShardMixin, *args: Any, **kwargs: Any) -> None:
+		super().__init__(*args, **kwargs)  # type: ignore
+		self._lock = RLock()
+
+
+	@property
+	def lock(self: ThreadSafeShardMixin) -> RLock:
+		"""Shard's (reentrant) lock, router holds it around every shard call."""
+		return self._lock
+
+
+	def _ensure_sweeper(self: ThreadSafeShardMixin) -> None:
+		if self._sweeper is not None:
+			return
+		running = _current_loop()
+		if self._loop is None:
+			self._loop = running
+		if self._loop is None or running is self._loop:
+			super()._ensure_sweeper()  # type: ignore
+			return
+		# Timers can't be made from foreign thread, so ask shard's loop
+		self._sweeper = _SWEEPER_PENDING
+		self._loop.call_soon_threadsafe(self._start_sweeper_threadsafe)
+
+
+	def _start_sweeper_threadsafe(self: ThreadSafeShardMixin) -> None:
+		with self._lock:
+			if self._sweeper is _SWEEPER_PENDING:
+				self._sweeper = None
+				super()._ensure_sweeper()  # type: ignore
+
+
+	def _sweep(self: ThreadSafeShardMixin) -> None:
+		with self._lock:
+			super()._sweep()  # type: ignore
+
+
+class ShardedLazyCache:
+	"""Thread-safe router over N timer-free lazy caches partitioned by key hash.
+
+	For bots with several dispatchers on separate event loops (threads) sharing
+	the unity cache. Each shard has own lock, loop (`loops[i % len(loops)]` or
+	the first one touched it) & sweeper, so contention is split by shards count.
+	Plugged awaitables (calmed notifications) run on the loop they were registered from.
+
+	Raters change items (counters, calmed callbacks) under `lock_of(key)`.
+	Throttle semaphores & chat/global scopes are bound to one loop,
+	so share the cache between loops in antiflood & GCRA modes.
+	"""
+
+	is_thread_safe = True
+
+	def __init__(
+		self: ShardedLazyCache, ttl: ttl_type,
+		shards: int = 16,
+		shard_class: type[LazyDeadlineCache] = LazyDeadlineCache,
+		loops: Sequence[AbstractEventLoop] | None = None,
+		**shard_kwargs: Any,
+	) -> None:
+		if shards < 1:
+			msg = f'`shards` must be positive, `{shards=}`'
+			raise ValueError(msg)
+		if not issubclass(shard_class, LazyDeadlineCache):
+			msg = (
+				'Shard must be timer-free (`LazyDeadlineCache` subclass), '
+				f'got `{shard_class.__name__}`'
+			)
+			raise TypeError(msg)
+
+		self._ttl = ttl
+		cls = type(f'Shard{shard_class.__name__}', (ThreadSafeShardMixin, shard_class), {})
+		self._shards: tuple[Any, ...] = tuple(
+			cls(ttl=ttl, loop=loops[i % len(loops)] if loops else None, **shard_kwargs)
+			for i in range(shards)
+		)
+		self._count = shards
+
+
+	def __len__(self: ShardedLazyCache) -> int:
+		return sum(len(shard._cache) for shard in self._shards)  # noqa: SLF001
+
+
+	@property
+	def shards(self: ShardedLazyCache) -> tuple[LazyDeadlineCache, ...]:
+		return self._shards
+
+
+	@property
+	def stats(self: ShardedLazyCache) -> CacheStats | None:
+		"""Sum of shards stats at the moment (its `reset` resets the shards ones)."""
+		if self._shards[0].stats is None:
+			return None
+		from .stats import CacheStats
+
+		return CacheStats.merged([shard.stats for shard in self._shards])
+
+
+	def enable_stats(self: ShardedLazyCache, *, lateness: bool = False) -> CacheStats:
+		"""Count stats per shard (under its lock, so counters are exact)."""
+		for shard in self._shards:
+			with shard.lock:
+				shard.enable_stats(lateness=lateness)
+		return self.stats  # type: ignore
+
+
+	def disable_stats(self: ShardedLazyCache) -> None:
+		for shard in self._shards:
+			with shard.lock:
+				shard.disable_stats()
+
+
+	def _shard_of(self: ShardedLazyCache, key: key_obj) -> Any:
+		return self._shards[hash(key) % self._count]
+
+
+	def lock_of(self: ShardedLazyCache, key: key_obj) -> RLock:
+		"""Return key's shard lock to hold around read-modify-write of its item."""
+		return self._shard_of(key).lock
+
+
+	def set(
+		self: ShardedLazyCache,
+		key: key_obj, value: Any, obj: object = None,
+		ttl: ttl_type = 10,
+	) -> true:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.set(key, value, obj, ttl)
+
+
+	def has_key(self: ShardedLazyCache, key: key_obj) -> bool:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.has_key(key)
+
+
+	def get_item(self: ShardedLazyCache, key: key_obj, default: Any = None) -> Any | None:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.get_item(key, default)
+
+
+	def get(self: ShardedLazyCache, key: key_obj, default: Any = None) -> Any | None:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.get(key, default)
+
+
+	def get_obj(self: ShardedLazyCache, key: key_obj, default: Any = None) -> Any | None:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.get_obj(key, default)
+
+
+	def get_or_create(
+		self: ShardedLazyCache, key: key_obj, factory: Callable[[], Any], ttl: ttl_type, *,
+		touch: bool = False,
+		obj_factory: Callable[[], object] | None = None,
+		callback: Callable[[key_obj, DeadlineItem], Any] | None = None,
+	) -> DeadlineItem:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.get_or_create(
+				key, factory, ttl, touch=touch, obj_factory=obj_factory, callback=callback,
+			)
+
+
+	def store(self: ShardedLazyCache, key: key_obj, value: Any) -> true:
+		"""Set with default ttl."""
+		return self.set(key, value, ttl=self._ttl)
+
+
+	def update(self: ShardedLazyCache, key: key_obj, value: Any) -> true:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.update(key, value)
+
+
+	def update_item(self: ShardedLazyCache, key: key_obj, item: DeadlineItem, value: Any) -> None:
+		shard = self._shard_of(key)
+		with shard.lock:
+			shard.update_item(key, item, value)
+
+
+	def uppress(self: ShardedLazyCache, key: key_obj, value: Any) -> bool:
+		"""Like update, but ignore KeyError exception."""
+		with exception_suppress(KeyError):
+			return self.update(key, value)
+		return False
+
+
+	def upsert(
+		self: ShardedLazyCache, key: key_obj, value: Any,
+		ttl: ttl_type = 10,
+	) -> bool:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.upsert(key, value, ttl)
+
+
+	def delete(self: ShardedLazyCache, key: key_obj) -> bool:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.delete(key)
+
+
+	def expire(self: ShardedLazyCache, key: key_obj, ttl: ttl_type) -> true:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.expire(key, ttl)
+
+
+	def value_of(self: ShardedLazyCache, item: DeadlineItem) -> Any:
+		return self._shards[0].value_of(item)
+
+
+	def remaining_of(self: ShardedLazyCache, key: key_obj) -> float:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.remaining_of(key)
+
+
+	def cancel_handle(self: ShardedLazyCache, key: key_obj) -> DeadlineItem:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.cancel_handle(key)
+
+
+	def replace_handle_with_subcallback(
+		self: ShardedLazyCache, key: key_obj, plugged_awaitable: PluggedAwaitable,
+		ttl: float | int,
+	) -> true:
+		shard = self._shard_of(key)
+		with shard.lock:
+			shard.set_handle_sync_subcallback(
+				key, partial(_run_subcall_on, _current_loop(), plugged_awaitable),
+			)
+			return shard.expire(key, ttl)
+
+
+	def set_handle_subcallback(
+		self: ShardedLazyCache, key: key_obj, plugged_awaitable: PluggedAwaitable,
+	) -> true:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.set_handle_sync_subcallback(
+				key, partial(_run_subcall_on, _current_loop(), plugged_awaitable),
+			)
+
+
+	def set_handle_sync_subcallback(
+		self: ShardedLazyCache, key: key_obj, callback: Callable[[], Any],
+	) -> true:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.set_handle_sync_subcallback(key, callback)
+
+
+	def replace_handle_sync_callback(
+		self: ShardedLazyCache, key: key_obj, callback: Callable[[key_obj, Any], Any],
+	) -> true:
+		shard = self._shard_of(key)
+		with shard.lock:
+			return shard.replace_handle_sync_callback(key, callback)
+
+
+	def items(self: ShardedLazyCache) -> Iterator[tuple[key_obj, DeadlineItem]]:
+		"""Iterate over keys & items shard by shard (each shard is locked only while it's read)."""
+		for shard in self._shards:
+			with shard.lock:
+				items = list(shard.items())
+			yield from items
+
+
+	def _split(self: ShardedLazyCache, keys: Iterable[key_obj]) -> list[list[key_obj]]:
+		per_shard: list[list[key_obj]] = [[] for _ in self._shards]
+		count = self._count
+		for key in keys:
+			per_shard[hash(key) % count].append(key)
+		return per_shard
+
+
+	def get_many(
+		self: ShardedLazyCache, keys: Iterable[key_obj], default: Any = None,
+	) -> list[Any]:
+		keys = list(keys)
+		found: dict[key_obj, Any] = {}
+		for shard, shard_keys in zip(self._shards, self._split(keys)):
+			if shard_keys:
+				with shard.lock:
+					found.update(zip(shard_keys, shard.get_many(shard_keys, default)))
+		return [found[key] for key in keys]
+
+
+	def set_many(
+		self: ShardedLazyCache, items: Iterable[tuple[key_obj, Any]],
+		ttl: ttl_type = 10, objs: Iterable[object] | None = None,
+	) -> int:
+		per_shard: list[list[tuple[tuple[key_obj, Any], object]]] = [[] for _ in self._shards]
+		count = self._count
+		for pair, obj in zip(items, objs) if objs is not None else ((pair, None) for pair in items):
+			per_shard[hash(pair[0]) % count].append((pair, obj))
+		total = 0
+		for shard, shard_items in zip(self._shards, per_shard):
+			if shard_items:
+				pairs, shard_objs = zip(*shard_items)
+				with shard.lock:
+					total += shard.set_many(pairs, ttl, shard_objs)
+		return total
+
+
+	def expire_many(self: ShardedLazyCache, keys: Iterable[key_obj], ttl: ttl_type) -> int:
+		total = 0
+		for shard, shard_keys in zip(self._shards, self._split(keys)):
+			if shard_keys:
+				with shard.lock:
+					total += shard.expire_many(shard_keys, ttl)
+		return total
+
+
+	def delete_many(self: ShardedLazyCache, keys: Iterable[key_obj]) -> int:
+		total = 0
+		for shard, shard_keys in zip(self._shards, self._split(keys)):
+			if shard_keys:
+				with shard.lock:
+					total += shard.delete_many(shard_keys)
+		return total
+
+
+	def _try_shs(
+		self: ShardedLazyCache, func: Callable[[key_obj, Any], bool],
+		key: key_obj, callback: Callable,
+	) -> bool:
+		try:
+			return func(key, callback)
+		except CacheKeyError:
+			logger.warning("Key `%s` doesn't exists.", key)
+		except Exception:
+			logger.exception('Error on setting handle subcallback')
+		return False
+
+
+	def try_set_handle_subcallback(
+		self: ShardedLazyCache, key: key_obj, plugged_awaitable: PluggedAwaitable,
+	) -> bool:
+		return self._try_shs(self.set_handle_subcallback, key, plugged_awaitable)
+
+
+	def try_set_handle_sync_subcallback(
+		self: ShardedLazyCache, key: key_obj, callback: Callable[[], Any],
+	) -> bool:
+		return self._try_shs(self.set_handle_sync_subcallback, key, callback)
+
+
+	def try_replace_handle_sync_callback(
+		self: ShardedLazyCache, key: key_obj, callback: Callable[[key_obj, Any], Any],
+	) -> bool:
+		return self._try_shs(self.replace_handle_sync_callback, key, callback)
+
+
+	def _snapshot_records(
+		self: ShardedLazyCache, depth_of: Callable[[Any], int] | None = None,
+		deadline_of: Callable[[Any], float] | None = None,
+	) -> Iterator[Record]:
+		for shard in self._shards:
+			with shard.lock:
+				records = list(shard._snapshot_records(depth_of, deadline_of))  # noqa: SLF001
+			yield from records
+
+
+	def snapshot(
+		self: ShardedLazyCache, path: PathType,
+		depth_of: Callable[[Any], int] | None = None,
+		deadline_of: Callable[[Any], float] | None = None,
+	) -> int:
+		"""Dump all shards into one binary file (each shard is locked only while it's read)."""
+		with gc_paused():
+			return write_snapshot(path, self._snapshot_records(depth_of, deadline_of))
+
+
+	def restore(
+		self: ShardedLazyCache, path: PathType,
+		make_obj: Callable[[int], Any] | None = None,
+	) -> list[key_obj]:
+		"""Load snapshot into shards by key hash, return restored keys."""
+		per_shard: list[list[Entry]] = [[] for _ in self._shards]
+		keys: list[key_obj] = []
+		with gc_paused():
+			for entry in snapshot_entries(path, make_obj):
+				per_shard[hash(entry[0]) % self._count].append(entry)
+			for shard, entries in zip(self._shards, per_shard):
+				with shard.lock:
+					keys.extend(shard._restore_items(entries))  # noqa: SLF001
+		return keys
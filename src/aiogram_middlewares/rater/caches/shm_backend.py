@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from multiprocessing.context import get_spawning_popen
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from aiogram_middlewares.rater.models import RateData
+
+from .backend import AsyncRateBackend, HitVerdict, RateHit
+
+if TYPE_CHECKING:
+	from multiprocessing.context import BaseContext
+	from multiprocessing.synchronize import Lock
+	from typing import Any, Sequence
+
+	from aiogram_middlewares.rater.types import ttl_type
+
+
+logger = logging.getLogger(__name__)
+
+
+# Key (int64, 0 is empty), deadline (`time.monotonic`, system-wide), rate, sent warnings
+SLOT = Struct('<qdII')
+_EMPTY = 0
+
+
+class SharedMemoryRateBackend(AsyncRateBackend):
+	"""Rate table in shared memory for worker processes on one host.
+
+	Fixed-width slots of open-addressing hash table keyed by int64 user id.
+	Table is split into `stripes` independent regions each guarded by own lock,
+	probing is bounded by `max_probe` slots of the region. When the window is full
+	of live users, update of a new one is rejected (`DROP`, counted by `full_rejects`),
+	live ones are never evicted. No serialization, no timers.
+
+	Create it before forking workers (locks are inherited), or pass it
+	as `multiprocessing.Process` argument (with the same `mp_context`).
+	"""
+
+	def __init__(
+		self: SharedMemoryRateBackend, name: str | None = None, *,
+		capacity: int = 1 << 16, stripes: int = 64, max_probe: int = 16,
+		create: bool = True, locks: Sequence[Lock] | None = None,
+		mp_context: BaseContext | None = None,
+	) -> None:
+		if stripes < 1 or capacity < stripes:
+			msg = f'Expected `capacity` >= `stripes` >= 1, `{capacity=}`, `{stripes=}`'
+			raise ValueError(msg)
+		if max_probe < 1:
+			msg = f'`max_probe` must be positive, `{max_probe=}`'
+			raise ValueError(msg)
+
+		self._region = capacity // stripes
+		self._stripes = stripes
+		self._capacity = self._region * stripes
+		self._max_probe = min(max_probe, self._region)
+
+		self._shm = SharedMemory(
+			name=name, create=create,
+			size=self._capacity * SLOT.size if create else 0,
+		)
+		if create:
+			# Fresh memory is zeroed - all slots are empty
+			context = mp_context or multiprocessing.get_context()
+			locks = [context.Lock() for _ in range(stripes)]
+		elif locks is None or len(locks) != stripes:
+			msg = 'Attaching to existing table requires its `locks` (one per stripe)'
+			raise ValueError(msg)
+		self._locks: tuple[Lock, ...] = tuple(locks)  # type: ignore
+		self._buf = self._shm.buf
+		self._is_owner = create
+		# Rejected updates of this process because of full table window
+		self.full_rejects = 0
+
+
+	@property
+	def name(self: SharedMemoryRateBackend) -> str:
+		return self._shm.name
+
+
+	def __getstate__(self: SharedMemoryRateBackend) -> dict[str, Any]:
+		# Attach in spawned process, locks can be pickled only while spawning
+		if get_spawning_popen() is None:
+			msg = (
+				f'`{self.__class__.__name__}` is shared only with worker processes '
+				'(by fork or as `Process` argument), its locks are not picklable otherwise'
+			)
+			raise TypeError(msg)
+		return {
+			'name': self._shm.name, 'capacity': self._capacity, 'stripes': self._stripes,
+			'max_probe': self._max_probe, 'locks': self._locks,
+		}
+
+
+	def __setstate__(self: SharedMemoryRateBackend, state: dict[str, Any]) -> None:
+		self.__init__(create=False, **state)  # type: ignore
+
+
+	def _home(self: SharedMemoryRateBackend, key: int) -> tuple[int, int]:
+		"""Return stripe & home slot offset in its region."""
+		# Fibonacci hashing to spread sequential ids
+		mixed = (key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+		return mixed % self._stripes, (mixed >> 32) % self._region
+
+
+	def _find(
+		self: SharedMemoryRateBackend, key: int, stripe: int, home: int, now: float,
+	) -> tuple[int, bool]:
+		"""Return offset of key's slot (or free one, -1 if none) & is key alive (under lock)."""
+		buf = self._buf
+		base = stripe * self._region
+		region = self._region
+		unpack_from = SLOT.unpack_from
+		free = -1
+		for i in range(self._max_probe):
+			offset = (base + (home + i) % region) * SLOT.size
+			slot_key, deadline, _, _ = unpack_from(buf, offset)
+			if slot_key == key and deadline > now:
+				return offset, True
+			if free < 0 and (slot_key == _EMPTY or deadline <= now):
+				free = offset
+		return free, False
+
+
+	def _hit(
+		self: SharedMemoryRateBackend, key: int, ttl: ttl_type,
+		limit: int, warnings_limit: int, *, debounce: bool,
+	) -> RateHit:
+		stripe, home = self._home(key)
+		with self._locks[stripe]:
+			now = monotonic()
+			offset, is_alive = self._find(key, stripe, home, now)
+			if offset < 0:
+				self.full_rejects += 1
+				logger.debug('Rate table window is full, update of %s is rejected', key)
+				return RateHit(
+					rate=limit, sent_warning_count=warnings_limit,
+					verdict=HitVerdict.DROP, remaining=ttl,
+				)
+			if is_alive:
+				_, deadline, rate, warns = SLOT.unpack_from(self._buf, offset)
+				if debounce:
+					deadline = now + ttl
+			else:
+				deadline, rate, warns = now + ttl, 0, 0
+
+			hit = RateHit(rate=rate, sent_warning_count=warns)
+			if rate < limit:
+				rate += 1
+			elif warns < warnings_limit:
+				warns += 1
+				hit.verdict = HitVerdict.WARN
+			else:
+				hit.verdict = HitVerdict.DROP
+			SLOT.pack_into(self._buf, offset, key, deadline, rate, warns)
+		hit.remaining = deadline - now
+		return hit
+
+
+	async def hit(
+		self: SharedMemoryRateBackend, key: int, ttl: ttl_type,
+		limit: int, warnings_limit: int = 0, *, debounce: bool = True,
+	) -> RateHit:
+		return self._hit(key, ttl, limit, warnings_limit, debounce=debounce)
+
+
+	async def hit_many(
+		self: SharedMemoryRateBackend, keys: Sequence[int], ttl: ttl_type,
+		limit: int, warnings_limit: int = 0, *, debounce: bool = True,
+	) -> list[RateHit]:
+		return [self._hit(key, ttl, limit, warnings_limit, debounce=debounce) for key in keys]
+
+
+	async def get(self: SharedMemoryRateBackend, key: int) -> RateData | None:
+		stripe, home = self._home(key)
+		with self._locks[stripe]:
+			offset, is_alive = self._find(key, stripe, home, monotonic())
+			if not is_alive:
+				return None
+			_, _, rate, warns = SLOT.unpack_from(self._buf, offset)
+		return RateData(rate=rate, sent_warning_count=warns)
+
+
+	async def delete(self: SharedMemoryRateBackend, key: int) -> bool:
+		stripe, home = self._home(key)
+		with self._locks[stripe]:
+			offset, is_alive = self._find(key, stripe, home, monotonic())
+			if is_alive:
+				SLOT.pack_into(self._buf, offset, _EMPTY, 0, 0, 0)
+		return is_alive
+
+
+	async def close(self: SharedMemoryRateBackend) -> None:
+		"""Detach from the table (owner also frees it)."""
+		del self._buf
+		self._shm.close()
+		if self._is_owner:
+			self._shm.unlink()
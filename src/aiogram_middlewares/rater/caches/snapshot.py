@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import gc
+import logging
+import os
+from contextlib import contextmanager
+from struct import Struct
+from time import time
+from typing import TYPE_CHECKING
+
+from aiogram_middlewares.rater.models import RateData
+
+if TYPE_CHECKING:
+	from typing import Any, Callable, Generator, Iterable, Iterator, Tuple, Union
+
+	PathType = Union[str, os.PathLike]
+	# Key, remaining ttl, rate, sent warnings, throttle queue depth
+	Record = Tuple[int, float, int, int, int]
+	# Key, value, obj, remaining ttl
+	Entry = Tuple[int, RateData, Any, float]
+
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b'AMRS'
+VERSION = 1
+# Magic, version, records count, wall clock time of the snapshot
+HEADER = Struct('<4sHxxQd')
+RECORD = Struct('<qdIII')
+
+_CHUNK = 1 << 14  # Records per write
+
+
+@contextmanager
+def gc_paused() -> Generator[None, None, None]:
+	"""Pause cyclic GC (millions of new objects trigger full collections again & again)."""
+	is_enabled = gc.isenabled()
+	gc.disable()
+	try:
+		yield
+	finally:
+		if is_enabled:
+			gc.enable()
+
+
+def write_snapshot(path: PathType, records: Iterable[Record]) -> int:
+	"""Write records incrementally (by chunks) & atomically replace the file."""
+	tmp_path = f'{os.fspath(path)}.tmp'
+	pack_into = RECORD.pack_into
+	size = RECORD.size
+	chunk = bytearray(size * _CHUNK)
+	count = 0
+	pos = 0
+	with open(tmp_path, 'wb') as file:
+		file.write(bytes(HEADER.size))  # Placeholder, count is unknown yet
+		for record in records:
+			pack_into(chunk, pos, *record)
+			pos += size
+			count += 1
+			if pos == len(chunk):
+				file.write(chunk)
+				pos = 0
+		file.write(memoryview(chunk)[:pos])
+		file.seek(0)
+		file.write(HEADER.pack(MAGIC, VERSION, count, time()))
+	os.replace(tmp_path, path)
+	logger.debug('Snapshot of %i items written to `%s`', count, path)
+	return count
+
+
+def read_snapshot(path: PathType) -> tuple[float, Iterator[Record]]:
+	"""Return wall clock time of the snapshot & its records."""
+	with open(path, 'rb') as file:
+		data = file.read()
+	magic, version, count, saved_at = HEADER.unpack_from(data)
+	if magic != MAGIC or version != VERSION:
+		msg = f'Not a rater snapshot (or unsupported version `{version}`): `{path}`'
+		raise ValueError(msg)
+	end = HEADER.size + count * RECORD.size
+	if len(data) < end:
+		msg = f'Snapshot `{path}` is truncated'
+		raise ValueError(msg)
+	return saved_at, RECORD.iter_unpack(memoryview(data)[HEADER.size:end])
+
+
+def snapshot_entries(
+	path: PathType, make_obj: Callable[[int], Any] | None = None,
+) -> Iterator[Entry]:
+	"""Yield still alive items of the snapshot with ttl reduced by downtime."""
+	saved_at, records = read_snapshot(path)
+	downtime = max(time() - saved_at, 0)
+	for key, remaining, rate, warns, depth in records:
+		remaining -= downtime
+		if remaining > 0:
+			yield (
+				key, RateData(rate=rate, sent_warning_count=warns),
+				make_obj(depth) if make_obj is not None else None, remaining,
+			)
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from .lazy_ttl import CacheKeyError, ExpiryKind
+
+if TYPE_CHECKING:
+	from typing import Any, Callable, Iterable, Sequence, Tuple
+
+	from .lazy_ttl import CacheItem, LazyMemoryCache, key_obj
+
+	# Live keys, pending timers
+	Gauges = Callable[[], Tuple[int, int]]
+
+
+logger = logging.getLogger(__name__)
+
+
+# Upper bounds (seconds) of lateness buckets, the last one is for the rest
+LATENESS_BOUNDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Default of instrumented batch get to count misses (values could be falsy)
+_MISSING = object()
+
+_COUNTERS = (
+	'hits',
+	'misses',
+	'sets',
+	'expirations',
+	'callbacks',
+	'callback_errors',
+	'key_errors',
+	'evictions',
+)
+
+
+class LatencyHistogram:
+	"""Fixed buckets histogram of expiry callbacks lateness (actual minus scheduled time)."""
+
+	__slots__ = (
+		'bounds',
+		'counts',
+		'total',
+		'max',
+	)
+
+	def __init__(self: LatencyHistogram, bounds: Sequence[float] = LATENESS_BOUNDS) -> None:
+		self.bounds = tuple(bounds)
+		self.counts = [0] * (len(self.bounds) + 1)
+		self.total = 0.0
+		self.max = 0.0
+
+
+	@property
+	def count(self: LatencyHistogram) -> int:
+		return sum(self.counts)
+
+
+	def observe(self: LatencyHistogram, value: float) -> None:
+		if value < 0:
+			value = 0.0  # Fired a bit earlier (clock granularity)
+		self.counts[bisect_left(self.bounds, value)] += 1
+		self.total += value
+		if value > self.max:
+			self.max = value
+
+
+	def merge(self: LatencyHistogram, other: LatencyHistogram) -> None:
+		for i, count in enumerate(other.counts):
+			self.counts[i] += count
+		self.total += other.total
+		self.max = max(self.max, other.max)
+
+
+	def reset(self: LatencyHistogram) -> None:
+		self.counts = [0] * (len(self.bounds) + 1)
+		self.total = 0.0
+		self.max = 0.0
+
+
+	def as_dict(self: LatencyHistogram) -> dict[str, Any]:
+		labels = [f'le_{bound}' for bound in self.bounds] + ['inf']
+		return {
+			'buckets': dict(zip(labels, self.counts)),
+			'count': self.count, 'total': self.total, 'max': self.max,
+		}
+
+
+class CacheStats:
+	"""Counters & gauges of the cache, read them any time (synchronously) & `reset`.
+
+	Counters are plain ints bumped by instrumented methods bound to the cache
+	instance (see `instrument`), gauges are computed on read.
+	"""
+
+	__slots__ = (
+		*_COUNTERS,
+		'lateness',
+		'_gauges',
+		'_parts',
+	)
+
+	def __init__(
+		self: CacheStats, gauges: Gauges, lateness: LatencyHistogram | None = None,
+		parts: tuple[CacheStats, ...] = (),
+	) -> None:
+		self._gauges = gauges
+		self.lateness = lateness
+		self._parts = parts
+		self._zero()
+
+
+	def _zero(self: CacheStats) -> None:
+		for name in _COUNTERS:
+			setattr(self, name, 0)
+		if self.lateness is not None:
+			self.lateness.reset()
+
+
+	@classmethod
+	def merged(cls: type[CacheStats], parts: Sequence[CacheStats]) -> CacheStats:
+		"""Return sum of the stats (e.g. of cache shards), its `reset` resets the parts."""
+		lateness = None
+		if any(part.lateness is not None for part in parts):
+			lateness = LatencyHistogram(next(p.lateness for p in parts if p.lateness).bounds)  # type: ignore
+
+		def gauges() -> tuple[int, int]:
+			values = [part._gauges() for part in parts]  # noqa: SLF001
+			return sum(v[0] for v in values), sum(v[1] for v in values)
+
+		stats = cls(gauges, lateness, tuple(parts))
+		for name in _COUNTERS:
+			setattr(stats, name, sum(getattr(part, name) for part in parts))
+		if lateness is not None:
+			for part in parts:
+				if part.lateness is not None:
+					lateness.merge(part.lateness)
+		return stats
+
+
+	@property
+	def live_keys(self: CacheStats) -> int:
+		return self._gauges()[0]
+
+
+	@property
+	def timers(self: CacheStats) -> int:
+		"""Pending expiry timers.
+
+		Loop handles or wheel/group entries, sweeper for deadline caches.
+		"""
+		return self._gauges()[1]
+
+
+	def reset(self: CacheStats) -> None:
+		"""Zero the counters (gauges stay as is)."""
+		self._zero()
+		for part in self._parts:
+			part.reset()
+
+
+	def as_dict(self: CacheStats) -> dict[str, Any]:
+		live_keys, timers = self._gauges()
+		data: dict[str, Any] = {name: getattr(self, name) for name in _COUNTERS}
+		data['live_keys'] = live_keys
+		data['timers'] = timers
+		if self.lateness is not None:
+			data['lateness'] = self.lateness.as_dict()
+		return data
+
+
+	def __repr__(self: CacheStats) -> str:
+		args = ', '.join(
+			f'{name}={value}' for name, value in self.as_dict().items() if name != 'lateness'
+		)
+		return f'{self.__class__.__name__}({args})'
+
+
+# Methods rebound on the instance by `instrument`
+INSTRUMENTED = (
+	'get',
+	'get_many',
+	'get_or_create',
+	'set',
+	'set_many',
+	'_run_expiry',
+	'_get_item_strict',
+	'_evict',
+)
+
+
+def instrument(cache: LazyMemoryCache, *, lateness: bool = False) -> CacheStats:
+	"""Bind counting wrappers of the cache methods to the instance.
+
+	Class methods stay untouched, so cache without stats pays nothing
+	& `uninstrument` just drops instance attributes.
+	"""
+	stats = CacheStats(cache._stats_gauges, LatencyHistogram() if lateness else None)  # noqa: SLF001
+	histogram = stats.lateness
+
+	get = cache.get
+	get_many = cache.get_many
+	get_or_create = cache.get_or_create
+	set_ = cache.set
+	set_many = cache.set_many
+	has_key = cache.has_key
+	run_expiry = cache._run_expiry  # noqa: SLF001
+	get_item_strict = cache._get_item_strict  # noqa: SLF001
+
+	def get_counted(key: key_obj, default: Any = None) -> Any:
+		if has_key(key):
+			stats.hits += 1
+		else:
+			stats.misses += 1
+		return get(key, default)
+
+	def get_or_create_counted(
+		key: key_obj, factory: Callable[[], Any], ttl: Any, **kwargs: Any,
+	) -> Any:
+		if has_key(key):
+			stats.hits += 1
+		else:
+			stats.misses += 1
+		return get_or_create(key, factory, ttl, **kwargs)
+
+	def get_many_counted(keys: Iterable[key_obj], default: Any = None) -> list[Any]:
+		values = get_many(keys, _MISSING)
+		misses = 0
+		for i, value in enumerate(values):
+			if value is _MISSING:
+				values[i] = default
+				misses += 1
+		stats.hits += len(values) - misses
+		stats.misses += misses
+		return values
+
+	def set_counted(
+		key: key_obj, value: Any, obj: object = None, ttl: Any = 10,
+	) -> Any:
+		stats.sets += 1
+		return set_(key, value, obj, ttl)
+
+	def set_many_counted(
+		items: Iterable[tuple[key_obj, Any]], ttl: Any = 10, objs: Iterable[object] | None = None,
+	) -> int:
+		before = stats.sets
+		count = set_many(items, ttl, objs)
+		# Bounded caches set one by one (already counted)
+		if stats.sets == before:
+			stats.sets += count
+		return count
+
+	def run_expiry_counted(key: key_obj, item: CacheItem) -> None:
+		stats.expirations += 1
+		if histogram is not None:
+			# Default loop's clock is `time.monotonic`
+			deadline = getattr(item, 'deadline', None)
+			histogram.observe(
+				monotonic() - (item.handle.when() if deadline is None else deadline),
+			)
+		if item.kind is not ExpiryKind.DELETE:
+			stats.callbacks += 1
+		try:
+			run_expiry(key, item)
+		except Exception:
+			stats.callback_errors += 1
+			raise
+
+	def get_item_strict_counted(key: key_obj) -> CacheItem:
+		try:
+			return get_item_strict(key)
+		except CacheKeyError:
+			stats.key_errors += 1
+			raise
+
+	wrappers: dict[str, Callable] = {
+		'get': get_counted,
+		'get_many': get_many_counted,
+		'get_or_create': get_or_create_counted,
+		'set': set_counted,
+		'set_many': set_many_counted,
+		'_run_expiry': run_expiry_counted,
+		'_get_item_strict': get_item_strict_counted,
+	}
+	evict = getattr(cache, '_evict', None)
+	if evict is not None:
+		def evict_counted() -> None:
+			stats.evictions += 1
+			evict()
+		wrappers['_evict'] = evict_counted
+
+	for name, wrapper in wrappers.items():
+		setattr(cache, name, wrapper)
+	return stats
+
+
+def uninstrument(cache: LazyMemoryCache) -> None:
+	"""Drop counting wrappers (class methods are used again)."""
+	attrs = vars(cache)
+	for name in INSTRUMENTED:
+		attrs.pop(name, None)
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from math import ceil
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from asyncio import AbstractEventLoop, TimerHandle
+	from typing import Any, Callable
+
+	from aiogram_middlewares.rater.types import ttl_type
+
+
+logger = logging.getLogger(__name__)
+
+
+class WheelTimer:
+	"""Timer entry of `TimerWheel` (quacks like `asyncio.TimerHandle`)."""
+
+	__slots__ = (
+		'_when',
+		'_callback',
+		'_args',
+		'_cancelled',
+		'_bucket',
+		'_wheel',
+	)
+
+	def __init__(
+		self: WheelTimer, wheel: TimerWheel, when: float,
+		callback: Callable, args: tuple[Any, ...],
+	) -> None:
+		self._wheel = wheel
+		self._when = when
+		self._callback = callback
+		self._args = args
+		self._cancelled = False
+		self._bucket: dict[WheelTimer, None] | None = None
+
+
+	def when(self: WheelTimer) -> float:
+		"""Return scheduled time (in event loop's clock)."""
+		return self._when
+
+
+	def cancel(self: WheelTimer) -> None:
+		"""Cancel the timer (O(1), just detach from the wheel slot)."""
+		self._cancelled = True
+		self._wheel._detach(self)  # noqa: SLF001
+
+
+	def cancelled(self: WheelTimer) -> bool:
+		return self._cancelled
+
+
+	def set_callback(self: WheelTimer, callback: Callable, *args: Any) -> None:
+		"""Replace callback without touching the deadline."""
+		self._callback = callback
+		self._args = args
+
+
+# TODO: Mb make it per-loop singleton..
+class TimerWheel:
+	"""Hierarchical hashed timer wheel driven by one event loop callback.
+
+	Each level has `1 << slot_bits` slots, level `n` slot covers `tick * slots ** n` seconds,
+	so with defaults (0.1 sec tick, 64 slots, 4 levels) timers up to ~19 days
+	are placed without cascading more than 3 times. Timers fire at most one tick late.
+	Scheduling, moving & cancelling timers are O(1) and don't touch event loop's heap.
+	"""
+
+	def __init__(
+		self: TimerWheel, tick: ttl_type = 0.1,
+		loop: AbstractEventLoop | None = None,
+		slot_bits: int = 6, levels: int = 4,
+	) -> None:
+		if tick <= 0:
+			msg = f'`tick` must be positive, `{tick=}`'
+			raise ValueError(msg)
+		if slot_bits < 1 or levels < 1:
+			msg = f'`slot_bits` & `levels` must be positive, `{slot_bits=}`, `{levels=}`'
+			raise ValueError(msg)
+
+		self._tick = tick
+		self._loop = loop
+
+		self._bits = slot_bits
+		self._mask = (1 << slot_bits) - 1
+		self._spans: tuple[int, ...] = tuple(
+			1 << (slot_bits * (level + 1)) for level in range(levels)
+		)
+		self._wheels: tuple[tuple[dict[WheelTimer, None], ...], ...] = tuple(
+			tuple({} for _ in range(1 << slot_bits)) for _ in range(levels)
+		)
+
+		self._tick_no: int | None = None  # Last processed tick
+		self._count = 0
+		self._driver: TimerHandle | None = None
+
+
+	def __len__(self: TimerWheel) -> int:
+		"""Return count of pending timers."""
+		return self._count
+
+
+	@property
+	def tick(self: TimerWheel) -> ttl_type:
+		return self._tick
+
+
+	def _bind_loop(self: TimerWheel) -> AbstractEventLoop:
+		if self._loop is None:
+			self._loop = asyncio.get_running_loop()
+		if self._tick_no is None:
+			self._tick_no = self._current_tick()
+		return self._loop
+
+
+	def _current_tick(self: TimerWheel) -> int:
+		assert self._loop  # plug for linter
+		# Small epsilon against float rounding on the tick edge
+		return int(self._loop.time() / self._tick + 1e-6)
+
+
+	def time(self: TimerWheel) -> float:
+		"""Return event loop's current time."""
+		return self._bind_loop().time()
+
+
+	def call_at(
+		self: TimerWheel, when: float,
+		callback: Callable, *args: Any,
+	) -> WheelTimer:
+		"""Schedule callback at the loop time `when` (like `loop.call_at`)."""
+		self._bind_loop()
+		timer = WheelTimer(self, when, callback, args)
+		self._insert(timer)
+		return timer
+
+
+	def call_later(
+		self: TimerWheel, delay: ttl_type,
+		callback: Callable, *args: Any,
+	) -> WheelTimer:
+		"""Schedule callback after `delay` seconds (like `loop.call_later`)."""
+		return self.call_at(self._bind_loop().time() + delay, callback, *args)
+
+
+	def move_at(self: TimerWheel, timer: WheelTimer, when: float) -> WheelTimer:
+		"""Move (or re-activate fired/cancelled) timer to the loop time `when` in O(1)."""
+		self._detach(timer)
+		timer._when = when  # noqa: SLF001
+		timer._cancelled = False  # noqa: SLF001
+		self._insert(timer)
+		return timer
+
+
+	def move(self: TimerWheel, timer: WheelTimer, delay: ttl_type) -> WheelTimer:
+		"""Move timer to fire after `delay` seconds from now."""
+		return self.move_at(timer, self._bind_loop().time() + delay)
+
+
+	def _detach(self: TimerWheel, timer: WheelTimer) -> None:
+		bucket = timer._bucket  # noqa: SLF001
+		if bucket is None:
+			return
+		bucket.pop(timer, None)
+		timer._bucket = None  # noqa: SLF001
+		self._count -= 1
+
+
+	def _insert(self: TimerWheel, timer: WheelTimer) -> None:
+		assert self._tick_no is not None  # plug for linter
+		# Never into already processed tick
+		self._place(timer, max(ceil(timer._when / self._tick), self._tick_no + 1))  # noqa: SLF001
+		self._count += 1
+		if self._driver is None:
+			self._arm()
+
+
+	def _place(self: TimerWheel, timer: WheelTimer, tick_no: int) -> None:
+		assert self._tick_no is not None  # plug for linter
+		delta = tick_no - self._tick_no
+		last = len(self._wheels) - 1
+		for level, span in enumerate(self._spans):
+			if delta < span or level == last:
+				bucket = self._wheels[level][(tick_no >> (self._bits * level)) & self._mask]
+				break
+		bucket[timer] = None
+		timer._bucket = bucket  # noqa: SLF001
+
+
+	def _arm(self: TimerWheel) -> None:
+		assert self._loop  # plug for linter
+		assert self._tick_no is not None  # plug for linter
+		self._driver = self._loop.call_at((self._tick_no + 1) * self._tick, self._run)
+
+
+	def _run(self: TimerWheel) -> None:
+		"""Process all elapsed ticks (single loop callback for all timers)."""
+		self._driver = None
+		assert self._tick_no is not None  # plug for linter
+		target = self._current_tick()
+		while self._tick_no < target and self._count:
+			self._step(self._tick_no + 1)
+		# Nothing to do - just jump to the current tick
+		self._tick_no = max(self._tick_no, target)
+		if self._count and self._driver is None:
+			self._arm()
+
+
+	def _step(self: TimerWheel, tick_no: int) -> None:
+		self._tick_no = tick_no
+		bits, mask = self._bits, self._mask
+
+		# Cascade upper levels (from the top one) down on their slot boundaries
+		top = 0
+		for level in range(1, len(self._wheels)):
+			if tick_no & ((1 << (bits * level)) - 1):
+				break
+			top = level
+		for level in range(top, 0, -1):
+			bucket = self._wheels[level][(tick_no >> (bits * level)) & mask]
+			if not bucket:
+				continue
+			timers = list(bucket)
+			bucket.clear()
+			for timer in timers:
+				self._place(timer, max(ceil(timer._when / self._tick), tick_no))  # noqa: SLF001
+
+		bucket = self._wheels[0][tick_no & mask]
+		if not bucket:
+			return
+		timers = list(bucket)
+		bucket.clear()
+		for timer in timers:
+			# Cancelled or moved by previous callbacks
+			if timer._bucket is not bucket:  # noqa: SLF001
+				continue
+			timer._bucket = None  # noqa: SLF001
+			self._count -= 1
+			self._fire(timer)
+
+
+	def _fire(self: TimerWheel, timer: WheelTimer) -> None:
+		try:
+			timer._callback(*timer._args)  # noqa: SLF001
+		except (SystemExit, KeyboardInterrupt):
+			raise
+		except BaseException as exc:  # noqa: BLE001
+			assert self._loop  # plug for linter
+			self._loop.call_exception_handler({
+				'message': f'Exception in timer wheel callback {timer._callback!r}',  # noqa: SLF001
+				'exception': exc,
+				'handle': timer,
+			})
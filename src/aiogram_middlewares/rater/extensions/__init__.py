@@ -1,9 +1,63 @@
-from .debouncing import RateDebouncable  # noqa: F401
-from .notify import (  # noqa: F401
-    RateNotifyBase,
-    RateNotifyCalmed,
-    RateNotifyCC,
-    RateNotifyCooldown,
-)
-from .serializable import RateSerializable  # noqa: F401
-from .throttling import *  # noqa: F403
+from __future__ import annotations
+
+import sys
+
+from aiogram_middlewares.utils import lazy_module_getattr
+
+# Extensions are imported on first access (by the assembler), so only used ones are loaded
+_MODULES: dict[str, str] = {
+	'RateBackendable': '.backend',
+	'RateDebouncable': '.debouncing',
+	'RateGCRA': '.gcra',
+	'RateNotifyBase': '.notify',
+	'RateNotifyCalmed': '.notify',
+	'RateNotifyCC': '.notify',
+	'RateNotifyCooldown': '.notify',
+	'RateSerializable': '.serializable',
+	'RateMultiWindow': '.sliding',
+	'RateSlidingBase': '.sliding',
+	'RateSlidingLog': '.sliding',
+	'RateSlidingWindow': '.sliding',
+	'LeakScheduler': '.throttling',
+	'RaterThrottleBase': '.throttling',
+	'RateThrottleNotifyBase': '.throttling',
+	'RateThrottleNotifyBaseSerializable': '.throttling',
+	'RateThrottleNotifyCalmed': '.throttling',
+	'RateThrottleNotifyCC': '.throttling',
+	'RateThrottleNotifyCooldown': '.throttling',
+	'ThrottleQueueFull': '.throttling',
+	'ThrottleSemaphore': '.throttling',
+}
+
+__getattr__ = lazy_module_getattr(__name__, _MODULES)
+
+# Star import gets all (imports optional parts)
+__all__ = [
+	'RateBackendable',
+	'RateDebouncable',
+	'RateGCRA',
+	'RateNotifyBase',
+	'RateNotifyCalmed',
+	'RateNotifyCC',
+	'RateNotifyCooldown',
+	'RateSerializable',
+	'RateMultiWindow',
+	'RateSlidingBase',
+	'RateSlidingLog',
+	'RateSlidingWindow',
+	'LeakScheduler',
+	'RaterThrottleBase',
+	'RateThrottleNotifyBase',
+	'RateThrottleNotifyBaseSerializable',
+	'RateThrottleNotifyCalmed',
+	'RateThrottleNotifyCC',
+	'RateThrottleNotifyCooldown',
+	'ThrottleQueueFull',
+	'ThrottleSemaphore',
+]
+
+
+def loaded(name: str) -> type | None:
+	"""Return extension if its module is imported, else None (no rater can have it then)."""
+	module = sys.modules.get(__name__ + _MODULES[name])
+	return None if module is None else getattr(module, name, None)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from aiogram_middlewares.rater.base import RaterAttrsABC
+from aiogram_middlewares.rater.caches.backend import HitVerdict
+
+if TYPE_CHECKING:
+	from typing import Sequence
+
+	from aiogram import Bot
+	from aiogram.types import User
+
+	from aiogram_middlewares.rater.caches.backend import AsyncRateBackend, RateHit
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateBackendable(RaterAttrsABC):
+	"""Keep rate state in the (out of process) backend, one atomic hit per update.
+
+	Hit returns counters as before the update, so notify & base middlewares
+	work unchanged. Local cache only mirrors exceeded users (with remaining ttl)
+	to fire calmed notifications on time.
+	"""
+
+	def __init__(
+		self: RateBackendable, backend: AsyncRateBackend, *,
+		topping_up: bool,
+	) -> None:
+		self.backend = backend
+		self.topping_up = topping_up
+		# No cooldown messages - no need to count warnings
+		self._warnings_limit: int = (
+			getattr(self, 'warnings_count', 0) if getattr(self, 'cooldown_message', None) else 0
+		)
+		self._is_mirror_calmed = getattr(self, 'calmed_message', None) is not None
+
+
+	async def trigger(
+		self: RateBackendable, event_user: User, ttl: int, bot: Bot,
+	) -> RateHit:
+		return await self._trigger(event_user, ttl, bot)
+
+
+	async def _trigger(
+		self: RateBackendable, event_user: User, ttl: int, bot: Bot,  # noqa: ARG002
+	) -> RateHit:
+		"""Count up the update in the backend (local cache is only a mirror)."""
+		hit = await self.backend.hit(
+			event_user.id, ttl, self.after_handle_count, self._warnings_limit,
+			debounce=self.topping_up,
+		)
+		if hit.verdict is not HitVerdict.PASS and self._is_mirror_calmed:
+			self._mirror(event_user.id, hit)
+		return hit
+
+
+	def _mirror(self: RateBackendable, key: int, hit: RateHit) -> None:
+		cache = self._cache
+		if cache.has_key(key):
+			# Keeps plugged calmed callback
+			cache.expire(key, hit.remaining)
+		else:
+			cache.set(key, hit, ttl=hit.remaining)
+
+
+	async def _trigger_many(self: RateBackendable, event_users: Sequence[User]) -> list[RateHit]:
+		"""Count up the batch of updates in the backend in one round trip."""
+		hits = await self.backend.hit_many(
+			[event_user.id for event_user in event_users], self.period_sec,
+			self.after_handle_count, self._warnings_limit, debounce=self.topping_up,
+		)
+		if self._is_mirror_calmed:
+			for event_user, hit in zip(event_users, hits):
+				if hit.verdict is not HitVerdict.PASS:
+					self._mirror(event_user.id, hit)
+		return hits
@@ -7,7 +7,6 @@ from aiogram_middlewares.rater.base import RaterAttrsABC
 
 if TYPE_CHECKING:
 
-	from aiogram import Bot
 	from aiogram.types import User
 	from base import RaterBase
 
@@ -19,13 +18,12 @@ logger = logging.getLogger(__name__)
 
 class RateDebouncable(RaterAttrsABC):
 
+	_is_debounced = True
+
 	# TODO: Flag too..
-	async def trigger(
-		self: RaterBase | RateDebouncable, throttling_data: RateData | None,
-		event_user: User, ttl: int, bot: Bot,
+	def trigger_sync(
+		self: RaterBase | RateDebouncable, event_user: User, ttl: int,
 	) -> RateData:
 		"""Debouncing."""
-		throttling_data = await self._trigger(throttling_data, event_user, ttl, bot)
-		# Reset ttl for item (topping/debouncing)
-		self._cache.expire(event_user.id, ttl)
-		return throttling_data
+		# Reset ttl for item (topping/debouncing) by the same lookup
+		return self._trigger_sync(event_user, ttl, touch=True)
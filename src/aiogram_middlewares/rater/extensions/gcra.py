@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from aiogram_middlewares.rater.base import RaterAttrsABC
+from aiogram_middlewares.rater.models import RateVerdict
+
+if TYPE_CHECKING:
+	from typing import Any, Sequence
+
+	from aiogram import Bot
+	from aiogram.types import Update, User
+
+	from aiogram_middlewares.rater.caches import CacheItem
+	from aiogram_middlewares.rater.caches.snapshot import PathType
+	from aiogram_middlewares.rater.extensions.throttling.locks import PositiveFloat, PositiveInt
+	from aiogram_middlewares.rater.types import HandleData, HandleType
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateGCRA(RaterAttrsABC):
+	"""Generic cell rate algorithm: `after_handle_count` updates per `period_sec`.
+
+	The only state per user is a float in the cache - theoretical arrival time (TAT)
+	of the next update (by `time.monotonic`). Update is allowed from
+	`TAT - period_sec + interval`, earlier ones are delayed exactly till then,
+	or rejected with retry-after if the delay is longer than `max_delay`
+	(bounded by default, unbounded one keeps a sleeping task per over-limit update).
+	No tasks & no semaphores, item just expires when TAT is reached.
+	"""
+
+	def __init__(
+		self: RateGCRA, max_delay: PositiveFloat | None,
+		cooldown_message: str | None, calmed_message: str | None,
+		warnings_count: PositiveInt,
+	) -> None:
+		if max_delay is not None and max_delay < 0:
+			msg = f'`max_delay` must be positive or zero, `{max_delay=}`'
+			raise ValueError(msg)
+		if warnings_count < 0:
+			msg = f'`warnings_count` must be positive, `{warnings_count=}`'
+			raise ValueError(msg)
+
+		self.max_delay = max_delay
+		self.interval = self.period_sec / self.after_handle_count
+		# Burst tolerance (whole limit at once)
+		self.tolerance = self.period_sec - self.interval
+
+		self.cooldown_message = cooldown_message
+		self.calmed_message = calmed_message
+		self.warnings_count = warnings_count
+
+
+	def reserve(self: RateGCRA, key: int) -> tuple[bool, float]:
+		"""Count up the update, return is it allowed & delay before handling (or retry-after).
+
+		Rejected updates aren't counted.
+		"""
+		cache = self._cache
+		with cache.lock_of(key):
+			now = monotonic()
+			item = cache.get_item(key)
+			if item is None:
+				# New one is never delayed (burst tolerance is the whole limit)
+				tat = now + self.interval
+				cache.get_or_create(key, lambda: tat, self.interval, callback=self._on_tat_reached)
+				return True, 0.0
+
+			tat = max(cache.value_of(item), now)
+			delay = tat - self.tolerance - now
+			if delay > 0 and self.max_delay is not None and delay > self.max_delay:
+				return False, delay
+
+			# Item's timer is rearmed on expiry (if TAT moved), not on every update
+			cache.update_item(key, item, tat + self.interval)
+		return True, max(delay, 0.0)
+
+
+	def _on_tat_reached(self: RateGCRA, key: int, item: CacheItem) -> None:
+		"""Prolong item till its (moved) TAT, else drop it & send calmed notification."""
+		cache = self._cache
+		remaining = cache.value_of(item) - monotonic()
+		if remaining > 0:
+			cache.expire(key, remaining)
+			return
+		cache.delete(key)
+		if item.obj is not None and self.calmed_message is not None:
+			_, bot = item.obj
+			self.get_notifier().defer(bot, key, self.calmed_message)
+
+
+	def on_exceed_rate(
+		self: RateGCRA, retry_after: float, event_user: User, bot: Bot,
+	) -> None:
+		"""Send cooldown warnings (`warnings_count` till calmed) & mark user for calmed one."""
+		notifier = self.get_notifier()  # Bind on the bot's loop (expiry could be on other)
+		with self._cache.lock_of(event_user.id):
+			item = self._cache.get_item(event_user.id)
+			if item is None:
+				return
+			warns = item.obj[0] if item.obj is not None else 0
+			# Item's `obj` isn't serialized, so the state is still single float
+			item.obj = (warns + 1, bot)
+		logger.debug(
+			'[%s] User %s rejected, retry after %.03f sec.',
+			self.__class__.__name__, event_user.username, retry_after,
+		)
+		if self.cooldown_message is not None and warns < self.warnings_count:
+			notifier.send(bot, event_user.id, self.cooldown_message)
+
+
+	async def trigger(
+		self: RateGCRA, event_user: User, ttl: int, bot: Bot,  # noqa: ARG002
+	) -> Any:
+		# Counting is done by `reserve`
+		return None
+
+
+	async def _trigger_many(self: RateGCRA, event_users: Sequence[User]) -> list[Any]:
+		return [None] * len(event_users)
+
+
+	async def classify_many(self: RateGCRA, event_users: Sequence[User]) -> list[RateVerdict]:
+		"""Count batch of updates, delayed ones (up to `max_delay`) are `THROTTLE`."""
+		verdicts = []
+		for event_user in event_users:
+			is_allowed, delay = self.reserve(event_user.id)
+			if not is_allowed:
+				verdicts.append(RateVerdict.DROP)
+			else:
+				verdicts.append(RateVerdict.THROTTLE if delay else RateVerdict.PASS)
+		return verdicts
+
+
+	async def middleware(
+		self: RateGCRA,
+		handle: HandleType | None,
+		event: Update | None,
+		event_user: User,
+		data: HandleData,
+		bot: Bot,
+		rate_data: Any,  # noqa: ARG002
+	) -> Any:
+		is_allowed, delay = self.reserve(event_user.id)
+		if not is_allowed:
+			self.on_exceed_rate(delay, event_user, bot)
+			return None if handle is not None else False
+		if delay:
+			await asyncio.sleep(delay)
+		if handle is None:
+			# Filter
+			return True
+		return await handle(event, data)  # type: ignore
+
+
+	def snapshot(self: RateGCRA, path: PathType) -> int:
+		"""Dump users TAT (as remaining ttl) into the file."""
+		# Timers are rearmed lazily, TAT is the real expiry
+		return self._cache.snapshot(path, deadline_of=float)
+
+
+	def restore(self: RateGCRA, path: PathType) -> int:
+		"""Load users from `snapshot` file, TAT is restored from remaining ttl."""
+		cache = self._cache
+		keys = cache.restore(path)
+		now = monotonic()
+		for key in keys:
+			cache.update(key, now + cache.remaining_of(key))
+			cache.replace_handle_sync_callback(key, self._on_tat_reached)
+		return len(keys)
@@ -2,20 +2,19 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
+from types import MethodType
 from typing import TYPE_CHECKING
 
 from aiogram_middlewares.rater.base import RaterAttrsABC
+from aiogram_middlewares.rater.models import RateVerdict
 
 if TYPE_CHECKING:
 
-	from typing import Any
-
 	from aiogram import Bot
-	from aiogram.types import Update, User
+	from aiogram.types import User
 	from pydantic.types import PositiveInt
 
-	from aiogram_middlewares.rater.base import HandleType
-	from aiogram_middlewares.rater.types import HandleData
+	from aiogram_middlewares.rater.caches import CacheItem
 
 	from .models import RateData
 
@@ -28,25 +27,16 @@ class RateMiddleABC(RaterAttrsABC, ABC):
 	"""Abstract for middle bases after trigger (abc for dynamic combination)."""
 
 	@abstractmethod
-	async def on_exceed_rate(
-		self: RateMiddleABC,
-		handle: HandleType,
-		rate_data: RateData, event: Update, event_user: User, data: HandleData,
-		bot: Bot,
+	def on_exceed_rate(
+		self: RateMiddleABC, rate_data: RateData, event_user: User, bot: Bot,
 	) -> None:
 		raise NotImplementedError
 
 
 	@abstractmethod
-	async def _middleware(
-		self: RateMiddleABC,
-		handle: HandleType,
-		event: Update,
-		event_user: User,
-		data: HandleData,
-		bot: Bot,
-		rate_data: RateData,
-	) -> Any | None:
+	def decide(
+		self: RateMiddleABC, rate_data: RateData, event_user: User, bot: Bot,
+	) -> RateVerdict:
 		raise NotImplementedError
 
 
@@ -54,39 +44,24 @@ class RateNotifyBase(RateMiddleABC):
 
 
 	@abstractmethod
-	async def on_exceed_rate(
-		self: RateNotifyBase,
-		handle: HandleType,
-		rate_data: RateData, event: Update, event_user: User, data: HandleData,
-		bot: Bot,
+	def on_exceed_rate(
+		self: RateNotifyBase, rate_data: RateData, event_user: User, bot: Bot,
 	) -> None:
 		raise NotImplementedError
 
 
-	async def _middleware(
-		self: RateNotifyBase,
-		handle: HandleType,
-		event: Update,
-		event_user: User,
-		data: HandleData,
-		bot: Bot,
-		rate_data: RateData,
-	) -> Any | None:
-		"""Main middleware."""
-		##
-		is_not_exceed_rate = self.after_handle_count > rate_data.rate
-		# TODO: Mb one more variant(s) for debug.. (better by decorators..)
-
-		# proc/pass update action while not exceed rate limit (run times limit from `after_handle_count`)
-		if is_not_exceed_rate:
-			# count up rate & proc
-			return await self.proc_handle(
-				handle, rate_data, event, event_user,
-				data,
-			)
-
-		await self.on_exceed_rate(handle, rate_data, event, event_user, data, bot)
-		return None
+	def decide(
+		self: RateNotifyBase, rate_data: RateData, event_user: User, bot: Bot,
+	) -> RateVerdict:
+		"""Pass update while not exceed rate limit, else notify (notifications are enqueued)."""
+		# TODO: Mb one more variant(s) for debug..
+		# proc/pass update action while not exceed rate limit
+		# (run times limit from `after_handle_count`)
+		if self.after_handle_count > rate_data.rate:
+			return RateVerdict.PASS
+
+		self.on_exceed_rate(rate_data, event_user, bot)
+		return RateVerdict.DROP
 
 
 # Cooldown
@@ -106,40 +81,27 @@ class RateNotifyCooldown(RateMiddleABC):
 		self.cooldown_message = cooldown_message
 
 
-	async def on_exceed_rate(
-		self: RateNotifyCooldown,
-		handle: HandleType,  # noqa: ARG002
-		rate_data: RateData, event: Update, event_user: User, data: HandleData,  # noqa: ARG002
-		bot: Bot,
+	def on_exceed_rate(
+		self: RateNotifyCooldown, rate_data: RateData, event_user: User, bot: Bot,
 	) -> None:
 		"""Send cooldowns."""
-		is_not_exceed_warnings = self.warnings_count > rate_data.sent_warning_count
+		with self._cache.lock_of(event_user.id):
+			is_not_exceed_warnings = self.warnings_count > rate_data.sent_warning_count
+			if is_not_exceed_warnings:
+				rate_data.sent_warning_count += 1
 		# try send warning (run times from `warning_count`)
 		if is_not_exceed_warnings:
 			# [Optional] Will call: just warning and optional calmed notify (on end)
-			# TODO: Run in task..?
-			await self.try_user_warning(rate_data, event_user, bot)
+			self.try_user_warning(rate_data, event_user, bot)
 
-			rate_data.sent_warning_count += 1
 
-
-	async def try_user_warning(
+	def try_user_warning(
 		self: RateNotifyCooldown | RateNotifyCC, rate_data: RateData,  # noqa: ARG002
 		event_user: User, bot: Bot,
 	) -> None:
-		"""Send user warnings."""
-		# FIXME: Crutchy..
-		# For example implement cache method with additional call (on_end -> send_msg)
-		try:
-			await bot.send_message(
-				chat_id=event_user.id,
-				text=self.cooldown_message,
-			)
-		except Exception:
-			logger.warning(
-				'Warning message for user %s not sent',
-				event_user.username, exc_info=True,
-			)
+		"""Enqueue user warning (sent by the notifier, update isn't blocked by network)."""
+		assert self.cooldown_message is not None  # plug for linter
+		self.get_notifier().send(bot, event_user.id, self.cooldown_message)
 
 
 # Calmed
@@ -150,22 +112,35 @@ class RateNotifyCalmed(RateMiddleABC):
 		calmed_message: str | None,
 	) -> None:
 		self.calmed_message = calmed_message
+		# Shared by all users, item's expiry action is the pending flag
+		self._calmed_callback = self._on_calmed
 
 
-	async def on_exceed_rate(
+	def on_exceed_rate(
 		self: RateNotifyCalmed,
-		handle: HandleType,  # noqa: ARG002
-		rate_data: RateData, event: Update, event_user: User, data: HandleData,  # noqa: ARG002
-		bot: Bot,
+		rate_data: RateData, event_user: User, bot: Bot,
 	) -> None:
 		"""Call: On item in cache die - send message to user or log on error."""
-		# TODO: Make try/raise optionally..
-		self._cache.try_set_handle_subcallback(
-			event_user.id,
-			# plug awaitable
-			lambda: bot.send_message(chat_id=event_user.id, text=self.calmed_message),
-		)
-		# ...
+		# Bind on the bot's loop (expiry could be on other)
+		self.get_notifier()
+		with self._cache.lock_of(event_user.id):
+			item = self._cache.get_item(event_user.id)
+			if item is None:
+				return
+			calmed_in = self._calmed_in(rate_data)
+			if calmed_in is not None:
+				# Notice as soon as user is allowed again, not on the record's expiry
+				self._cache.expire(event_user.id, calmed_in)
+			if item.arg is self._calmed_callback:
+				# Already pending
+				return
+			item.obj = bot
+			self._cache.replace_handle_sync_callback(event_user.id, self._calmed_callback)
+
+
+	def _on_calmed(self: RateNotifyCalmed, key: int, item: CacheItem) -> None:
+		self._after_calmed(key, item)
+		self.notifier.defer(item.obj, key, self.calmed_message)  # type: ignore
 
 
 # Cooldown + Calmed
@@ -179,17 +154,11 @@ class RateNotifyCC(RateNotifyCooldown):
 		self.warnings_count = warnings_count
 		self.cooldown_message = cooldown_message
 		self.calmed_message = calmed_message
+		self._calmed_callback = MethodType(RateNotifyCalmed._on_calmed, self)  # noqa: SLF001
 
 
-	async def on_exceed_rate(
-		self: RateNotifyCC,
-		handle: HandleType,
-		rate_data: RateData, event: Update, event_user: User, data: HandleData,
-		bot: Bot,
+	def on_exceed_rate(
+		self: RateNotifyCC, rate_data: RateData, event_user: User, bot: Bot,
 	) -> None:
-		await super().on_exceed_rate(
-			handle, rate_data, event, event_user, data, bot,
-		)
-		await RateNotifyCalmed.on_exceed_rate(
-			self, handle, rate_data, event, event_user, data, bot,
-		)
+		super().on_exceed_rate(rate_data, event_user, bot)
+		RateNotifyCalmed.on_exceed_rate(self, rate_data, event_user, bot)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import logging
+from abc import abstractmethod
+from typing import TYPE_CHECKING
+
+from aiogram_middlewares.rater.base import RaterAttrsABC
+from aiogram_middlewares.rater.models import MultiWindowCounter, SlidingLog, SlidingWindowCounter
+
+if TYPE_CHECKING:
+	from typing import Any, Iterable
+
+	from aiogram_middlewares.rater.caches import CacheItem
+	from aiogram_middlewares.rater.caches.snapshot import PathType
+	from aiogram_middlewares.rater.models import Windows
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateSlidingBase(RaterAttrsABC):
+	"""Rate algorithm by user's counters object (its `rate` is the count in the window).
+
+	Used with debouncing, so state of the user lives while the user is active + one window.
+	"""
+
+	@abstractmethod
+	def _make_rate_data(self: RateSlidingBase) -> Any:
+		raise NotImplementedError
+
+
+	def restore(self: RateSlidingBase, path: PathType) -> int:
+		"""Load users from `snapshot` file (saved count is logged as just happened)."""
+		cache = self._cache
+		keys = cache.restore(path)
+		for key in keys:
+			saved = cache.get(key)
+			state = self._make_rate_data()
+			state.rate = saved.rate
+			state.sent_warning_count = saved.sent_warning_count
+			cache.update(key, state)
+		return len(keys)
+
+
+class RateSlidingWindow(RateSlidingBase):
+	"""Sliding window counter (two buckets with weighted previous one), O(1) memory."""
+
+	def _make_rate_data(self: RateSlidingWindow) -> SlidingWindowCounter:
+		return SlidingWindowCounter(self.period_sec)
+
+
+class RateSlidingLog(RateSlidingBase):
+	"""Exact sliding log (ring buffer of `after_handle_count` update times)."""
+
+	def _make_rate_data(self: RateSlidingLog) -> SlidingLog:
+		return SlidingLog(self.period_sec, self.after_handle_count)
+
+
+class RateMultiWindow(RateSlidingBase):
+	"""Several fixed windows (e.g. burst & sustained limits) in one user record & one expiry.
+
+	Rater's `period_sec` & `after_handle_count` are the longest window. Calmed notice is
+	sent as soon as the full windows are over, record lives on while longer ones count.
+	"""
+
+	def __init__(self: RateMultiWindow, windows: Windows) -> None:
+		self.windows = windows
+
+
+	@staticmethod
+	def check_windows(windows: Iterable[tuple[float, int]]) -> Windows:
+		"""Validate windows, return them sorted by period."""
+		checked = tuple(sorted((period, limit) for period, limit in windows))
+		if not checked:
+			msg = 'At least one `(period, limit)` window is required'
+			raise ValueError(msg)
+		for period, limit in checked:
+			if period <= 0 or limit < 1:
+				msg = f'Window period & limit must be positive, got `{(period, limit)}`'
+				raise ValueError(msg)
+		if len({period for period, _ in checked}) != len(checked):
+			msg = f'Windows have duplicate periods: `{checked}`'
+			raise ValueError(msg)
+		return checked
+
+
+	def _make_rate_data(self: RateMultiWindow) -> MultiWindowCounter:
+		return MultiWindowCounter(self.windows, self.after_handle_count)
+
+
+	def _calmed_in(self: RateMultiWindow, rate_data: MultiWindowCounter) -> float:  # type: ignore[override]
+		return rate_data.allowed_in()
+
+
+	def _after_calmed(self: RateMultiWindow, key: int, item: CacheItem) -> None:
+		cache = self._cache
+		counted_in = cache.value_of(item).counted_in()
+		if counted_in <= 0:
+			cache.delete(key)
+			return
+		cache.replace_handle_sync_callback(key, self._forget)
+		cache.expire(key, counted_in)
+
+
+	def _forget(self: RateMultiWindow, key: int, item: CacheItem) -> None:  # noqa: ARG002
+		self._cache.delete(key)
@@ -1,3 +1,3 @@
 from .extensions import *  # noqa: F403
-from .locks import ThrottleSemaphore  # noqa: F401
+from .locks import LeakScheduler, ThrottleQueueFull, ThrottleSemaphore  # noqa: F401
 from .throttling import RaterThrottleBase  # noqa: F401
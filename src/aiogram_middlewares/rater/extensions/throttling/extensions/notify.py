@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 from abc import ABC, abstractmethod
+from functools import partial
 from typing import TYPE_CHECKING
 
 from aiogram_middlewares.rater.base import RaterAttrsABC
 from aiogram_middlewares.rater.extensions.notify import RateNotifyCooldown
+from aiogram_middlewares.rater.models import RateVerdict
 
 if TYPE_CHECKING:
 	from typing import Any, Awaitable, Callable
@@ -26,30 +27,22 @@ logger = logging.getLogger(__name__)
 
 
 class RateThrottleMiddleABC(RaterAttrsABC, ABC):
-	throttle: Callable[[ThrottleSemaphore], Awaitable[None]]
+	throttle: Callable[[ThrottleSemaphore], Awaitable[bool]]
+	queue_dropped: int
 
 
 	@abstractmethod
-	async def on_exceed_rate(
+	def on_exceed_rate(
 		self: RateThrottleMiddleABC,
-		handle: HandleType,
-		rate_data: RateData, sem: ThrottleSemaphore, event: Update, event_user: User,
-		data: HandleData,
-		bot: Bot,
+		rate_data: RateData, sem: ThrottleSemaphore, event_user: User, bot: Bot,
 	) -> None:
 		raise NotImplementedError
 
 
 	@abstractmethod
-	async def _middleware(
-		self: RateThrottleMiddleABC,
-		handle: HandleType,
-		event: Update,
-		event_user: User,
-		data: HandleData,
-		bot: Bot,
-		rate_data: RateData,
-	) -> Any | None:
+	def decide(
+		self: RateThrottleMiddleABC, rate_data: RateData, event_user: User, bot: Bot,
+	) -> RateVerdict:
 		raise NotImplementedError
 
 
@@ -60,43 +53,28 @@ class RateThrottleNotifyBase(RateThrottleMiddleABC):
 
 
 	@abstractmethod
-	async def on_exceed_rate(
+	def on_exceed_rate(
 		self: RateThrottleNotifyBase,
-		handle: HandleType,
-		rate_data: RateData, sem: ThrottleSemaphore, event: Update, event_user: User,
-		data: HandleData,
-		bot: Bot,
+		rate_data: RateData, sem: ThrottleSemaphore, event_user: User, bot: Bot,
 	) -> None:
 		raise NotImplementedError
 
 
-	async def _middleware(
-		self: RateThrottleNotifyBase,
-		handle: HandleType,
-		event: Update,
-		event_user: User,
-		data: HandleData,
-		bot: Bot,
-		rate_data: RateData,
-	) -> Any:
-		"""Main middleware."""
-		# TODO: Mb one more variant(s) for debug.. (better by decorators..)
-
-		sem = self._cache.get_obj(event_user.id)
-		assert sem is not None  # plug for linter
+	def decide(
+		self: RateThrottleNotifyBase, rate_data: RateData, event_user: User, bot: Bot,
+	) -> RateVerdict:
+		"""Take free throttle slot, else notify & wait for it (or drop on full queue)."""
+		sem: ThrottleSemaphore = self._cache.get_obj(event_user.id)  # type: ignore
+		if sem.try_acquire():
+			return RateVerdict.PASS
 
-		# proc/pass update action while not exceed rate limit (run times limit from `after_handle_count`)
 		# TODO: More test `calmed` notify..
-
-		if sem.locked():
-			await self.on_exceed_rate(handle, rate_data, sem, event, event_user, data, bot)
-
-		# TODO: On queue/task(s) end normally send calmed message..
-		await self.throttle(sem)
-		return await self.proc_handle(
-			handle, rate_data, event, event_user,
-			data,
-		)
+		if sem.is_queue_full() and sem.queue_policy == 'drop_newest':
+			# Silently, flooder is already notified
+			self.queue_dropped += 1
+			return RateVerdict.DROP
+		self.on_exceed_rate(rate_data, sem, event_user, bot)
+		return RateVerdict.THROTTLE
 
 
 # TODO: Rearch..
@@ -104,12 +82,9 @@ class RateThrottleNotifyBaseSerializable(RateThrottleNotifyBase):
 
 
 	@abstractmethod
-	async def on_exceed_rate(
+	def on_exceed_rate(
 		self: RateThrottleNotifyBase,
-		handle: HandleType,
-		rate_data: RateData, sem: ThrottleSemaphore, event: Update, event_user: User,
-		data: HandleData,
-		bot: Bot,
+		rate_data: RateData, sem: ThrottleSemaphore, event_user: User, bot: Bot,
 	) -> None:
 		raise NotImplementedError
 
@@ -126,19 +101,17 @@ class RateThrottleNotifyBaseSerializable(RateThrottleNotifyBase):
 	) -> Any:
 		"""Main middleware."""
 		# TODO: Mb one more variant(s) for debug.. (better by decorators..)
-
-		sem = self._cache.get_obj(event_user.id)
-		assert sem is not None  # plug for linter
-
-		# proc/pass update action while not exceed rate limit (run times limit from `after_handle_count`)
-		# TODO: More test `calmed` notify..
-
-		if sem.locked():
-			await self.on_exceed_rate(handle, rate_data, sem, event, event_user, data, bot)
+		verdict = self.decide(rate_data, event_user, bot)
+		if verdict is RateVerdict.DROP:
+			return None
 
 		# TODO: On queue/task(s) end normally send calmed message..
 		self._cache.uppress(event_user.id, rate_data)
-		await self.throttle(sem)
+		if verdict is RateVerdict.THROTTLE:
+			sem = self._cache.get_obj(event_user.id)
+			assert sem is not None  # plug for linter
+			if not await self.throttle(sem):
+				return None
 		return await self.proc_handle(
 			handle, rate_data, event, event_user,
 			data,
@@ -155,26 +128,18 @@ class RateThrottleNotifyCalmed(RateThrottleMiddleABC):
 		self.calmed_message = calmed_message
 
 
-	async def on_exceed_rate(
+	def on_exceed_rate(
 		self: RateThrottleNotifyCalmed | RateThrottleNotifyCC,
-		handle: HandleType,  # noqa: ARG002
-		rate_data: RateData, sem: ThrottleSemaphore, event: Update, event_user: User,  # noqa: ARG002
-		data: HandleData,  # noqa: ARG002
-		bot: Bot,
+		rate_data: RateData, sem: ThrottleSemaphore, event_user: User, bot: Bot,  # noqa: ARG002
 	) -> None:
-		"""Call: On item in cache die - send message to user or log on error."""
-		# TODO: Make try/raise optionally..
-
-		sem.stick_leak_done_callback(
-			lambda: asyncio.create_task(
-				bot.send_message(
-					chat_id=event_user.id, text=self.calmed_message,
-				),
-			),
+		"""Call: On leak done - send message to user or log on error."""
+		if sem.leak_done_callback is not None:
+			# Already pending
+			return
+		sem.on_leak_done_callback(
+			partial(self.get_notifier().defer, bot, event_user.id, self.calmed_message),
 		)
 
-		# ...
-
 
 class RateThrottleNotifyCooldown(RateThrottleMiddleABC):
 
@@ -192,23 +157,18 @@ class RateThrottleNotifyCooldown(RateThrottleMiddleABC):
 		self.cooldown_message = cooldown_message
 
 
-	async def on_exceed_rate(
+	def on_exceed_rate(
 		self: RateThrottleNotifyCooldown | RateThrottleNotifyCC,
-		handle: HandleType,
-		rate_data: RateData, sem: ThrottleSemaphore | None, event: Update, event_user: User,  # noqa: ARG002
-		data: HandleData,
-		bot: Bot,
+		rate_data: RateData, sem: ThrottleSemaphore | None, event_user: User, bot: Bot,  # noqa: ARG002
 	) -> None:
-		await RateNotifyCooldown.on_exceed_rate(
-			self, handle, rate_data, event, event_user, data, bot,
-		)
+		RateNotifyCooldown.on_exceed_rate(self, rate_data, event_user, bot)
 
 
-	async def try_user_warning(
+	def try_user_warning(
 		self: RateThrottleNotifyCooldown | RateThrottleNotifyCC, rate_data: RateData,
 		event_user: User, bot: Bot,
 	) -> None:
-		return await RateNotifyCooldown.try_user_warning(self, rate_data, event_user, bot)
+		return RateNotifyCooldown.try_user_warning(self, rate_data, event_user, bot)
 
 
 # Cooldown + Calmed
@@ -224,16 +184,9 @@ class RateThrottleNotifyCC(RateThrottleNotifyCooldown):
 		self.calmed_message = calmed_message
 
 
-	async def on_exceed_rate(
+	def on_exceed_rate(
 		self: RateThrottleNotifyCC,
-		handle: HandleType,
-		rate_data: RateData, sem: ThrottleSemaphore, event: Update, event_user: User,
-		data: HandleData,
-		bot: Bot,
+		rate_data: RateData, sem: ThrottleSemaphore, event_user: User, bot: Bot,
 	) -> None:
-		await super().on_exceed_rate(
-			handle, rate_data, None, event, event_user, data, bot,
-		)
-		await RateThrottleNotifyCalmed.on_exceed_rate(
-			self, handle, rate_data, sem, event, event_user, data, bot,
-		)
+		super().on_exceed_rate(rate_data, None, event_user, bot)
+		RateThrottleNotifyCalmed.on_exceed_rate(self, rate_data, sem, event_user, bot)
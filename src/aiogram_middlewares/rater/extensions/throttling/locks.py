@@ -4,10 +4,14 @@ import asyncio
 import logging
 from asyncio import Semaphore
 from collections import deque
+from heapq import heappop, heappush
+from itertools import count
+from time import get_clock_info
 from typing import TYPE_CHECKING
+from weakref import WeakKeyDictionary
 
 if TYPE_CHECKING:
-	from asyncio import AbstractEventLoop, Future, Task
+	from asyncio import AbstractEventLoop, Future, TimerHandle
 	from types import TracebackType
 	from typing import Any, Callable, Literal
 
@@ -20,11 +24,84 @@ if TYPE_CHECKING:
 	true = Literal[True]
 
 	LeakDoneCallback = Callable[[], Any]
+	QueuePolicy = Literal['drop_newest', 'drop_oldest', 'reject']
 
 
 logger = logging.getLogger(__name__)
 
 
+QUEUE_POLICIES = ('drop_newest', 'drop_oldest', 'reject')
+
+
+class ThrottleQueueFull(Exception):  # noqa: N818
+	"""Update is dropped, because throttle queue of the user is full."""
+
+
+# Loop fires timers a bit earlier (within clock resolution)
+_CLOCK_RESOLUTION = get_clock_info('monotonic').resolution
+
+
+class LeakScheduler:
+	"""Leaks permits of all throttle semaphores of the event loop by one timer.
+
+	Semaphores with used permits wait in the deadline heap (one entry per semaphore),
+	idle ones have no scheduled work at all.
+	"""
+
+	_schedulers: WeakKeyDictionary[AbstractEventLoop, LeakScheduler] = WeakKeyDictionary()
+
+	def __init__(self: LeakScheduler, loop: AbstractEventLoop) -> None:
+		self._loop = loop
+		self._heap: list[tuple[float, int, ThrottleSemaphore]] = []
+		self._seq = count()  # Tie breaker (semaphores aren't comparable)
+		self._timer: TimerHandle | None = None
+		self._timer_when = float('inf')
+
+
+	@classmethod
+	def of(cls: type[LeakScheduler], loop: AbstractEventLoop) -> LeakScheduler:
+		"""Return scheduler of the loop (created on first use)."""
+		scheduler = cls._schedulers.get(loop)
+		if scheduler is None:
+			scheduler = cls._schedulers[loop] = cls(loop)
+		return scheduler
+
+
+	def __len__(self: LeakScheduler) -> int:
+		"""Return count of semaphores waiting for a leak."""
+		return len(self._heap)
+
+
+	def schedule(self: LeakScheduler, sem: ThrottleSemaphore, when: float) -> None:
+		heappush(self._heap, (when, next(self._seq), sem))
+		if when < self._timer_when:
+			if self._timer is not None:
+				self._timer.cancel()
+			self._timer = self._loop.call_at(when, self._run)
+			self._timer_when = when
+
+
+	def _run(self: LeakScheduler) -> None:
+		"""Leak all due semaphores & rearm the timer for the next one."""
+		self._timer = None
+		self._timer_when = float('inf')
+		heap = self._heap
+		now = self._loop.time()
+		cutoff = now + _CLOCK_RESOLUTION
+		while heap and heap[0][0] <= cutoff:
+			when, seq, sem = heappop(heap)
+			try:
+				next_when = sem._leak_tick(when, now)  # noqa: SLF001
+			except Exception:
+				logger.exception('Error on semaphore leak at %s', hex(id(sem)))
+				continue
+			if next_when is not None:
+				heappush(heap, (next_when, seq, sem))
+		if heap:
+			self._timer_when = heap[0][0]
+			self._timer = self._loop.call_at(self._timer_when, self._run)
+
+
 # TODO: ABC.. & more variations), remove supcls.
 class ThrottleSemaphore(Semaphore):
 
@@ -41,6 +118,7 @@ class ThrottleSemaphore(Semaphore):
 		self: ThrottleSemaphore,
 		max_rate: PositiveInt, time_period: PositiveInt | PositiveFloat = 60,
 		loop: AbstractEventLoop | None = None,
+		max_queue: int | None = None, queue_policy: QueuePolicy = 'drop_newest',
 	):
 		# TODO: Refactor..
 
@@ -48,8 +126,14 @@ class ThrottleSemaphore(Semaphore):
 		loop = loop  # @dep
 		# Checks
 		self.__checks_init(max_rate, time_period)
+		if max_queue is not None and max_queue < 0:
+			msg = f'`max_queue` must be positive or zero, `{max_queue=}`'
+			raise ValueError(msg)
+		if queue_policy not in QUEUE_POLICIES:
+			msg = f'Unknown queue policy `{queue_policy}`, expected one of {QUEUE_POLICIES}'
+			raise ValueError(msg)
 		# Init attrs
-		self.__post_init(max_rate, _delay_time, loop)
+		self.__post_init(max_rate, _delay_time, loop, max_queue, queue_policy)
 
 		logger.debug('Semaphore limits: %i / %.02f sec.', self._max_rate, time_period)
 
@@ -74,40 +158,85 @@ class ThrottleSemaphore(Semaphore):
 		self: ThrottleSemaphore,
 		max_rate: PositiveInt, delay_time: PositiveFloat,
 		loop: AbstractEventLoop,
+		max_queue: int | None, queue_policy: QueuePolicy,
 	) -> None:
 		self._delay_time = delay_time
 		self._max_rate: PositiveInt = max_rate
+		self.max_queue = max_queue
+		self.queue_policy = queue_policy
 
 		# FIXME: Pass loop or not..?
 		self._value: PositiveInt = max_rate
+		# Done (woken, dropped, cancelled) futures are removed lazily from the head,
+		# `_pending` is live count of not done ones
 		self._waiters = deque()
+		self._pending = 0
 
 		self._loop = loop
-		self.leak_task: Task | None = None
+		self._scheduler: LeakScheduler | None = None
+		self._is_scheduled = False  # Has entry in scheduler's heap
 		self._is_leak = True
-		self._leak_task_min_refs2die: int = 3
 
 		self._leak_done_callback: LeakDoneCallback | None = None
 
 		self.acquire = self._first_acquire  # type: ignore  # Crutchy~, but ok
 
 
-	async def _first_acquire(self: ThrottleSemaphore) -> true:
-		"""Just check for the first time & switch to acquire."""
-		if not self.leak_task:
-			# TODO: Add delete callback
-			# TODO: Refactor..
-			if self._loop is None:
-				self._loop = asyncio.get_running_loop()
-			self.leak_task = self._loop.create_task(self._leak_sem_task())
+	def _bind_scheduler(self: ThrottleSemaphore) -> LeakScheduler:
+		if self._loop is None:
+			self._loop = asyncio.get_running_loop()
+		self._scheduler = LeakScheduler.of(self._loop)
 		self.acquire = self._acquire  # type: ignore
+		return self._scheduler
+
+
+	async def _first_acquire(self: ThrottleSemaphore) -> true:
+		"""Just bind the loop's leak scheduler for the first time & switch to acquire."""
+		self._bind_scheduler()
 		return await self.acquire()
 
 
+	def _take(self: ThrottleSemaphore) -> None:
+		"""Take permit & make sure it will be leaked back."""
+		self._value -= 1
+		if not self._is_scheduled:
+			self._schedule_leak()
+
+
+	def _schedule_leak(self: ThrottleSemaphore) -> None:
+		scheduler = self._scheduler or self._bind_scheduler()
+		self._is_scheduled = True
+		scheduler.schedule(self, self._loop.time() + self._delay_time)
+
+
+	def _leak_tick(self: ThrottleSemaphore, when: float, now: float) -> float | None:
+		"""Leak one permit (by scheduler), return time of the next leak or None if idle."""
+		if self._value < self._max_rate:
+			# Increase rate value (wakes up the next waiter)
+			self.release()
+		# After done status only pending jobs are finished
+		if self._pending or (self._is_leak and self._value < self._max_rate):
+			next_when = when + self._delay_time
+			# Don't burst after loop's lag
+			return next_when if next_when > now else now + self._delay_time
+		self._is_scheduled = False
+		if not self._is_leak:
+			self._finish_leak()
+		return None
+
+
 	def locked(self: ThrottleSemaphore) -> bool:
 		"""Return True if semaphore cannot be acquired immediately."""
-		return self._value == 0 or (
-			any(not w.cancelled() for w in self._waiters))
+		return self._value == 0 or self._pending > 0
+
+
+	def try_acquire(self: ThrottleSemaphore) -> bool:
+		"""Acquire a semaphore without waiting (in running loop), return False if locked."""
+		self._is_leak = True  # Re-arm after leak done, it's reused
+		if self.locked():
+			return False
+		self._take()
+		return True
 
 
 	async def _acquire(self: ThrottleSemaphore) -> true:
@@ -119,42 +248,85 @@ class ThrottleSemaphore(Semaphore):
 		called release() to make it larger than 0, and then return
 		True.
 		"""
+		self._is_leak = True  # Re-arm after leak done, it's reused
 		if not self.locked():
-			self._value -= 1
+			self._take()
 			return True
 
+		if self.max_queue is not None and self._pending >= self.max_queue:
+			if self.queue_policy != 'drop_oldest' or not self._drop_oldest():
+				msg = 'Throttle queue is full'
+				raise ThrottleQueueFull(msg)
+
 		fut = self._loop.create_future()
 		self._waiters.append(fut)
+		self._pending += 1
 
-		# Finally block should be called before the CancelledError
-		# handling as we don't want CancelledError to call
-		# _wake_up_first() and attempt to wake up itself.
 		try:
-			try:
-				await fut
-			finally:
-				self._waiters.remove(fut)
+			await fut
 		except asyncio.CancelledError:
-			if not fut.cancelled():
+			if fut.cancelled():
+				# Entry stays in the deque till it's popped by wake up
+				self._pending -= 1
+				self._compact()
+			else:
+				# Woken, but cancelled before resume - give the permit back
 				self._value += 1
 				self._wake_up_next()
 			raise
+		except ThrottleQueueFull:
+			# Dropped by `drop_oldest`, break cycle future -> exception -> traceback -> frame,
+			# else dropped updates are held till gc
+			del fut
+			raise
 
 		if self._value > 0:
 			self._wake_up_next()
 		return True
 
 
-	def _wake_up_next(self: ThrottleSemaphore) -> None:
-		"""Wake up the first waiter that isn't done."""
-		if not self._waiters:
-			return
+	def queued(self: ThrottleSemaphore) -> int:
+		"""Return count of jobs waiting for the slot."""
+		return self._pending
+
 
-		for fut in self._waiters:
+	def is_queue_full(self: ThrottleSemaphore) -> bool:
+		"""Check if the next waiter will be dropped (or evict the oldest one)."""
+		return self.max_queue is not None and self._pending >= self.max_queue
+
+
+	def _pop_waiter(self: ThrottleSemaphore) -> Future[Any] | None:
+		"""Pop the first waiter that isn't done (skipping stale entries)."""
+		waiters = self._waiters
+		while waiters:
+			fut = waiters.popleft()
 			if not fut.done():
-				self._value -= 1
-				fut.set_result(True)  # noqa: FBT003
-				return
+				self._pending -= 1
+				return fut
+		return None
+
+
+	def _compact(self: ThrottleSemaphore) -> None:
+		"""Drop stale entries when they outnumber live waiters (amortised by the rebuild)."""
+		if len(self._waiters) > 2 * self._pending + 16:
+			self._waiters = deque(fut for fut in self._waiters if not fut.done())
+
+
+	def _drop_oldest(self: ThrottleSemaphore) -> bool:
+		"""Fail the oldest waiter with `ThrottleQueueFull` (its job won't run)."""
+		fut = self._pop_waiter()
+		if fut is None:
+			return False
+		fut.set_exception(ThrottleQueueFull('Dropped from full throttle queue'))
+		return True
+
+
+	def _wake_up_next(self: ThrottleSemaphore) -> None:
+		"""Wake up the first waiter that isn't done."""
+		fut = self._pop_waiter()
+		if fut is not None:
+			self._take()
+			fut.set_result(True)  # noqa: FBT003
 
 
 	def on_leak_done_callback(self: ThrottleSemaphore, func: LeakDoneCallback) -> true:
@@ -163,6 +335,11 @@ class ThrottleSemaphore(Semaphore):
 		return True
 
 
+	@property
+	def leak_done_callback(self: ThrottleSemaphore) -> LeakDoneCallback | None:
+		return self._leak_done_callback
+
+
 	def stick_leak_done_callback(self: ThrottleSemaphore, func: LeakDoneCallback) -> bool:
 		"""Add callback which run on leak task done - if it's no callback, otherwise do nothing."""
 		if self._leak_done_callback:
@@ -181,13 +358,14 @@ class ThrottleSemaphore(Semaphore):
 
 	def copy(self: ThrottleSemaphore) -> ThrottleSemaphore:
 		"""Return a new instance of the semaphore based on the params of the current instance."""
-		cls = self.__class__
-		ins = cls.__new__(cls)
-		ins.__post_init(self._max_rate, self._delay_time, self._loop)  # Hmm..
-		return ins
+		return self.__class__(
+			self._max_rate, self._delay_time * self._max_rate, self._loop,
+			self.max_queue, self.queue_policy,
+		)
 
 
-	# TODO: Done callback (task_cancel&cleanup+4notify-user_optional) - callbacks (condition(s)) variants =)
+	# TODO: Done callback (task_cancel&cleanup+4notify-user_optional) -
+	#  variants of callbacks by conditions
 
 
 	@property
@@ -196,46 +374,47 @@ class ThrottleSemaphore(Semaphore):
 		return self._is_leak
 
 
+	def queue_depth(self: ThrottleSemaphore) -> int:
+		"""Return count of used (not leaked yet) slots & waiting jobs."""
+		return self._max_rate - self._value + self._pending
+
+
+	def restore_depth(self: ThrottleSemaphore, depth: int) -> None:
+		"""Mark slots as used by queue depth from snapshot (jobs themselves are lost)."""
+		self._value = max(self._max_rate - depth, 0)
+		if self._value < self._max_rate and not self._is_scheduled:
+			self._schedule_leak()
+
+
 	def is_jobs_pending(self: ThrottleSemaphore) -> bool:
 		# ...
-		return bool(self._waiters)
+		return self._pending > 0
 
 
 	def set_leak_done(self: ThrottleSemaphore) -> None:
-		"""Set done status for leak task."""
+		"""Set done status for leaking (pending jobs are finished before the done callback)."""
 		self._is_leak = False
+		# Idle one has no scheduled leak to finish it
+		if not self._is_scheduled and self._scheduler is not None:
+			self._is_scheduled = True  # Once
+			self._loop.call_soon(self._finish_idle_leak)
 
 
-	async def _leak(self: ThrottleSemaphore) -> None:
-		await asyncio.sleep(self._delay_time)
-		if self._value < self._max_rate:
-			# Increase rate value
-			self.release()
-
-
-	async def _leak_sem_task(self: ThrottleSemaphore) -> None:
-		"""Background task that leaks semaphore releases by rate of tasks per time_period."""
-		# Can be implemented using `call_later` with queue
-		# without step-part timing (but more calculations..)
-		logger.debug(
-			'<Semaphore> task [bold green blink]start[/] at %s',
-			hex(id(self)),
-			extra={'markup': True},
-		)  # TODO: Aliases.. (& colors based on it)
+	def _finish_idle_leak(self: ThrottleSemaphore) -> None:
+		"""Finish leak of the idle semaphore, or leak it again if it's used meanwhile."""
+		self._is_scheduled = False
+		if self._pending or self._value < self._max_rate:
+			self._schedule_leak()
+		elif not self._is_leak:
+			self._finish_leak()
 
-		while self._is_leak:
-			await self._leak()
 
-		# If on task end has undone waiters - finish them
-		# TODO: Do it optional & choose another condition..
-		while self._waiters:
-			await self._leak()
-		# ...
+	def _finish_leak(self: ThrottleSemaphore) -> None:
 		if self._leak_done_callback:
 			self._leak_done_callback()
 
 		logger.debug(
-			'<Semaphore> task [bold yellow blink]done[/] at %s',
+			'<Semaphore> leak [bold yellow blink]done[/] at %s',
 			hex(id(self)),
 			extra={'markup': True},
 		)
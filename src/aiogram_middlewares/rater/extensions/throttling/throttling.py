@@ -4,22 +4,24 @@ import logging
 from typing import TYPE_CHECKING
 
 from aiogram_middlewares.rater.base import RaterABC
-from aiogram_middlewares.rater.models import RateData
+from aiogram_middlewares.rater.caches import BoundedCacheMixin
+from aiogram_middlewares.rater.models import RateData, RateVerdict
 
-from .locks import ThrottleSemaphore
+from .locks import ThrottleQueueFull, ThrottleSemaphore
 
 if TYPE_CHECKING:
 
-	from typing import Any
+	from typing import Any, Sequence
 
 	from aiogram import Bot
 	from aiogram.types import Update, User
 
 	from aiogram_middlewares.rater.base import HandleType
 	from aiogram_middlewares.rater.caches import CacheItem
+	from aiogram_middlewares.rater.caches.snapshot import PathType
 	from aiogram_middlewares.rater.types import _RD, HandleData
 
-	from .locks import PositiveFloat, PositiveInt
+	from .locks import PositiveFloat, PositiveInt, QueuePolicy
 
 
 logger = logging.getLogger(__name__)
@@ -33,6 +35,7 @@ class RaterThrottleBase(RaterABC):
 	def __init__(
 		self: RaterThrottleBase,
 		sem_period: PositiveInt | PositiveFloat | None,
+		max_queue: int | None = None, queue_policy: QueuePolicy = 'drop_newest',
 	) -> None:
 		self.sem_period: PositiveInt | PositiveFloat
 
@@ -56,31 +59,22 @@ class RaterThrottleBase(RaterABC):
 		self._sem_original = ThrottleSemaphore(
 			max_rate=self.after_handle_count,
 			time_period=self.sem_period,
+			max_queue=max_queue, queue_policy=queue_policy,
 		)
+		# Updates dropped by full throttle queues
+		self.queue_dropped = 0
 
+		if isinstance(self._cache, BoundedCacheMixin) and self._cache.on_evict is None:
+			self._cache.on_evict = self.release_evicted_semaphore
 
-	def _get_sem_ins(self: RaterThrottleBase, event_user: User) -> ThrottleSemaphore:
-		"""Return copy of the throttle semaphore created on class init.
 
-		It's a bit faster than creating a new instance of the semaphore with the same params.
-		"""
-		# pending_sem: ThrottleSemaphore | None = self._cache.get_obj(event_user.id)
-		# if pending_sem:
-		# 	return pending_sem
-		return self._sem_original.copy()
-
-
-	# TODO: Mb move into cache..
 	def reuse_semaphore_callback(self: RaterThrottleBase, key: int, item: CacheItem) -> bool:
 		sem: ThrottleSemaphore = item.obj  # type: ignore
 		if sem.is_jobs_pending():
 			logger.debug('<Throttle> reusing semaphore obj %s', hex(id(self)))
-			# Check semaphore later
-			self._cache._make_handle(
-				# TODO: Mb add sem obj property with remaining time/,rate/,value..
-				self.period_sec,
-				lambda: self.reuse_semaphore_callback(key, item),
-			)
+			# Check semaphore later (rearm item's expiry with the same callback)
+			# TODO: Mb add sem obj property with remaining time/,rate/,value..
+			self._cache.expire(key, self.period_sec)
 			return True
 		logger.debug('<Throttle> deleting old semaphore obj %s', hex(id(self)))
 		sem.set_leak_done()
@@ -88,43 +82,119 @@ class RaterThrottleBase(RaterABC):
 		return False
 
 
-	async def _trigger(
-		self: RaterThrottleBase, rate_data: _RD | None,
-		event_user: User, ttl: int, bot: Bot,  # noqa: ARG002
+	def release_evicted_semaphore(self: RaterThrottleBase, key: int, item: CacheItem) -> None:  # noqa: ARG002
+		"""Let leak task of the evicted user finish (after pending jobs)."""
+		sem: ThrottleSemaphore | None = item.obj  # type: ignore
+		if sem is not None:
+			sem.set_leak_done()
+
+
+	def _restore_sem_ins(self: RaterThrottleBase, depth: int) -> ThrottleSemaphore:
+		sem = self._sem_original.copy()
+		sem.restore_depth(depth)
+		return sem
+
+
+	def snapshot(self: RaterThrottleBase, path: PathType) -> int:
+		"""Dump users rate data with remaining ttl & throttle queue depth into the file."""
+		return self._cache.snapshot(path, depth_of=ThrottleSemaphore.queue_depth)
+
+
+	def restore(self: RaterThrottleBase, path: PathType) -> int:
+		"""Load users from `snapshot` file with semaphores busy by saved queue depth."""
+		keys = self._cache.restore(path, make_obj=self._restore_sem_ins)
+		for key in keys:
+			self._cache.replace_handle_sync_callback(key, self.reuse_semaphore_callback)
+		return len(keys)
+
+
+	def _trigger_sync(
+		self: RaterThrottleBase, event_user: User, ttl: int, *,
+		touch: bool = False,
 	) -> RateData | _RD:
-		"""Run at first trigger to create entity, else returns data (usually counters)."""
-		if rate_data or self._cache.has_key(event_user.id):
-			assert rate_data is not None  # plug for linter
-			return rate_data
-
-		logger.debug(
-			'[%s] Trigger user (begin): %s',
-			self.__class__.__name__, event_user.username,
-		)
+		"""Return user's data (usually counters), create entity at first trigger.
 
-		rate_data = RateData()
-		# TODO: Mb make custom variant for that..
+		New entity gets copy of the throttle semaphore created on class init
+		(a bit faster than a new instance with the same params).
+		"""
 		# TODO: Clean cache on exceptions.. (to avoid mutes..)
-		# Add new item to cache with ttl from initializator.
-		# (`Cache.add` does the same, but with checking in cache..)
-		sem = self._get_sem_ins(event_user)
-		self._cache.set(
-			event_user.id, rate_data,
-			obj=sem,
-			ttl=ttl,
-		)
+		cache = self._cache
+		return cache.value_of(cache.get_or_create(
+			event_user.id, RateData, ttl, touch=touch,
+			obj_factory=self._sem_original.copy, callback=self.reuse_semaphore_callback,
+		))
 
-		self._cache.try_replace_handle_sync_callback(
-			event_user.id,
-			self.reuse_semaphore_callback,
+
+	def _set_new_many(
+		self: RaterThrottleBase, user_ids: list[int], found: dict[int, RateData],
+	) -> None:
+		copy = self._sem_original.copy
+		self._cache.set_many(
+			[(user_id, found[user_id]) for user_id in user_ids], ttl=self.period_sec,
+			objs=[copy() for _ in user_ids],
 		)
+		for user_id in user_ids:
+			self._cache.try_replace_handle_sync_callback(user_id, self.reuse_semaphore_callback)
 
-		assert rate_data is not None  # plug for linter
-		return rate_data
 
+	async def classify_many(
+		self: RaterThrottleBase, event_users: Sequence[User],
+	) -> list[RateVerdict]:
+		"""Count batch of updates in one pass, return verdict per update.
 
-	async def throttle(self: RaterThrottleBase, sem: ThrottleSemaphore) -> None:
-		await sem.acquire()
+		Free throttle slots are taken right away (`PASS`), others must wait
+		for the slot by `throttle` (`THROTTLE`), it drops them if the user's queue
+		is full (by `max_queue` & `queue_policy`).
+		"""
+		datas = await self._trigger_many(event_users)
+		lock_of = self._cache.lock_of
+		get_obj = self._cache.get_obj
+		verdicts = []
+		for event_user, rate_data in zip(event_users, datas):
+			with lock_of(event_user.id):
+				rate_data.rate += 1
+			sem: ThrottleSemaphore = get_obj(event_user.id)  # type: ignore
+			verdicts.append(RateVerdict.PASS if sem.try_acquire() else RateVerdict.THROTTLE)
+		self._store_many(event_users, datas)
+		return verdicts
+
+
+	async def throttle(self: RaterThrottleBase, sem: ThrottleSemaphore) -> bool:
+		"""Wait for the slot, return False if update is dropped by full queue."""
+		try:
+			await sem.acquire()
+		except ThrottleQueueFull:
+			self.queue_dropped += 1
+			return False
+		return True
+
+
+	def queue_depth(self: RaterThrottleBase, user_id: int) -> int:
+		"""Return count of updates waiting in the user's throttle queue."""
+		sem: ThrottleSemaphore | None = self._cache.get_obj(user_id)
+		return 0 if sem is None else sem.queued()
+
+
+	def queue_gauges(self: RaterThrottleBase) -> dict[str, int]:
+		"""Return total & max per-user count of waiting updates and dropped ones."""
+		depths = [
+			item.obj.queued()  # type: ignore
+			for _, item in self._cache.items()
+			if item.obj is not None
+		]
+		return {
+			'queued': sum(depths),
+			'max_depth': max(depths, default=0),
+			'dropped': self.queue_dropped,
+		}
+
+
+	def decide(
+		self: RaterThrottleBase, rate_data: RateData, event_user: User, bot: Bot,  # noqa: ARG002
+	) -> RateVerdict:
+		"""Take free throttle slot (`PASS`) or wait for it by `throttle` (`THROTTLE`)."""
+		sem: ThrottleSemaphore = self._cache.get_obj(event_user.id)  # type: ignore
+		return RateVerdict.PASS if sem.try_acquire() else RateVerdict.THROTTLE
 
 
 	async def _middleware(
@@ -138,14 +208,16 @@ class RaterThrottleBase(RaterABC):
 	) -> Any:
 		"""Main middleware."""
 		# TODO: Mb one more variant(s) for debug.. (better by decorators..)
-
-		# proc/pass update action while not exceed rate limit (run times limit from `after_handle_count`)
-		sem = self._cache.get_obj(event_user.id)
-		assert sem is not None  # plug for linter
-
-		# FIXME: Fix serializer by serialize data before throttle (& mb for main antiflood too..)
-		# TODO: Make/use debouncing as decorator..
-		await self.throttle(sem)
+		verdict = self.decide(rate_data, event_user, bot)
+		if verdict is RateVerdict.DROP:
+			return None
+		if verdict is RateVerdict.THROTTLE:
+			# FIXME: Fix serializer by serialize data before throttle
+			#  & mb for main antiflood too..
+			sem = self._cache.get_obj(event_user.id)
+			assert sem is not None  # plug for linter
+			if not await self.throttle(sem):
+				return None
 		# count up rate & proc
 		return await self.proc_handle(
 			handle, rate_data, event, event_user,
@@ -9,7 +9,7 @@ from .base import RaterAttrsABC
 from .rater import assemble_rater
 
 if TYPE_CHECKING:
-	from typing import Any, Awaitable, Callable, Dict
+	from typing import Any, Awaitable, Callable, Dict, Sequence
 
 	from aiogram import Bot
 	from aiogram.types import Update, User
@@ -46,7 +46,8 @@ class RateLimiter(RaterAttrsABC, Filter):
 	) -> bool:
 		#
 		"""Process handle's update."""
-		throttling_data.rate += 1
+		with self._cache.lock_of(event_user.id):
+			throttling_data.rate += 1
 		# TODO: Mb log handle's name..
 		logger.debug(
 			'[%s] Handle user (proc): %s',
@@ -62,10 +63,19 @@ class RateLimiter(RaterAttrsABC, Filter):
 	) -> bool:
 		event_user: User = update.from_user
 
-		event_user_throttling_data: RateData | None = self._cache.get(event_user.id)
-		throttling_data: RateData = await self.trigger(
-			event_user_throttling_data, event_user, self.period_sec, bot,  # FIXME: Args..
-		)
-		del event_user_throttling_data
-
+		throttling_data: RateData = await self.trigger(event_user, self.period_sec, bot)
 		return await self.middleware(None, None, event_user, update, bot, throttling_data)
+
+
+	async def check_many(
+		self: RateLimiter,
+		updates: Sequence[Update],
+		bot: Bot,
+	) -> list[bool]:
+		"""Check batch of updates with one cache pass for triggers."""
+		event_users: list[User] = [update.from_user for update in updates]
+		rate_datas = await self._trigger_many(event_users)
+		return [
+			await self.middleware(None, None, event_user, update, bot, rate_data)
+			for event_user, update, rate_data in zip(event_users, updates, rate_datas)
+		]
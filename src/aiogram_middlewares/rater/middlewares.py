@@ -6,10 +6,11 @@ from typing import TYPE_CHECKING
 from aiogram import BaseMiddleware
 
 from .base import RaterAttrsABC
+from .pipeline import compile_pipeline
 from .rater import assemble_rater
 
 if TYPE_CHECKING:
-	from typing import Any
+	from typing import Any, Awaitable, Sequence
 
 	from aiogram import Bot
 	from aiogram.types import Update, User
@@ -26,20 +27,44 @@ logger = logging.getLogger(__name__)
 class RateMiddleware(RaterAttrsABC, BaseMiddleware):
 	"""Rater middleware (usually for outer usage)."""
 
-	async def __call__(
+	def _compile(self: RateMiddleware) -> None:
+		self._pipeline = compile_pipeline(self) or self._call
+
+
+	def __call__(
+		self: RateMiddleware,
+		handle: HandleType,
+		event: Update,
+		data: HandleData,
+	) -> Awaitable[Any]:
+		"""Callable for routers/dispatchers (runs flattened pipeline if the rater has one)."""
+		return self._pipeline(handle, event, data)
+
+
+	async def _call(
 		self: RateMiddleware,
 		handle: HandleType,
 		event: Update,
 		data: HandleData,
 	) -> Any:
-		"""Callable for routers/dispatchers."""
+		"""Generic chain: trigger, middleware & extensions' hooks."""
 		event_user: User = data['event_from_user']
 		bot: Bot = data['bot']
 
-		event_user_throttling_data: RateData | None = self._cache.get(event_user.id)
-		throttling_data: RateData = await self.trigger(
-			event_user_throttling_data, event_user, self.period_sec, bot,
-		)
-		del event_user_throttling_data
-
+		throttling_data: RateData = await self.trigger(event_user, self.period_sec, bot)
 		return await self.middleware(handle, event, event_user, data, bot, throttling_data)
+
+
+	async def call_many(
+		self: RateMiddleware,
+		handle: HandleType,
+		events: Sequence[Update],
+		datas: Sequence[HandleData],
+	) -> list[Any]:
+		"""Process batch of updates (e.g. from `get_updates`) with one cache pass for triggers."""
+		event_users: list[User] = [data['event_from_user'] for data in datas]
+		rate_datas = await self._trigger_many(event_users)
+		return [
+			await self.middleware(handle, event, event_user, data, data['bot'], rate_data)
+			for event, event_user, data, rate_data in zip(events, event_users, datas, rate_datas)
+		]
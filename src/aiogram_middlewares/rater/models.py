@@ -1,9 +1,193 @@
 from __future__ import annotations
 
+from array import array
+from enum import IntEnum
+from time import monotonic
+from typing import TYPE_CHECKING
+
 from aiogram_middlewares.utils import make_dataclass
 
+if TYPE_CHECKING:
+	from typing import Tuple
+
+	Windows = Tuple[Tuple[float, int], ...]
+
 
 @make_dataclass
 class RateData:
 	rate: int = 0
 	sent_warning_count: int = 0
+
+
+class SlidingWindowCounter:
+	"""Sliding window counter: current & previous fixed windows, previous one weighted by overlap.
+
+	Quacks like `RateData` (`rate` is the estimate, `rate += 1` counts the update).
+	"""
+
+	__slots__ = (
+		'window',
+		'start',
+		'current',
+		'previous',
+		'sent_warning_count',
+	)
+
+	def __init__(self: SlidingWindowCounter, window: float) -> None:
+		self.window = window
+		self.start = monotonic()
+		self.current = 0
+		self.previous = 0
+		self.sent_warning_count = 0
+
+
+	def _elapsed(self: SlidingWindowCounter) -> float:
+		"""Roll windows if needed, return elapsed part of the current one."""
+		elapsed = monotonic() - self.start
+		if elapsed >= self.window:
+			passed = int(elapsed // self.window)
+			self.previous = self.current if passed == 1 else 0
+			self.current = 0
+			self.start += passed * self.window
+			elapsed -= passed * self.window
+		return elapsed / self.window
+
+
+	@property
+	def rate(self: SlidingWindowCounter) -> float:
+		# Roll windows before the counters are read
+		elapsed = self._elapsed()
+		return self.previous * (1 - elapsed) + self.current
+
+
+	@rate.setter
+	def rate(self: SlidingWindowCounter, value: float) -> None:
+		self.current += round(value - self.rate)
+
+
+class SlidingLog:
+	"""Exact sliding log: ring buffer of the last `limit` updates times (compact `array('d')`).
+
+	Quacks like `RateData` (`rate` is count of updates in the window, `rate += 1` logs the update).
+	"""
+
+	__slots__ = (
+		'window',
+		'times',
+		'pos',
+		'sent_warning_count',
+	)
+
+	def __init__(self: SlidingLog, window: float, limit: int) -> None:
+		self.window = window
+		self.times = array('d', (float('-inf'),)) * limit
+		self.pos = 0  # Oldest one
+		self.sent_warning_count = 0
+
+
+	@property
+	def rate(self: SlidingLog) -> int:
+		times = self.times
+		size = len(times)
+		horizon = monotonic() - self.window
+		if times[self.pos] > horizon:
+			return size
+		# From the newest one till out of window
+		count = 0
+		pos = self.pos
+		for _ in range(size - 1):
+			pos = pos - 1 if pos else size - 1
+			if times[pos] <= horizon:
+				break
+			count += 1
+		return count
+
+
+	@rate.setter
+	def rate(self: SlidingLog, value: int) -> None:
+		times = self.times
+		now = monotonic()
+		for _ in range(value - self.rate):
+			times[self.pos] = now
+			self.pos = (self.pos + 1) % len(times)
+
+
+class MultiWindowCounter:
+	"""Counters of several fixed windows `(period, limit)` in one record.
+
+	Quacks like `RateData` against `base` limit: `rate` reaches `base` as soon as
+	any window is full (`rate += 1` counts the update in every window).
+	"""
+
+	__slots__ = (
+		'windows',
+		'base',
+		'starts',
+		'counts',
+		'sent_warning_count',
+	)
+
+	def __init__(self: MultiWindowCounter, windows: Windows, base: int) -> None:
+		self.windows = windows  # Shared by the rater
+		self.base = base
+		now = monotonic()
+		self.starts = array('d', (now,)) * len(windows)
+		self.counts = array('l', (0,)) * len(windows)
+		self.sent_warning_count = 0
+
+
+	@property
+	def rate(self: MultiWindowCounter) -> int:
+		now = monotonic()
+		starts = self.starts
+		counts = self.counts
+		worst = None
+		for i, (period, limit) in enumerate(self.windows):
+			if now - starts[i] >= period:
+				# Window is over, the next one starts from this update
+				starts[i] = now
+				counts[i] = 0
+			gap = counts[i] - limit
+			if worst is None or gap > worst:
+				worst = gap
+		return worst + self.base  # type: ignore
+
+
+	@rate.setter
+	def rate(self: MultiWindowCounter, value: int) -> None:
+		delta = value - self.rate
+		counts = self.counts
+		for i in range(len(counts)):
+			counts[i] += delta
+
+
+	def allowed_in(self: MultiWindowCounter) -> float:
+		"""Seconds till every full window is over (`0` - update is allowed)."""
+		now = monotonic()
+		starts = self.starts
+		counts = self.counts
+		wait = 0.0
+		for i, (period, limit) in enumerate(self.windows):
+			if counts[i] >= limit:
+				wait = max(wait, starts[i] + period - now)
+		return wait
+
+
+	def counted_in(self: MultiWindowCounter) -> float:
+		"""Seconds till every window with updates is over (record isn't needed after)."""
+		now = monotonic()
+		starts = self.starts
+		counts = self.counts
+		wait = 0.0
+		for i, (period, _) in enumerate(self.windows):
+			if counts[i]:
+				wait = max(wait, starts[i] + period - now)
+		return wait
+
+
+class RateVerdict(IntEnum):
+	"""Decision for the update."""
+
+	PASS = 0  # Handle it
+	DROP = 1  # Rate exceeded
+	THROTTLE = 2  # Handle after throttle semaphore slot
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count
+from typing import TYPE_CHECKING
+from weakref import WeakKeyDictionary
+
+from aiogram.exceptions import TelegramRetryAfter
+
+from aiogram_middlewares.utils import make_dataclass
+
+if TYPE_CHECKING:
+	from asyncio import AbstractEventLoop, Task, TimerHandle
+	from dataclasses import dataclass as make_dataclass
+	from typing import Tuple
+
+	from aiogram import Bot
+
+	from .extensions.throttling.locks import PositiveFloat
+
+	ChatKey = Tuple[int, int]  # Bot & chat ids (bots have own limits)
+
+
+logger = logging.getLogger(__name__)
+
+
+def _current_loop() -> AbstractEventLoop | None:
+	try:
+		return asyncio.get_running_loop()
+	except RuntimeError:
+		return None
+
+
+@make_dataclass
+class Notice:
+	"""Pending notification for the chat."""
+
+	bot: Bot
+	text: str
+	retries: int = 0
+
+
+class NotifyScheduler:
+	"""Outbound queue of cooldown/calmed notifications with Telegram flood limits.
+
+	Raters only enqueue notices, single worker task sends them not faster than
+	`rate` messages per second & one per `chat_interval` seconds to the same chat.
+	Chat of the bot has at most one pending notice (newer one replaces the text),
+	`TelegramRetryAfter` pauses the whole queue & notice is retried up to `max_retries` times.
+	Notices from expiry callbacks are `defer`red into `batch_tick` buckets
+	(one timer per bucket, whole batch is enqueued at once).
+	"""
+
+	_schedulers: WeakKeyDictionary[AbstractEventLoop, NotifyScheduler] = WeakKeyDictionary()
+
+	def __init__(
+		self: NotifyScheduler,
+		rate: PositiveFloat = 30, chat_interval: float = 1,
+		max_pending: int = 10_000, max_retries: int = 3,
+		batch_tick: float = 0.1,
+		loop: AbstractEventLoop | None = None,
+	) -> None:
+		if rate <= 0:
+			msg = f'`rate` must be positive, `{rate=}`'
+			raise ValueError(msg)
+		if chat_interval < 0:
+			msg = f'`chat_interval` must be positive or zero, `{chat_interval=}`'
+			raise ValueError(msg)
+		if max_pending < 1:
+			msg = f'`max_pending` must be positive, `{max_pending=}`'
+			raise ValueError(msg)
+		if batch_tick < 0:
+			msg = f'`batch_tick` must be positive or zero, `{batch_tick=}`'
+			raise ValueError(msg)
+
+		self._interval = 1 / rate
+		self._chat_interval = chat_interval
+		self._max_pending = max_pending
+		self._max_retries = max_retries
+		self._loop = loop
+
+		self._notices: dict[ChatKey, Notice] = {}
+		self._queue: deque[ChatKey] = deque()  # Chats ready to send
+		self._delayed: list[tuple[float, int, ChatKey]] = []  # Chats waiting for per-chat limit
+		self._seq = count()
+		self._chat_next: dict[ChatKey, float] = {}  # Earliest time of the next send to the chat
+		self._prune_at = 0.0  # Next time to forget chats which can be sent to
+		self._paused_until = 0.0
+
+		self._batch_tick = batch_tick
+		self._bucket: list[tuple[Bot, int, str]] = []
+		self._bucket_timer: TimerHandle | None = None
+
+		self._worker: Task | None = None
+		self._sending: set[Task] = set()
+
+		self.sent = 0
+		self.coalesced = 0
+		self.dropped = 0
+		self.retried = 0
+		self.failed = 0
+
+
+	@classmethod
+	def of(cls: type[NotifyScheduler], loop: AbstractEventLoop) -> NotifyScheduler:
+		"""Return default scheduler of the loop (created on first use)."""
+		scheduler = cls._schedulers.get(loop)
+		if scheduler is None:
+			scheduler = cls._schedulers[loop] = cls(loop=loop)
+		return scheduler
+
+
+	def __len__(self: NotifyScheduler) -> int:
+		"""Return count of pending notices."""
+		return len(self._notices)
+
+
+	def send(self: NotifyScheduler, bot: Bot, chat_id: int, text: str) -> bool:
+		"""Enqueue notice, return False if it's coalesced with pending one or dropped.
+
+		Never waits, safe to call from timer callbacks & other threads.
+		"""
+		loop = self._loop
+		if loop is None:
+			loop = self._loop = asyncio.get_running_loop()
+		elif loop is not _current_loop():
+			loop.call_soon_threadsafe(self.send, bot, chat_id, text)
+			return True
+
+		key = (bot.id, chat_id)
+		notice = self._notices.get(key)
+		if notice is not None:
+			# User is interested only in the latest state
+			notice.bot, notice.text = bot, text
+			self.coalesced += 1
+			return False
+		if len(self._notices) >= self._max_pending:
+			self.dropped += 1
+			logger.warning('Notification queue is full, notice for %s dropped', chat_id)
+			return False
+
+		self._push(key, Notice(bot=bot, text=text))
+		return True
+
+
+	def defer(self: NotifyScheduler, bot: Bot, chat_id: int, text: str) -> None:
+		"""Add notice to the current time bucket, it's enqueued with the whole bucket.
+
+		For expiry callbacks: no task or timer per notice, safe to call from other threads.
+		"""
+		loop = self._loop
+		if loop is None:
+			loop = self._loop = asyncio.get_running_loop()
+		elif loop is not _current_loop():
+			loop.call_soon_threadsafe(self.defer, bot, chat_id, text)
+			return
+
+		self._bucket.append((bot, chat_id, text))
+		if self._bucket_timer is None:
+			self._bucket_timer = loop.call_later(self._batch_tick, self._flush_bucket)
+
+
+	def _flush_bucket(self: NotifyScheduler) -> None:
+		self._bucket_timer = None
+		bucket, self._bucket = self._bucket, []
+		send = self.send
+		for bot, chat_id, text in bucket:
+			send(bot, chat_id, text)
+
+
+	def _push(self: NotifyScheduler, key: ChatKey, notice: Notice, *, first: bool = False) -> None:
+		assert self._loop  # plug for linter
+		self._notices[key] = notice
+		when = self._chat_next.get(key, 0)
+		if when > self._loop.time():
+			heappush(self._delayed, (when, next(self._seq), key))
+		elif first:
+			self._queue.appendleft(key)
+		else:
+			self._queue.append(key)
+		if self._worker is None:
+			self._worker = self._loop.create_task(self._run())
+
+
+	async def _run(self: NotifyScheduler) -> None:
+		"""Send pending notices by global & per-chat limits."""
+		assert self._loop  # plug for linter
+		loop = self._loop
+		queue = self._queue
+		delayed = self._delayed
+		try:
+			while self._notices:
+				now = loop.time()
+				if self._paused_until > now:
+					await asyncio.sleep(self._paused_until - now)
+					continue
+				while delayed and delayed[0][0] <= now:
+					queue.append(heappop(delayed)[2])
+				if not queue:
+					await asyncio.sleep(delayed[0][0] - now)
+					continue
+
+				if now >= self._prune_at:
+					self._prune_chat_next(now)
+				key = queue.popleft()
+				notice = self._notices.pop(key)
+				self._chat_next[key] = now + self._chat_interval
+				task = loop.create_task(self._send(key, notice))
+				self._sending.add(task)
+				task.add_done_callback(self._sending.discard)
+				await asyncio.sleep(self._interval)
+		finally:
+			self._worker = None
+			self._prune_chat_next(loop.time())
+
+
+	def _prune_chat_next(self: NotifyScheduler, now: float) -> None:
+		"""Forget chats which can be sent to right now (once per chat interval while sending)."""
+		self._chat_next = {key: when for key, when in self._chat_next.items() if when > now}
+		self._prune_at = now + self._chat_interval
+
+
+	async def _send(self: NotifyScheduler, key: ChatKey, notice: Notice) -> None:
+		try:
+			await notice.bot.send_message(chat_id=key[1], text=notice.text)
+		except TelegramRetryAfter as exc:
+			assert self._loop  # plug for linter
+			self._paused_until = max(self._paused_until, self._loop.time() + exc.retry_after)
+			self._retry(key, notice)
+		except Exception:
+			self.failed += 1
+			logger.warning('Notification for user %s not sent', key[1], exc_info=True)
+		else:
+			self.sent += 1
+
+
+	def _retry(self: NotifyScheduler, key: ChatKey, notice: Notice) -> None:
+		if key in self._notices:
+			# Newer notice is already pending
+			self.coalesced += 1
+			return
+		if notice.retries >= self._max_retries:
+			self.failed += 1
+			logger.warning('Notification for user %s not sent, retries are over', key[1])
+			return
+		notice.retries += 1
+		self.retried += 1
+		self._push(key, notice, first=True)
+
+
+	async def join(self: NotifyScheduler) -> None:
+		"""Wait till all pending (& deferred) notices are sent (or failed)."""
+		while self._bucket_timer is not None:
+			await asyncio.sleep(self._batch_tick)
+		while self._worker is not None or self._sending:
+			if self._worker is not None:
+				await asyncio.shield(self._worker)
+			if self._sending:
+				await asyncio.gather(*self._sending, return_exceptions=True)
+
+
+	async def close(self: NotifyScheduler) -> None:
+		"""Cancel the worker & in-flight sends, drop pending notices."""
+		if self._bucket_timer is not None:
+			self._bucket_timer.cancel()
+			self._bucket_timer = None
+		self.dropped += len(self._bucket)
+		self._bucket.clear()
+		tasks = [*self._sending]
+		if self._worker is not None:
+			tasks.append(self._worker)
+		for task in tasks:
+			task.cancel()
+		await asyncio.gather(*tasks, return_exceptions=True)
+		self.dropped += len(self._notices)
+		self._notices.clear()
+		self._queue.clear()
+		self._delayed.clear()
+
+
+	def as_dict(self: NotifyScheduler) -> dict[str, int]:
+		return {
+			'pending': len(self._notices),
+			'deferred': len(self._bucket),
+			'sent': self.sent,
+			'coalesced': self.coalesced,
+			'dropped': self.dropped,
+			'retried': self.retried,
+			'failed': self.failed,
+		}
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from functools import partial
+from typing import TYPE_CHECKING
+
+from .base import RaterBase
+from .extensions import loaded
+from .models import RateData
+
+if TYPE_CHECKING:
+	from typing import Any, Awaitable, Callable, Iterator
+
+	from aiogram import Bot
+
+	from .caches import CacheItem
+	from .extensions import RateGCRA, RaterThrottleBase
+	from .extensions.throttling.locks import ThrottleSemaphore
+	from .types import HandleData, HandleType
+
+	Pipeline = Callable[[HandleType, Any, HandleData], Awaitable[Any]]
+
+
+logger = logging.getLogger(__name__)
+
+
+# Hot path methods & classes of their implementations the pipelines are flattened from
+# (extensions are checked only if imported, rater can't have not imported ones)
+_STOCK: dict[str, tuple[str, ...]] = {
+	'trigger': ('RaterBase',),
+	'trigger_sync': ('RaterBase', 'RateDebouncable'),
+	'_trigger_sync': ('RaterBase', 'RaterThrottleBase'),
+	'_make_rate_data': ('RaterBase', 'RateSlidingWindow', 'RateSlidingLog', 'RateMultiWindow'),
+	'_calmed_in': ('RaterBase', 'RateMultiWindow'),
+	'middleware': ('RaterBase',),
+	'_middleware': ('RaterBase', 'RaterThrottleBase'),
+	'decide': ('RaterBase', 'RateNotifyBase', 'RaterThrottleBase', 'RateThrottleNotifyBase'),
+	'on_exceed_rate': (
+		'RateNotifyCooldown', 'RateNotifyCalmed', 'RateNotifyCC',
+		'RateThrottleNotifyCooldown', 'RateThrottleNotifyCalmed', 'RateThrottleNotifyCC',
+	),
+	'try_user_warning': ('RateNotifyCooldown', 'RateThrottleNotifyCooldown'),
+	'proc_handle': ('RaterBase',),
+	'throttle': ('RaterThrottleBase',),
+	'reuse_semaphore_callback': ('RaterThrottleBase',),
+}
+_STOCK_GCRA = ('reserve', 'on_exceed_rate', 'middleware')
+
+
+class _Done:
+	"""Awaitable of None without coroutine (for dropped updates)."""
+
+	__slots__ = ()
+
+	def __await__(self: _Done) -> Iterator[None]:
+		return iter(())
+
+
+DROPPED = _Done()
+
+
+# Stock check results by rater class (assembled classes are reused)
+_IS_STOCK: dict[type, bool] = {}
+
+
+def _is_instance(rater: RaterBase, *names: str) -> bool:
+	for name in names:
+		ext = loaded(name)
+		if ext is not None and isinstance(rater, ext):
+			return True
+	return False
+
+
+def _is_stock(rater: RaterBase) -> bool:
+	cls = type(rater)
+	is_stock = _IS_STOCK.get(cls)
+	if is_stock is not None:
+		return is_stock
+	is_stock = True
+	for name, owners in _STOCK.items():
+		method = getattr(cls, name, None)
+		if method is None:
+			continue
+		for owner in owners:
+			ext = RaterBase if owner == 'RaterBase' else loaded(owner)
+			if ext is not None and method is getattr(ext, name):
+				break
+		else:
+			is_stock = False
+			break
+	_IS_STOCK[cls] = is_stock
+	return is_stock
+
+
+def _locked(pipeline: Pipeline, lock_of: Callable[[int], Any]) -> Pipeline:
+	"""Run the pipeline under the user's item lock (cache shared by threads)."""
+
+	def locked(handle: HandleType, event: Any, data: HandleData) -> Awaitable[Any]:
+		with lock_of(data['event_from_user'].id):
+			return pipeline(handle, event, data)
+
+	return locked
+
+
+def compile_pipeline(rater: RaterBase) -> Pipeline | None:
+	"""Return rater's middleware path as one function, None if it can't be flattened.
+
+	Function is synchronous & returns handler's coroutine, throttle wait or `DROPPED`,
+	so no coroutines are made for the rater's stages.
+
+	Limits & messages are bound as locals, so rebuild it if they are changed. Serializing
+	& backend raters, overridden hot path methods and raters made with `compiled=False`
+	use the generic chain.
+	"""
+	if not rater.is_compiled:
+		return None
+	if _is_instance(rater, 'RateGCRA'):
+		cls, gcra = type(rater), loaded('RateGCRA')
+		if any(getattr(cls, name) is not getattr(gcra, name) for name in _STOCK_GCRA):
+			return None
+		return _compile_gcra(rater)  # type: ignore[arg-type]
+	if _is_instance(
+		rater, 'RateSerializable', 'RateBackendable', 'RateThrottleNotifyBaseSerializable',
+	):
+		return None
+	if not _is_stock(rater):
+		return None
+	if _is_instance(rater, 'RaterThrottleBase'):
+		pipeline = _compile_throttle(rater)  # type: ignore[arg-type]
+	else:
+		pipeline = _compile_antiflood(rater)
+	cache = rater._cache  # noqa: SLF001
+	# Check & count are one step for other threads, GCRA locks in `reserve`
+	return _locked(pipeline, cache.lock_of) if cache.is_thread_safe else pipeline
+
+
+def _compile_antiflood(rater: RaterBase) -> Pipeline:
+	cache = rater._cache  # noqa: SLF001
+	make_rate_data = rater._make_rate_data  # noqa: SLF001
+	ttl = rater.period_sec
+	limit = rater.after_handle_count
+	is_debounced = rater._is_debounced  # noqa: SLF001
+	scopes = rater.scopes
+	on_exceed = _compile_notify(rater) if _is_instance(rater, 'RateNotifyBase') else None
+
+	def pipeline(handle: HandleType, event: Any, data: HandleData) -> Awaitable[Any]:
+		user_id = data['event_from_user'].id
+		# Trigger (one lookup)
+		item = cache.get_or_create(user_id, make_rate_data, ttl, touch=is_debounced)
+		rate_data = item.value
+
+		# Proc
+		if limit > rate_data.rate:
+			if scopes is not None:
+				chat = data.get('event_chat')
+				if not scopes.admit(user_id, None if chat is None else chat.id):
+					return DROPPED
+			rate_data.rate += 1
+			return handle(event, data)
+		if on_exceed is not None:
+			on_exceed(user_id, item, data['bot'])
+		return DROPPED
+
+	return pipeline
+
+
+def _compile_notify(rater: RaterBase) -> Callable[[int, CacheItem, Bot], None]:
+	"""Return antiflood notifies of exceeded user as one function."""
+	cache = rater._cache  # noqa: SLF001
+	get_notifier = rater.get_notifier
+	cooldown_message = None
+	warnings_count = 0
+	if _is_instance(rater, 'RateNotifyCooldown'):
+		cooldown_message = rater.cooldown_message
+		warnings_count = rater.warnings_count
+	is_calmed = _is_instance(rater, 'RateNotifyCalmed', 'RateNotifyCC')
+	calmed_callback = getattr(rater, '_calmed_callback', None)
+	calmed_in = rater._calmed_in if _is_instance(rater, 'RateMultiWindow') else None  # noqa: SLF001
+
+	def on_exceed(user_id: int, item: CacheItem, bot: Bot) -> None:
+		rate_data = item.value
+		if cooldown_message is not None and warnings_count > rate_data.sent_warning_count:
+			get_notifier().send(bot, user_id, cooldown_message)
+			rate_data.sent_warning_count += 1
+		if not is_calmed:
+			return
+		if calmed_in is not None:
+			cache.expire(user_id, calmed_in(rate_data))
+		if item.arg is not calmed_callback:
+			get_notifier()
+			item.obj = bot
+			cache.replace_handle_sync_callback(user_id, calmed_callback)
+
+	return on_exceed
+
+
+def _compile_throttle(rater: RaterThrottleBase) -> Pipeline:
+	cache = rater._cache  # noqa: SLF001
+	lock_of = cache.lock_of
+	new_sem = rater._sem_original.copy  # noqa: SLF001
+	reuse_callback = rater.reuse_semaphore_callback
+	ttl = rater.period_sec
+	is_debounced = rater._is_debounced  # noqa: SLF001
+	scopes = rater.scopes
+	get_notifier = rater.get_notifier
+
+	from .extensions.throttling import ThrottleQueueFull
+
+	is_notify = _is_instance(rater, 'RateThrottleNotifyBase')
+	cooldown_message = None
+	warnings_count = 0
+	if _is_instance(rater, 'RateThrottleNotifyCooldown'):
+		cooldown_message = rater.cooldown_message
+		warnings_count = rater.warnings_count
+	calmed_message = (
+		rater.calmed_message  # type: ignore
+		if _is_instance(rater, 'RateThrottleNotifyCalmed', 'RateThrottleNotifyCC') else None
+	)
+
+	def admit(user_id: int, data: HandleData) -> bool:
+		if scopes is None:
+			return True
+		chat = data.get('event_chat')
+		return scopes.admit(user_id, None if chat is None else chat.id)
+
+
+	async def throttled(
+		handle: HandleType, event: Any, data: HandleData,
+		user_id: int, rate_data: RateData, sem: ThrottleSemaphore,
+	) -> Any:
+		try:
+			await sem.acquire()
+		except ThrottleQueueFull:
+			rater.queue_dropped += 1
+			return None
+		if not admit(user_id, data):
+			return None
+		with lock_of(user_id):
+			rate_data.rate += 1
+		return await handle(event, data)
+
+
+	def pipeline(handle: HandleType, event: Any, data: HandleData) -> Awaitable[Any]:
+		user_id = data['event_from_user'].id
+		# Trigger (one lookup)
+		item = cache.get_or_create(
+			user_id, RateData, ttl, touch=is_debounced,
+			obj_factory=new_sem, callback=reuse_callback,
+		)
+		rate_data = item.value
+		sem = item.obj
+
+		# Free slot
+		if sem.try_acquire():
+			if not admit(user_id, data):
+				return DROPPED
+			rate_data.rate += 1
+			return handle(event, data)
+
+		# On exceed rate
+		if is_notify:
+			if sem.is_queue_full() and sem.queue_policy == 'drop_newest':
+				rater.queue_dropped += 1
+				return DROPPED
+			bot = data['bot']
+			if cooldown_message is not None and warnings_count > rate_data.sent_warning_count:
+				get_notifier().send(bot, user_id, cooldown_message)
+				rate_data.sent_warning_count += 1
+			if calmed_message is not None and sem.leak_done_callback is None:
+				sem.on_leak_done_callback(
+					partial(get_notifier().defer, bot, user_id, calmed_message),
+				)
+		return throttled(handle, event, data, user_id, rate_data, sem)
+
+	return pipeline
+
+
+def _compile_gcra(rater: RateGCRA) -> Pipeline:
+	reserve = rater.reserve
+	on_exceed_rate = rater.on_exceed_rate
+	sleep = asyncio.sleep
+
+	async def delayed(handle: HandleType, event: Any, data: HandleData, delay: float) -> Any:
+		await sleep(delay)
+		return await handle(event, data)
+
+
+	def pipeline(handle: HandleType, event: Any, data: HandleData) -> Awaitable[Any]:
+		event_user = data['event_from_user']
+		is_allowed, delay = reserve(event_user.id)
+		if not is_allowed:
+			on_exceed_rate(delay, event_user, data['bot'])
+			return DROPPED
+		if delay:
+			return delayed(handle, event, data, delay)
+		return handle(event, data)
+
+	return pipeline
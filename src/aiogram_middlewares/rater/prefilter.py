@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import TYPE_CHECKING
+
+from .extensions import loaded
+
+if TYPE_CHECKING:
+	from typing import Any, Union
+
+	from .base import RaterBase
+
+	RawUpdate = Union[bytes, str, dict]
+
+
+logger = logging.getLogger(__name__)
+
+
+# Sender of message/callback/inline query/etc. is "from" object of the event & its first key is id
+_FROM_ID = re.compile(rb'"from"\s*:\s*\{\s*"id"\s*:\s*(\d+)')
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"')
+# Update object is the 1st level, event object (message, callback query, ..) is the 2nd one
+_EVENT_DEPTH = 2
+
+
+def user_id_of(raw: RawUpdate) -> int | None:
+	"""Extract sender id from raw update (webhook body or `getUpdates` item), None if no sender.
+
+	Only sender of the event object itself counts (not of replied or other nested messages).
+	"""
+	if isinstance(raw, dict):
+		for value in raw.values():
+			if isinstance(value, dict):
+				sender = value.get('from')
+				return None if sender is None else sender['id']
+		return None
+	if isinstance(raw, str):
+		raw = raw.encode()
+	depth = pos = 0
+	for match in _FROM_ID.finditer(raw):
+		# Nesting level of the match, strings are cut out as they may have braces
+		head = _STRING.sub(b'', raw[pos:match.start()])
+		depth += head.count(b'{') - head.count(b'}')
+		pos = match.start()
+		if depth == _EVENT_DEPTH:
+			return int(match.group(1))
+		if depth < _EVENT_DEPTH:
+			return None
+	return None
+
+
+class RawPrefilter:
+	"""Drops updates of limited users before aiogram parses them into models.
+
+	Uses the cache of antiflood rater (e.g. outer `RateMiddleware`): update is dropped
+	only if the user is already over the limit & notifications are done (so warnings
+	& calmed registration still go through the rater), ttl is reset like the rater does.
+	"""
+
+	def __init__(self: RawPrefilter, rater: RaterBase) -> None:
+		if any(
+			ext is not None and isinstance(rater, ext)
+			for ext in map(loaded, ('RaterThrottleBase', 'RateGCRA', 'RateBackendable'))
+		):
+			msg = (
+				'Prefilter works only with local antiflood rater, '
+				f'got `{rater.__class__.__name__}`'
+			)
+			raise TypeError(msg)
+		self.rater = rater
+		self.dropped = 0
+
+
+	def _is_settled(self: RawPrefilter, item: Any) -> bool:
+		"""Check if rater would drop the update without any notification."""
+		rater = self.rater
+		rate_data = rater._cache.value_of(item)  # noqa: SLF001
+		if rater.after_handle_count > rate_data.rate:
+			return False
+		if getattr(rater, 'cooldown_message', None) is not None and \
+			rater.warnings_count > rate_data.sent_warning_count:  # type: ignore
+			return False
+		if getattr(rater, 'calmed_message', None) is not None:
+			# Calmed notification is already pending
+			return item.arg is rater._calmed_callback  # type: ignore  # noqa: SLF001
+		return True
+
+
+	def check(self: RawPrefilter, raw: RawUpdate) -> bool:
+		"""Return False if update must be dropped (no need to parse & feed it)."""
+		user_id = user_id_of(raw)
+		if user_id is None:
+			return True
+		cache = self.rater._cache  # noqa: SLF001
+		item = cache.get_item(user_id)
+		if item is None or not self._is_settled(item):
+			return True
+		if self.rater._is_debounced:  # noqa: SLF001
+			cache.expire(user_id, self.rater.period_sec)
+		self.dropped += 1
+		return False
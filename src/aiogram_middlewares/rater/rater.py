@@ -4,28 +4,23 @@ import logging
 from functools import partial
 from typing import TYPE_CHECKING
 
+from . import extensions
 from .base import RaterBase
-from .extensions import (
-	RateDebouncable,
-	RateNotifyBase,
-	RateNotifyCalmed,
-	RateNotifyCC,
-	RateNotifyCooldown,
-	RaterThrottleBase,
-	RateSerializable,
-	RateThrottleNotifyBase,
-	RateThrottleNotifyBaseSerializable,
-	RateThrottleNotifyCalmed,
-	RateThrottleNotifyCC,
-	RateThrottleNotifyCooldown,
-)
 
 if TYPE_CHECKING:
 	from asyncio import AbstractEventLoop
-	from typing import Any
+	from typing import Any, Sequence
+
+	from aiogram_middlewares.rater.caches.backend import AsyncRateBackend
 
 	# TODO: Move types..
-	from aiogram_middlewares.rater.extensions.throttling.locks import PositiveFloat, PositiveInt
+	from aiogram_middlewares.rater.extensions.throttling.locks import (
+		PositiveFloat,
+		PositiveInt,
+		QueuePolicy,
+	)
+	from aiogram_middlewares.rater.notifier import NotifyScheduler
+	from aiogram_middlewares.rater.types import CacheFactory
 	from aiogram_middlewares.utils import BaseSerializer
 
 
@@ -44,6 +39,12 @@ logger = logging.getLogger(__name__)
 # TODO: Mb add action on calmdown & after calm
 
 
+def _has(parts: frozenset[type] | tuple[type, ...], name: str) -> bool:
+	"""Check if extension is a part of the assembled class (not imported ones can't be)."""
+	ext = extensions.loaded(name)
+	return ext is not None and ext in parts
+
+
 class AssembleInit:
 
 	# TODO: Move to __new__ in other classes..
@@ -56,14 +57,37 @@ class AssembleInit:
 		cooldown_message: str | None = 'Calm down!',
 		calmed_message: str | None = 'You can chat now',
 
-		topping_up: bool = True,  # noqa: ARG002
+		topping_up: bool = True,
 		is_cache_unity: bool = False,  # Because will throttle twice with filters cache.
 		loop: AbstractEventLoop | None = None,
 
 		# Throttle mode
 		sem_period: PositiveInt | PositiveFloat | None = None,
+		# Waiting updates per user (`None` - unbounded) & what to drop when it's full
+		max_queue: int | None = None, queue_policy: QueuePolicy = 'drop_newest',
+		# GCRA throttle mode (longer delays are rejected, `0` - no delays, `None` - no limit)
+		max_delay: PositiveFloat | None = 1.0,
+
+		cache_factory: CacheFactory | None = None,
+		backend: AsyncRateBackend | None = None,
+		# Outbound queue for notifications (default is shared by the loop)
+		notifier: NotifyScheduler | None = None,
+		# `multi_window` algorithm limits, like `[(1, 3), (60, 20), (3600, 200)]`
+		windows: Sequence[tuple[float, int]] | None = None,
+		# Shared `(period, count)` limits over the user's one (checked before the handler)
+		user_chat_limit: tuple[float, int] | None = None,
+		chat_limit: tuple[float, int] | None = None,
+		global_limit: tuple[float, int] | None = None,
+		# Flattened hot path, `False` keeps the generic chain to trace stages in debug logs
+		compiled: bool = True,
 	) -> None:
-		mro = self.__class__.__mro__
+		# Set of assembled class' parts for the checks below
+		cls = self.__class__
+		mro = cls.__dict__.get('_parts') or cls.__mro__
+		if _has(mro, 'RateMultiWindow'):
+			windows = extensions.RateMultiWindow.check_windows(windows or ())
+			# Record lives by the longest window
+			period_sec, after_handle_count = windows[-1]  # type: ignore
 		RaterBase.__init__(
 			self,
 			period_sec=period_sec, after_handle_count=after_handle_count,
@@ -71,36 +95,57 @@ class AssembleInit:
 			is_cache_unity=is_cache_unity,
 			# TODO: Use loop arg or/and remove in some places..
 			loop=loop,  ##@dep
+			cache_factory=cache_factory,
+			notifier=notifier,
 		)
 
-		if RaterThrottleBase in mro:
+		if _has(mro, 'RateMultiWindow'):
+			extensions.RateMultiWindow.__init__(self, windows=windows)  # type: ignore
+
+		if user_chat_limit is not None or chat_limit is not None or global_limit is not None:
+			from .scopes import ScopeLimits
+			self.scopes = ScopeLimits(
+				user_chat_limit=user_chat_limit, chat_limit=chat_limit, global_limit=global_limit,
+			)
+
+		if _has(mro, 'RateGCRA'):
+			extensions.RateGCRA.__init__(
+				self,
+				max_delay=max_delay,
+				cooldown_message=cooldown_message,
+				calmed_message=calmed_message,
+				warnings_count=warnings_count,
+			)
+
+		if _has(mro, 'RaterThrottleBase'):
 			# TODO: Make it less messy..
-			RaterThrottleBase.__init__(
+			extensions.RaterThrottleBase.__init__(
 				self,
 				sem_period=sem_period,
+				max_queue=max_queue, queue_policy=queue_policy,
 			)
 
-			if RateThrottleNotifyCC in mro:
-				RateThrottleNotifyCC.__init__(
+			if _has(mro, 'RateThrottleNotifyCC'):
+				extensions.RateThrottleNotifyCC.__init__(
 					self,
 					cooldown_message=cooldown_message,
 					calmed_message=calmed_message,
 					warnings_count=warnings_count,
 				)
 			##
-			elif RateThrottleNotifyCooldown in mro:
+			elif _has(mro, 'RateThrottleNotifyCooldown'):
 				logger.debug(
 					'Calmed notify disabled for `%s` at `%s`',
 					self.__class__.__name__, hex(id(self.__class__.__name__)),
 				)
 
-				RateThrottleNotifyCooldown.__init__(
+				extensions.RateThrottleNotifyCooldown.__init__(
 					self,
 					cooldown_message=cooldown_message,
 					warnings_count=warnings_count,
 				)
-			elif RateThrottleNotifyCalmed in mro:
-				RateThrottleNotifyCalmed.__init__(
+			elif _has(mro, 'RateThrottleNotifyCalmed'):
+				extensions.RateThrottleNotifyCalmed.__init__(
 					self,
 					calmed_message=calmed_message,
 				)
@@ -109,36 +154,49 @@ class AssembleInit:
 					self.__class__.__name__, hex(id(self.__class__.__name__)),
 				)
 
-		if RateNotifyCC in mro:
-			RateNotifyCC.__init__(
+		if _has(mro, 'RateNotifyCC'):
+			extensions.RateNotifyCC.__init__(
 				self,
 				cooldown_message=cooldown_message,
 				calmed_message=calmed_message,
 				warnings_count=warnings_count,
 			)
 		##
-		elif RateNotifyCooldown in mro:
+		elif _has(mro, 'RateNotifyCooldown'):
 			logger.debug(
 				'Calmed notify disabled for `%s` at `%s`',
 				self.__class__.__name__, hex(id(self.__class__.__name__)),
 			)
 
-			RateNotifyCooldown.__init__(
+			extensions.RateNotifyCooldown.__init__(
 				self,
 				cooldown_message=cooldown_message,
 				warnings_count=warnings_count,
 			)
-		elif RateNotifyCalmed in mro:
+		elif _has(mro, 'RateNotifyCalmed'):
 			logger.debug(
 				'Cooldown notify disabled for `%s` at `%s`',
 				self.__class__.__name__, hex(id(self.__class__.__name__)),
 			)
 
-			RateNotifyCalmed.__init__(
+			extensions.RateNotifyCalmed.__init__(
 				self,
 				calmed_message=calmed_message,
 			)
 
+		# After notifies (uses their options)
+		if _has(mro, 'RateBackendable'):
+			assert backend is not None  # plug for linter
+			extensions.RateBackendable.__init__(
+				self,
+				backend=backend,
+				topping_up=topping_up,
+			)
+
+		# After all options are set
+		self.is_compiled = compiled
+		self._compile()
+
 
 def make_class_on(
 	name: str | None = None, bases: tuple[type, ...] = (), dt: dict[str, Any] = {}
@@ -149,10 +207,28 @@ def make_class_on(
 	return type(name, bases, dt)
 
 
+def _with_parts(rater_cls: type) -> type:
+	"""Store set of class' MRO for `AssembleInit` (cheap checks on every init)."""
+	rater_cls._parts = frozenset(rater_cls.__mro__)  # type: ignore  # noqa: SLF001
+	return rater_cls
+
+
+# Rate algorithms of antiflood mode (fixed window is the base one)
+ALGORITHMS: dict[str, str | None] = {
+	'fixed': None,
+	'sliding_window': 'RateSlidingWindow',
+	'sliding_log': 'RateSlidingLog',
+	'multi_window': 'RateMultiWindow',
+}
+
+
+# Assembled classes by option signature (options which change the bases)
+_ASSEMBLED: dict[tuple[Any, ...], type] = {}
+
+
 # Assemble throttling
 class RaterAssembler:
 
-	# TODO: Mb cache & move this stuff..
 	def __new__(
 		cls: type, **kwargs: Any,  #~
 	):
@@ -164,64 +240,132 @@ class RaterAssembler:
 		if not bound:
 			msg = "Expected class, got '%s'"
 			raise ValueError(msg % type(bound).__name__)
-		bases: list[type] = [bound, AssembleInit]
 
-		throttling_mode: bool = kwargs.pop('throttling_mode', False)
+		algorithm_name: str = kwargs.pop(
+			'algorithm', 'multi_window' if kwargs.get('windows') else 'fixed',
+		)
+		if algorithm_name != 'multi_window' and kwargs.pop('windows', None) is not None:
+			msg = f'`windows` are only for `multi_window` algorithm, got `{algorithm_name}`'
+			raise ValueError(msg)
+		try:
+			algorithm_ext = ALGORITHMS[algorithm_name]
+		except KeyError:
+			msg = f'Unknown rate algorithm `{algorithm_name}`, expected one of {tuple(ALGORITHMS)}'
+			raise ValueError(msg) from None
+		algorithm = None if algorithm_ext is None else getattr(extensions, algorithm_ext)
+
+		throttling_mode: bool | str = kwargs.pop('throttling_mode', False)
+		if algorithm is not None and (throttling_mode or kwargs.get('backend') is not None):
+			msg = f'Rate algorithm `{algorithm_name}` is only for antiflood mode with local cache'
+			raise ValueError(msg)
+		skip_dupes = kwargs.pop('skip_dupes', False)
+		if throttling_mode == 'gcra':
+			return cls._assemble_gcra(bound, kwargs)
+		kwargs.pop('max_delay', None)
 		if not throttling_mode:
-			kwargs.pop('sem_period', None)
-		rnb = RateNotifyBase if not throttling_mode else RateThrottleNotifyBase
-		if throttling_mode and kwargs.get('data_serializer', _NO_SET) is not _NO_SET:
-			rnb = RateThrottleNotifyBaseSerializable
+			for name in ('sem_period', 'max_queue', 'queue_policy'):
+				kwargs.pop(name, None)
+
+		# FIXME: Use repr..
+		logger.debug('Assembling <%s> Passed non-default args: %s', bound.__name__, str(kwargs))
+
+		topping_up = kwargs.pop('topping_up', _NO_SET)
+		is_backend = kwargs.get('backend') is not None
+		if is_backend:
+			if throttling_mode:
+				msg = 'Throttling mode is not supported with rate backend'
+				raise ValueError(msg)
+			# Debouncing is done by backend's hit
+			kwargs['topping_up'] = bool(topping_up)
+		elif algorithm is not None and topping_up is False:
+			# Window state of active user must not expire
+			logger.warning('Debouncing is always on with `%s` algorithm', algorithm_name)
+
+		signature = (
+			bound, algorithm, bool(throttling_mode), is_backend,
+			kwargs.get('data_serializer', _NO_SET) is not _NO_SET,
+			kwargs.get('cooldown_message', _NO_SET) is not None,
+			kwargs.get('calmed_message', _NO_SET) is not None,
+			bool(topping_up), skip_dupes,
+		)
+		rater_cls = _ASSEMBLED.get(signature)
+		if rater_cls is None:
+			rater_cls = _ASSEMBLED[signature] = cls._assemble(*signature)
+		return rater_cls(**kwargs)
+
+
+	@staticmethod
+	def _assemble(
+		bound: type, algorithm: type | None, throttling_mode: bool, is_backend: bool,
+		is_serializing: bool, is_cooldown: bool, is_calmed: bool,
+		topping_up: bool, skip_dupes: bool,
+	) -> type:
+		bases: list[type] = [bound, AssembleInit]
+		# Notify base is a part of notify classes only, so raters without notifies don't have
+		# it in MRO, as it always was. Its module is imported only if some notify is on.
+		rnb: type = RaterBase  # Unused placeholder for no notifies
+		if is_cooldown or is_calmed:
+			rnb = extensions.RateNotifyBase
+			if throttling_mode:
+				rnb = extensions.RateThrottleNotifyBase
+			if throttling_mode and is_serializing:
+				rnb = extensions.RateThrottleNotifyBaseSerializable
 		log__onis_throttle_notify = lambda: logger.debug(  # noqa: E731
 			'Throttling mode enabled, notifications will based on `%s`',
 			rnb.__name__,  ##
 		) if throttling_mode else ...
 
-		# FIXME: Use repr..
-		logger.debug('Assembling <%s> Passed non-default args: %s', bound.__name__, str(kwargs))
-
-		if kwargs.get('data_serializer', _NO_SET) is not _NO_SET and not throttling_mode:
-			bases.append(RateSerializable)
+		if is_serializing and not throttling_mode:
+			bases.append(extensions.RateSerializable)
 
 		# FIXME: Recheck! & queuing..
-		if kwargs.get('cooldown_message', _NO_SET) is not None and \
-			kwargs.get('calmed_message', _NO_SET) is not None:
+		if is_cooldown and is_calmed:
 			# TODO: Make func/meta for this stuff..
 			rncc = make_class_on(
 				bases=(
-					RateNotifyCC if not throttling_mode else RateThrottleNotifyCC, rnb,
+					extensions.RateNotifyCC if not throttling_mode
+					else extensions.RateThrottleNotifyCC,
+					rnb,
 				),
 			)
 			log__onis_throttle_notify()
 			bases.append(rncc)
 		##
-		elif kwargs.get('cooldown_message', _NO_SET) is not None:
+		elif is_cooldown:
 			rnc = make_class_on(
 				bases=(
-					RateNotifyCooldown if not throttling_mode else RateThrottleNotifyCooldown, rnb,
+					extensions.RateNotifyCooldown if not throttling_mode
+					else extensions.RateThrottleNotifyCooldown,
+					rnb,
 				),
 			)
 			log__onis_throttle_notify()
 			bases.append(rnc)
-		elif kwargs.get('calmed_message', _NO_SET) is not None:
+		elif is_calmed:
 			rncd = make_class_on(
 				bases=(
-					RateNotifyCalmed if not throttling_mode else RateThrottleNotifyCalmed, rnb,
+					extensions.RateNotifyCalmed if not throttling_mode
+					else extensions.RateThrottleNotifyCalmed,
+					rnb,
 				),
 			)
 			log__onis_throttle_notify()
 			bases.append(rncd)
 
 
-		if kwargs.pop('topping_up', _NO_SET):
-			bases.append(RateDebouncable)
+		if is_backend:
+			bases.append(extensions.RateBackendable)
+		elif algorithm is not None:
+			bases.extend((algorithm, extensions.RateDebouncable))
+		elif topping_up:
+			bases.append(extensions.RateDebouncable)
 
 		if throttling_mode:
 			logger.debug(
 				'Throttling mode enabled, middleware will based on %s',
-				RaterThrottleBase.__name__,
+				extensions.RaterThrottleBase.__name__,
 			)
-			bases.append(RaterThrottleBase)
+			bases.append(extensions.RaterThrottleBase)
 
 		bases.append(RaterBase)
 
@@ -229,7 +373,7 @@ class RaterAssembler:
 		del bases
 
 		# Check duplicates
-		if len(_bases) != len(set(_bases)) and not kwargs.pop('skip_dupes'):
+		if len(_bases) != len(set(_bases)) and not skip_dupes:
 			msg = 'MRO has duplicates!'
 			raise TypeError(msg)
 
@@ -239,8 +383,28 @@ class RaterAssembler:
 			bound.__name__,
 			f"[{', '.join(c.__name__ for c in _bases)}]",
 		)
-		obj = make_class_on(bases=_bases)
-		return obj(**kwargs)
+		return _with_parts(make_class_on(bases=_bases))
+
+
+	@staticmethod
+	def _assemble_gcra(bound: type, kwargs: dict[str, Any]) -> Any:
+		# State is single float, so notifies, serializing & debouncing are its own
+		if kwargs.get('backend') is not None:
+			msg = 'GCRA throttling mode is not supported with rate backend'
+			raise ValueError(msg)
+		if any(kwargs.get(name) for name in ('user_chat_limit', 'chat_limit', 'global_limit')):
+			msg = 'GCRA throttling mode is not supported with chat & global limits'
+			raise ValueError(msg)
+		for name in ('sem_period', 'max_queue', 'queue_policy', 'topping_up', 'backend'):
+			kwargs.pop(name, None)
+		logger.debug('GCRA throttling mode enabled for <%s>', bound.__name__)
+		signature = (bound, 'gcra')
+		rater_cls = _ASSEMBLED.get(signature)
+		if rater_cls is None:
+			rater_cls = _ASSEMBLED[signature] = _with_parts(make_class_on(
+				bases=(bound, AssembleInit, extensions.RateGCRA, RaterBase),
+			))
+		return rater_cls(**kwargs)
 
 
 # Pass class
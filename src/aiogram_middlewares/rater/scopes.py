@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from .caches import LazyDeadlineCache
+
+if TYPE_CHECKING:
+	from typing import Any, Tuple
+
+	from .caches import DeadlineItem
+
+	Limit = Tuple[float, int]  # (period, count)
+
+
+logger = logging.getLogger(__name__)
+
+
+def _check_limit(name: str, limit: Limit) -> Limit:
+	period, count = limit
+	if period <= 0 or count < 1:
+		msg = f'`{name}` period & count must be positive, got `{limit}`'
+		raise ValueError(msg)
+	return period, count
+
+
+class GlobalBucket:
+	"""Fixed window counter shared by all users (mutated in place)."""
+
+	__slots__ = (
+		'period',
+		'limit',
+		'start',
+		'count',
+	)
+
+	def __init__(self: GlobalBucket, period: float, limit: int) -> None:
+		self.period = period
+		self.limit = limit
+		self.start = float('-inf')
+		self.count = 0
+
+
+	def is_full(self: GlobalBucket, now: float) -> bool:
+		if now - self.start >= self.period:
+			self.start = now
+			self.count = 0
+		return self.count >= self.limit
+
+
+class ScopeLimits:
+	"""Limits over the user's one: per (user, chat), per chat & global fixed windows.
+
+	Checked right before the handler (after the user's own limit), the update is
+	charged in every scope only if all of them have room, else it's dropped silently
+	(no notifications for raided chats). Chat counters are cache items by chat id
+	(created once per window, then counted in place), global one is a single bucket.
+	"""
+
+	def __init__(
+		self: ScopeLimits, *,
+		user_chat_limit: Limit | None = None,
+		chat_limit: Limit | None = None,
+		global_limit: Limit | None = None,
+	) -> None:
+		self._user_chat: LazyDeadlineCache | None = None
+		self._user_chat_limit = 0
+		if user_chat_limit is not None:
+			period, self._user_chat_limit = _check_limit('user_chat_limit', user_chat_limit)
+			self._user_chat = LazyDeadlineCache(ttl=period)
+
+		self._chat: LazyDeadlineCache | None = None
+		self._chat_limit = 0
+		if chat_limit is not None:
+			period, self._chat_limit = _check_limit('chat_limit', chat_limit)
+			self._chat = LazyDeadlineCache(ttl=period)
+
+		self._global = None if global_limit is None else GlobalBucket(
+			*_check_limit('global_limit', global_limit),
+		)
+
+		self.dropped_user_chat = 0
+		self.dropped_chat = 0
+		self.dropped_global = 0
+
+
+	@staticmethod
+	def _room(cache: LazyDeadlineCache, key: Any, limit: int) -> DeadlineItem | bool:
+		"""Return counter item (or True for a new window) if there is room, else False."""
+		item = cache.get_item(key)
+		if item is None:
+			return True
+		return item if item.value < limit else False
+
+
+	@staticmethod
+	def _charge(cache: LazyDeadlineCache, key: Any, room: DeadlineItem | bool) -> None:
+		if room is True:
+			cache.set(key, 1, ttl=cache._ttl)  # noqa: SLF001
+		else:
+			room.value += 1  # type: ignore
+
+
+	def admit(self: ScopeLimits, user_id: int, chat_id: int | None) -> bool:
+		"""Check all scopes & charge them if the update is allowed."""
+		bucket = self._global
+		if bucket is not None and bucket.is_full(monotonic()):
+			self.dropped_global += 1
+			return False
+		if chat_id is None:
+			# Update without chat (inline query, etc.) - only global scope
+			if bucket is not None:
+				bucket.count += 1
+			return True
+
+		chat_room: DeadlineItem | bool = True
+		if self._chat is not None:
+			chat_room = self._room(self._chat, chat_id, self._chat_limit)
+			if chat_room is False:
+				self.dropped_chat += 1
+				return False
+		user_chat_room: DeadlineItem | bool = True
+		user_chat = None
+		if self._user_chat is not None:
+			user_chat = (user_id, chat_id)
+			user_chat_room = self._room(self._user_chat, user_chat, self._user_chat_limit)
+			if user_chat_room is False:
+				self.dropped_user_chat += 1
+				return False
+
+		if bucket is not None:
+			bucket.count += 1
+		if self._chat is not None:
+			self._charge(self._chat, chat_id, chat_room)
+		if self._user_chat is not None:
+			self._charge(self._user_chat, user_chat, user_chat_room)
+		return True
+
+
+	def as_dict(self: ScopeLimits) -> dict[str, int]:
+		return {
+			'dropped_user_chat': self.dropped_user_chat,
+			'dropped_chat': self.dropped_chat,
+			'dropped_global': self.dropped_global,
+		}
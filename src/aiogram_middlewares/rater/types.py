@@ -9,7 +9,8 @@ if TYPE_CHECKING:
 	from aiogram import Bot
 	from aiogram.types import Update, User
 
-	from .caches import _ASMCLazyBackend
+	from .caches import AsyncRateBackend as _ASMCLazyBackend
+	from .caches import LazyMemoryCache
 	from .models import RateData, ThrottleData
 
 	# Outer (on handlers): TelegramEventObserver.trigger
@@ -38,6 +39,8 @@ if TYPE_CHECKING:
 		[Union[_RD, None], User, int, Bot], Awaitable[Union[RateData, _RD]],
 	]
 
+	_SyncTriggerMethod = Callable[[User, int], Union[RateData, _RD]]
+
 	_ProcHandleMethod = Callable[
 		[
 			HandleType, RateData,
@@ -67,3 +70,6 @@ if TYPE_CHECKING:
 		],
 		Awaitable[Union[bool, int]],
 	]
+
+	# Called with `ttl` & `data_serializer` keywords, factory must accept the last one if it's set
+	CacheFactory = Callable[..., LazyMemoryCache]
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pickle import DEFAULT_PROTOCOL
+from pickle import dumps as pickle_dumps
+from pickle import loads as pickle_loads
+from typing import TYPE_CHECKING
+
+from brotli import compress as brotli_compress
+from brotli import decompress as brotli_decompress
+
+from .utils import BaseSerializer
+
+if TYPE_CHECKING:
+	from typing import Any
+
+
+# TODO: Move it to different lib..
+# My brotlidded-pickle serializer UwU
+class BrotliedPickleSerializer(BaseSerializer):
+	"""Transform data to bytes.
+
+	Using pickle.dumps and pickle.loads with brotli compression to retrieve it back
+	"""
+
+	DEFAULT_ENCODING = None
+
+	def __init__(
+		self: BrotliedPickleSerializer, *args: Any,
+		pickle_protocol: int = DEFAULT_PROTOCOL,
+		**kwargs: Any
+	) -> None:
+		super().__init__(*args, **kwargs)
+		# TODO: More options..
+		self.pickle_protocol = pickle_protocol
+
+	def serialize(self: BrotliedPickleSerializer, value: object) -> bytes:
+		"""Serialize the received value using ``pickle.dumps`` and compresses using brotli."""
+		return brotli_compress(pickle_dumps(value, protocol=self.pickle_protocol))
+
+	def deserialize(self: BrotliedPickleSerializer, value: bytes | None) -> object:
+		"""Decompresses using brotli & deserialize value using ``pickle.loads``."""
+		if value is None:
+			return None
+		return pickle_loads(brotli_decompress(value))  # noqa: S301
@@ -3,33 +3,27 @@ from __future__ import annotations
 import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from pickle import DEFAULT_PROTOCOL
-from pickle import dumps as pickle_dumps
-from pickle import loads as pickle_loads
+from importlib import import_module
 from typing import TYPE_CHECKING
 
-from brotli import compress as brotli_compress
-from brotli import decompress as brotli_decompress
-
 if TYPE_CHECKING:
 	# Cheat XD
 	from dataclasses import dataclass as make_dataclass
-	from typing import Any
+	from typing import Any, Callable
 
 # Well..
 def make_dataclass(*args: Any, **kwargs: Any):  # noqa: F811,ANN201
 	"""Wrap around @dataclass decorator with python version check to pick kwargs."""
-	# TODO: Use `sys.version_info > (3, 10)`
-	pyv = (sys.version_info.major, sys.version_info.minor)
 	# TODO: More features..
 	defs = {
-		# 'slots': (True, (3, 10)),  # Glitches.. [ AttributeError: 'member_descriptor' object has no attribute 'locked' ]
+		# NOTE: Don't use class as default in `dict.get(key, cls).field` with slots
+		# (class attrs are `member_descriptor`s then)
+		'slots': (True, (3, 10)),
 		'kw_only': (True, (3, 10)),
 	}
-	for arg, vp in defs.items():
-		p = vp[1]
-		if arg not in kwargs and pyv[0] >= p[0] and pyv[1] >= p[1]:
-			kwargs[arg] = vp[0]
+	for arg, (value, since) in defs.items():
+		if arg not in kwargs and sys.version_info >= since:
+			kwargs[arg] = value
 	return dataclass(*args, **kwargs)
 
 
@@ -43,31 +37,23 @@ class BaseSerializer(ABC):
 		raise NotImplementedError
 
 
-# TODO: Move it to different lib..
-# My brotlidded-pickle serializer UwU
-class BrotliedPickleSerializer(BaseSerializer):
-	"""Transform data to bytes.
+def lazy_module_getattr(module: str, names: dict[str, str]) -> Callable[[str], Any]:
+	"""Make module `__getattr__` importing optional parts on first access.
 
-	Using pickle.dumps and pickle.loads with brotli compression to retrieve it back
+	`names` maps attribute to its module (relative to the package), e.g. `{'RateGCRA': '.gcra'}`.
 	"""
-
-	DEFAULT_ENCODING = None
-
-	def __init__(
-		self: BrotliedPickleSerializer, *args: Any,
-		pickle_protocol: int = DEFAULT_PROTOCOL,
-		**kwargs: Any
-	) -> None:
-		super().__init__(*args, **kwargs)
-		# TODO: More options..
-		self.pickle_protocol = pickle_protocol
-
-	def serialize(self: BrotliedPickleSerializer, value: object) -> bytes:
-		"""Serialize the received value using ``pickle.dumps`` and compresses using brotli."""
-		return brotli_compress(pickle_dumps(value, protocol=self.pickle_protocol))
-
-	def deserialize(self: BrotliedPickleSerializer, value: bytes | None) -> object:
-		"""Decompresses using brotli & deserialize value using ``pickle.loads``."""
-		if value is None:
-			return None
-		return pickle_loads(brotli_decompress(value))  # noqa: S301
+	def __getattr__(name: str) -> Any:  # noqa: N807
+		path = names.get(name)
+		if path is None:
+			msg = f'module {module!r} has no attribute {name!r}'
+			raise AttributeError(msg)
+		this = sys.modules[module]
+		value = getattr(import_module(path, this.__package__), name)
+		# Next access is plain attribute lookup
+		setattr(this, name, value)
+		return value
+	return __getattr__
+
+
+# Serializers need optional `brotli`
+__getattr__ = lazy_module_getattr(__name__, {'BrotliedPickleSerializer': '.serializers'})
@@ -14,6 +14,8 @@ logger = logging.getLogger(__name__)
 
 
 class FakeBot:
+	id = 123456  # Token's one
+
 	async def send_message(self: FakeBot, chat_id: int, text: str, *args, **kwargs) -> None:
 		# print('%s -> %i' % (text, chat_id))
 		logger.info('%s -> %i', text, chat_id)
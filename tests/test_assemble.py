@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater import extensions
+from aiogram_middlewares.rater.base import RaterBase
+
+if TYPE_CHECKING:
+	from typing import Any
+
+# Notify parts of assembled rater by `(cooldown, calmed)` messages
+NOTIFY_PARTS = {
+	(False, False): (),
+	(True, False): ('RateNotifyCooldown', 'RateNotifyBase'),
+	(False, True): ('RateNotifyCalmed', 'RateNotifyBase'),
+	(True, True): ('RateNotifyCC', 'RateNotifyCooldown', 'RateNotifyBase'),
+}
+NOTIFY_NAMES = {
+	'RateMiddleABC', 'RateNotifyBase', 'RateNotifyCooldown', 'RateNotifyCalmed', 'RateNotifyCC',
+	'RateThrottleMiddleABC', 'RateThrottleNotifyBase', 'RateThrottleNotifyBaseSerializable',
+	'RateThrottleNotifyCooldown', 'RateThrottleNotifyCalmed', 'RateThrottleNotifyCC',
+}
+
+
+def make(**options: Any) -> Any:
+	async def main() -> Any:
+		return RateMiddleware(**options)
+
+	return asyncio.run(main())
+
+
+@pytest.mark.parametrize(('messages', 'parts'), NOTIFY_PARTS.items(), ids=str)
+@pytest.mark.parametrize('throttling_mode', [False, True], ids=['antiflood', 'throttle'])
+def test_notify_parts(
+	messages: tuple[bool, bool], parts: tuple[str, ...], throttling_mode: bool,  # noqa: FBT001
+) -> None:
+	is_cooldown, is_calmed = messages
+	rater = make(
+		cooldown_message='Calm down!' if is_cooldown else None,
+		calmed_message='Calmed' if is_calmed else None,
+		throttling_mode=throttling_mode, sem_period=1,
+	)
+	if throttling_mode:
+		parts = tuple(name.replace('RateNotify', 'RateThrottleNotify') for name in parts)
+	mro = [cls.__name__ for cls in type(rater).__mro__ if cls.__name__ in NOTIFY_NAMES]
+	# Notify base is a part of notify classes only, none of them without notifies
+	if parts:
+		parts = (*parts, 'RateThrottleMiddleABC' if throttling_mode else 'RateMiddleABC')
+	assert list(dict.fromkeys(mro)) == list(parts)
+	if not parts:
+		base = extensions.RaterThrottleBase if throttling_mode else RaterBase
+		assert type(rater).decide is base.decide
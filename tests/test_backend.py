@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+from aiogram.types import User
+
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater.caches import (
+	HitVerdict,
+	MemoryRateBackend,
+	RedisRateBackend,
+	SharedMemoryRateBackend,
+)
+from aiogram_middlewares.rater.models import RateData
+
+if TYPE_CHECKING:
+	from typing import Any, Awaitable, Callable
+
+	from aiogram_middlewares.rater.caches import AsyncRateBackend
+
+
+def redis_backend() -> RedisRateBackend:
+	fakeredis = pytest.importorskip('fakeredis', reason='Needs `fakeredis[lua]`')
+	pytest.importorskip('lupa', reason='Lua scripts of `fakeredis` need `lupa`')
+	return RedisRateBackend(client=fakeredis.FakeAsyncRedis())
+
+
+BACKENDS: dict[str, Callable[[], AsyncRateBackend]] = {
+	'memory': MemoryRateBackend,
+	'redis': redis_backend,
+	'shared memory': lambda: SharedMemoryRateBackend(capacity=1024, stripes=4),
+}
+
+
+@pytest.fixture(params=BACKENDS.values(), ids=BACKENDS.keys())
+def run(request: pytest.FixtureRequest) -> Callable[[Callable[..., Awaitable[Any]]], Any]:
+	"""Run the check with backend made in the loop (memory one sweeps on it)."""
+
+	def run(check: Callable[[AsyncRateBackend], Awaitable[Any]]) -> Any:
+		async def main() -> Any:
+			backend = request.param()
+			try:
+				return await check(backend)
+			finally:
+				await backend.close()
+
+		return asyncio.run(main())
+
+	return run
+
+
+def test_hit_verdicts(run: Callable[..., Any]) -> None:
+	async def check(backend: AsyncRateBackend) -> None:
+		hits = [await backend.hit(1, ttl=10, limit=2, warnings_limit=1) for _ in range(4)]
+		# Counters are the ones before the hit
+		assert [(hit.verdict, hit.rate, hit.sent_warning_count) for hit in hits] == [
+			(HitVerdict.PASS, 0, 0),
+			(HitVerdict.PASS, 1, 0),
+			(HitVerdict.WARN, 2, 0),
+			(HitVerdict.DROP, 2, 1),
+		]
+		assert await backend.get(1) == RateData(rate=2, sent_warning_count=1)
+		assert await backend.get(2) is None
+
+		assert await backend.delete(1)
+		assert not await backend.delete(1)
+		assert (await backend.hit(1, ttl=10, limit=2)).verdict is HitVerdict.PASS
+
+	run(check)
+
+
+def test_hit_many(run: Callable[..., Any]) -> None:
+	async def check(backend: AsyncRateBackend) -> None:
+		hits = await backend.hit_many([1, 1, 2, 1], ttl=10, limit=2)
+		assert [hit.verdict for hit in hits] == [
+			HitVerdict.PASS, HitVerdict.PASS, HitVerdict.PASS, HitVerdict.DROP,
+		]
+		assert [hit.rate for hit in hits] == [0, 1, 0, 2]
+
+	run(check)
+
+
+def test_ttl_and_debounce(run: Callable[..., Any]) -> None:
+	async def check(backend: AsyncRateBackend) -> None:
+		hit = await backend.hit(1, ttl=0.5, limit=10)
+		assert 0.4 < hit.remaining <= 0.5  # noqa: PLR2004
+		await asyncio.sleep(0.2)
+		# Not debounced one keeps the deadline, debounced one resets it
+		assert (await backend.hit(1, ttl=0.5, limit=10, debounce=False)).remaining < 0.4  # noqa: PLR2004
+		assert (await backend.hit(1, ttl=0.5, limit=10)).remaining > 0.4  # noqa: PLR2004
+		await asyncio.sleep(0.6)
+		assert await backend.get(1) is None
+		assert (await backend.hit(1, ttl=0.5, limit=10)).rate == 0
+
+	run(check)
+
+
+def test_shared_by_workers(run: Callable[..., Any]) -> None:
+	user = User(id=1, is_bot=False, first_name='User')
+
+	async def check(backend: AsyncRateBackend) -> None:
+		handled = []
+
+		async def handler(event: Any, data: dict[str, Any]) -> None:
+			handled.append(data['worker'])
+
+		# Middlewares of several workers over the same storage
+		workers = [
+			RateMiddleware(
+				period_sec=10, after_handle_count=3, backend=backend,
+				cooldown_message=None, calmed_message=None,
+			)
+			for _ in range(2)
+		]
+		for i in range(10):
+			data = {'event_from_user': user, 'bot': None, 'worker': i % 2}
+			await workers[i % 2](handler, None, data)  # type: ignore
+		assert handled == [0, 1, 0]
+		assert (await backend.get(user.id)).rate == 3  # type: ignore  # noqa: PLR2004
+
+	run(check)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import pickle
+import sys
+import zlib
+from typing import TYPE_CHECKING
+
+import pytest
+
+from aiogram_middlewares.rater.caches import (
+	BoundedLazyDeadlineCache,
+	BoundedLazyMemoryCache,
+)
+from aiogram_middlewares.rater.caches.bounded import BoundedCacheMixin
+from aiogram_middlewares.rater.caches.lazy_deadline import LazyDeadlineCacheSerializable
+from aiogram_middlewares.utils import BaseSerializer
+
+if TYPE_CHECKING:
+	from typing import Any, Callable
+
+CACHES = {'loop timers': BoundedLazyMemoryCache, 'deadline': BoundedLazyDeadlineCache}
+VALUE = 'x' * 10_000  # Compressible, so its encoded size is far less
+OVERHEAD = BoundedCacheMixin.ENTRY_OVERHEAD
+
+
+class ZipSerializer(BaseSerializer):
+
+	def serialize(self: ZipSerializer, value: object) -> bytes:
+		return zlib.compress(pickle.dumps(value))
+
+
+	def deserialize(self: ZipSerializer, value: bytes | None) -> object:
+		return None if value is None else pickle.loads(zlib.decompress(value))  # noqa: S301
+
+
+class BoundedSerializableCache(BoundedCacheMixin, LazyDeadlineCacheSerializable):
+	...
+
+
+def in_loop(func: Callable[[], Any]) -> Any:
+	"""Run in the loop (caches bind timers & sweeper to it)."""
+
+	async def main() -> Any:
+		return func()
+
+	return asyncio.run(main())
+
+
+@pytest.mark.parametrize('cache_class', CACHES.values(), ids=CACHES.keys())
+@pytest.mark.parametrize(
+	('policy', 'ops', 'evicted'),
+	[
+		# Read of `a` makes `b` the least recently used one
+		('lru', [('get', 'a')], ['b', 'c']),
+		# `a` & `c` are read, new `d` is the least frequently used one on the next set
+		('lfu', [('get', 'a'), ('get', 'a'), ('get', 'c')], ['b', 'd']),
+		# Reads don't matter, expiry does
+		('soonest', [('get', 'b')], ['b', 'c']),
+	],
+)
+def test_eviction_policy(
+	cache_class: type, policy: str, ops: list[tuple[str, str]], evicted: list[str],
+) -> None:
+	def check() -> None:
+		victims: list[str] = []
+		cache = cache_class(
+			ttl=60, max_items=3, policy=policy, on_evict=lambda key, item: victims.append(key),
+		)
+		for key, ttl in (('a', 30), ('b', 10), ('c', 20)):
+			cache.set(key, key.upper(), ttl=ttl)
+		for op, key in ops:
+			getattr(cache, op)(key)
+		cache.set('d', 'D', ttl=40)
+		cache.set('e', 'E', ttl=50)
+		assert victims == evicted
+		assert cache.evictions == len(evicted)
+		assert len(cache._cache) == 3  # noqa: PLR2004
+		assert not any(cache.has_key(key) for key in victims)
+
+	in_loop(check)
+
+
+@pytest.mark.parametrize('cache_class', CACHES.values(), ids=CACHES.keys())
+def test_byte_limit(cache_class: type) -> None:
+	size = OVERHEAD + sys.getsizeof(VALUE)
+
+	def check() -> None:
+		cache = cache_class(ttl=60, max_bytes=3 * size)
+		for key in range(5):
+			cache.set(key, VALUE)
+		assert [key for key in range(5) if cache.has_key(key)] == [2, 3, 4]
+		assert cache.used_bytes == 3 * size
+
+		cache.update(2, 'small')
+		assert cache.used_bytes == 2 * size + OVERHEAD + sys.getsizeof('small')
+		cache.update_item(3, cache.get_item(3), 'small')
+		for key in (2, 3, 4):
+			cache.delete(key)
+		assert cache.used_bytes == 0
+
+	in_loop(check)
+
+
+def test_byte_limit_with_serializer() -> None:
+	encoded = ZipSerializer().serialize(VALUE)
+	size = OVERHEAD + sys.getsizeof(encoded)
+	assert size < sys.getsizeof(VALUE)
+
+	def check() -> None:
+		# Raw values wouldn't fit even once, encoded ones fit 3 times
+		cache = BoundedSerializableCache(
+			ttl=60, max_bytes=3 * size, data_serializer=ZipSerializer(),
+		)
+		for key in range(5):
+			cache.set(key, VALUE)
+		assert [key for key in range(5) if cache.has_key(key)] == [2, 3, 4]
+		assert cache.used_bytes == 3 * size
+		assert cache.get(4) == VALUE
+
+		cache.update(2, 'small')
+		cache.update_item(3, cache.get_item(3), 'small')
+		small = OVERHEAD + sys.getsizeof(ZipSerializer().serialize('small'))
+		assert cache.used_bytes == 2 * small + size
+		for key in (2, 3, 4):
+			cache.delete(key)
+		assert cache.used_bytes == 0
+
+	in_loop(check)
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import asyncio
+from heapq import heappop, heappush
+from itertools import count
+from typing import TYPE_CHECKING
+
+import pytest
+
+from aiogram_middlewares.rater.caches import (
+	LazyDeadlineCache,
+	LazyMemoryCache,
+	TimerWheel,
+	lazy_deadline,
+	lazy_ttl,
+)
+
+if TYPE_CHECKING:
+	from contextvars import Context
+	from typing import Any, Callable
+
+TICK = 0.1
+
+
+class FakeLoop:
+	"""Clock & timers of event loop only, time is advanced by hand."""
+
+	def __init__(self: FakeLoop) -> None:
+		self.now = 0.0
+		self._timers: list[tuple[float, int, asyncio.TimerHandle]] = []
+		self._seq = count()
+
+
+	def time(self: FakeLoop) -> float:
+		return self.now
+
+
+	def get_debug(self: FakeLoop) -> bool:
+		return False
+
+
+	def call_at(
+		self: FakeLoop, when: float, callback: Callable, *args: Any,
+		context: Context | None = None,
+	) -> asyncio.TimerHandle:
+		handle = asyncio.TimerHandle(when, callback, args, self, context)  # type: ignore
+		heappush(self._timers, (when, next(self._seq), handle))
+		return handle
+
+
+	def call_later(
+		self: FakeLoop, delay: float, callback: Callable, *args: Any,
+		context: Context | None = None,
+	) -> asyncio.TimerHandle:
+		return self.call_at(self.now + delay, callback, *args, context=context)
+
+
+	def call_soon(
+		self: FakeLoop, callback: Callable, *args: Any, context: Context | None = None,
+	) -> asyncio.TimerHandle:
+		return self.call_at(self.now, callback, *args, context=context)
+
+
+	def _timer_handle_cancelled(self: FakeLoop, handle: asyncio.TimerHandle) -> None:
+		pass
+
+
+	def call_exception_handler(self: FakeLoop, context: dict[str, Any]) -> None:
+		raise context['exception']
+
+
+	def advance(self: FakeLoop, seconds: float) -> None:
+		"""Move the clock, timers due by then are fired in order."""
+		target = self.now + seconds
+		while self._timers and self._timers[0][0] <= target:
+			when, _, handle = heappop(self._timers)
+			if not handle.cancelled():
+				self.now = max(self.now, when)
+				handle._run()
+		self.now = target
+
+
+class CountingDict(dict):
+	"""Counts lookups by `get` (sweeper reads items by it)."""
+
+	lookups = 0
+
+	def get(self: CountingDict, key: Any, default: Any = None) -> Any:
+		self.lookups += 1
+		return super().get(key, default)
+
+
+@pytest.fixture()
+def loop(monkeypatch: pytest.MonkeyPatch) -> FakeLoop:
+	loop = FakeLoop()
+	# Timer-free cache reads deadlines by monotonic clock (same as loop's one)
+	monkeypatch.setattr(lazy_deadline, 'monotonic', loop.time)
+	return loop
+
+
+def make_caches(loop: FakeLoop) -> dict[str, LazyMemoryCache]:
+	return {
+		'loop timers': LazyMemoryCache(ttl=10, loop=loop),  # type: ignore
+		'timer wheel': LazyMemoryCache(
+			ttl=10, loop=loop, timer_wheel=TimerWheel(tick=TICK, loop=loop),  # type: ignore
+		),
+	}
+
+
+def test_wheel_timers(loop: FakeLoop) -> None:
+	wheel = TimerWheel(tick=TICK, loop=loop)  # type: ignore
+	cache = LazyMemoryCache(ttl=10, loop=loop, timer_wheel=wheel)  # type: ignore
+	cache.set('a', 1, ttl=1)
+	cache.set('b', 2, ttl=5)
+	# Over the first level (64 ticks), so it's cascaded down on the way
+	cache.set('c', 3, ttl=100)
+	assert len(wheel) == 3  # noqa: PLR2004
+
+	loop.advance(1 - TICK / 2)
+	assert cache.has_key('a')
+	loop.advance(TICK)  # At most one tick late
+	assert not cache.has_key('a')
+
+	# Moved timer fires by the new ttl
+	cache.expire('b', 3)
+	loop.advance(3 - TICK)
+	assert cache.has_key('b')
+	loop.advance(2 * TICK)
+	assert not cache.has_key('b')
+
+	loop.advance(100 - loop.now - TICK)
+	assert cache.has_key('c')
+	loop.advance(2 * TICK)
+	assert not cache.has_key('c')
+	assert len(wheel) == 0
+
+
+@pytest.mark.parametrize('kind', ['loop timers', 'timer wheel'])
+def test_group_timers(loop: FakeLoop, kind: str) -> None:
+	cache = make_caches(loop)[kind]
+	granularity = cache.GROUP_GRANULARITY
+	assert cache.set_many([(1, 'x'), (2, 'y'), (3, 'z')], ttl=2) == 3  # noqa: PLR2004
+	assert isinstance(cache.get_item(1).handle, lazy_ttl._GroupTimer)
+
+	# Group member gets own timer when it's touched or re-set
+	cache.expire(2, 5)
+	cache.set(3, 'z', ttl=0.5)
+	assert not isinstance(cache.get_item(2).handle, lazy_ttl._GroupTimer)
+
+	loop.advance(0.5 + granularity)
+	assert cache.get_many([1, 2, 3]) == ['x', 'y', None]
+	loop.advance(2 - loop.now - granularity)
+	assert cache.has_key(1)
+	loop.advance(2 * granularity)
+	assert cache.get_many([1, 2]) == [None, 'y']
+	loop.advance(5 - loop.now + granularity)
+	assert not cache.has_key(2)
+
+	# Batch prolonging of the group
+	cache.set_many([(1, 'x'), (2, 'y')], ttl=1)
+	loop.advance(0.5)
+	assert cache.expire_many([1, 2, 3], ttl=1) == 2  # noqa: PLR2004
+	loop.advance(1 - granularity)
+	assert cache.get_many([1, 2]) == ['x', 'y']
+	loop.advance(2 * granularity)
+	assert cache.get_many([1, 2]) == [None, None]
+
+
+@pytest.mark.parametrize('kind', ['loop timers', 'timer wheel'])
+def test_expiry_callbacks(loop: FakeLoop, kind: str) -> None:
+	calls: list[Any] = []
+
+	async def subcall() -> None:
+		calls.append('subcall')
+
+	async def main() -> None:
+		cache = make_caches(loop)[kind]
+		cache.set('sync', 1, ttl=1)
+		cache.set_handle_sync_subcallback('sync', lambda: calls.append('sync'))
+		cache.set('subcall', 2, ttl=1)
+		cache.set_handle_subcallback('subcall', subcall)
+		cache.set('item', 3, ttl=1)
+		cache.replace_handle_sync_callback(
+			'item', lambda key, item: calls.append((key, cache.value_of(item))),
+		)
+
+		loop.advance(1 + TICK)
+		# Deleted before their callbacks, item callback decides itself
+		assert not cache.has_key('sync')
+		assert not cache.has_key('subcall')
+		assert cache.has_key('item')
+		assert sorted(map(str, calls)) == ["('item', 3)", 'sync']
+		# Task is referenced till it's done (loop keeps weak references only)
+		assert len(lazy_ttl._subcall_tasks) == 1
+		await asyncio.gather(*lazy_ttl._subcall_tasks)
+		assert 'subcall' in calls
+		await asyncio.sleep(0)  # Done callbacks are soon ones
+		assert not lazy_ttl._subcall_tasks
+
+	asyncio.run(main())
+
+
+def test_deadline_sweeper(loop: FakeLoop) -> None:
+	fired: list[str] = []
+	cache = LazyDeadlineCache(ttl=10, loop=loop, sweep_interval=1, sweep_slice=2)  # type: ignore
+	cache._cache = counting = CountingDict()
+
+	def track(key: str, ttl: float) -> None:
+		cache.set(key, key, ttl=ttl)
+		cache.replace_handle_sync_callback(key, lambda key, item: fired.append(key))
+
+	for key in 'abcde':
+		track(key, 1.5)
+	for i in range(1000):
+		track(f'idle{i}', 100)
+	track('touched', 1.5)
+	track('hastened', 50)
+	loop.advance(0.5)
+	cache.expire('touched', 5)
+	cache.expire('hastened', 0.5)
+
+	# Current bucket isn't swept, the past one is (by slices)
+	loop.advance(1.4)
+	assert not fired
+	counting.lookups = 0
+	loop.advance(0.2)
+	assert sorted(fired) == ['a', 'b', 'c', 'd', 'e', 'hastened']
+	# Only keys of due buckets are visited, not the whole cache
+	assert counting.lookups < 20  # noqa: PLR2004
+	assert not cache.has_key('a')
+
+	# Touched one is re-bucketed by the sweeper & fired by its moved deadline
+	loop.advance(5.5 - loop.now - 0.1)
+	assert 'touched' not in fired
+	loop.advance(1.2)
+	assert fired[-1] == 'touched'
+	assert len(cache._cache) == 1000
+
+
+def test_deadline_sweeper_prolonged_by_callback(loop: FakeLoop) -> None:
+	fired: list[float] = []
+	cache = LazyDeadlineCache(ttl=10, loop=loop, sweep_interval=1)  # type: ignore
+
+	def callback(key: str, item: Any) -> None:
+		fired.append(loop.now)
+		if len(fired) == 1:
+			cache.expire(key, 3)
+
+	cache.set('key', 1, ttl=1)
+	cache.replace_handle_sync_callback('key', callback)
+	loop.advance(10)
+	# Fired at most a sweep interval late, prolonged one is swept again
+	assert len(fired) == 2  # noqa: PLR2004
+	assert 1 <= fired[0] <= 2  # noqa: PLR2004
+	assert fired[0] + 3 <= fired[1] <= fired[0] + 4
+	assert not cache._cache
+	# Sweeper stops on empty cache
+	assert cache._sweeper is None
+	assert not cache._buckets
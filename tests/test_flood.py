@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import tracemalloc
+from functools import partial
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import pytest
+from aiogram.types import User
+
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater.caches import LazyDeadlineCache, ShardedLazyCache
+
+if TYPE_CHECKING:
+	from typing import Any
+
+RATE = 10_000  # Updates per second by one user
+SECONDS = 2
+TICK = 0.01
+MAX_QUEUE = 100
+# Queue of `MAX_QUEUE` updates with their payloads & tasks is far below it
+MEMORY_BOUND = 2 * 2**20
+USER = User(id=1, is_bot=False, first_name='Flooder')
+
+
+async def handler(event: Any, data: dict[str, Any]) -> None:
+	pass
+
+
+async def flood(**kwargs: Any) -> tuple[list[int], dict[str, int]]:
+	"""Return traced memory by quarter of second & queue gauges at the end of the flood."""
+	middleware = RateMiddleware(
+		period_sec=10, after_handle_count=5, sem_period=1,
+		throttling_mode=True, cooldown_message=None, calmed_message=None,
+		**kwargs,
+	)
+	tasks: set[asyncio.Task] = set()
+	per_tick = int(RATE * TICK)
+	samples: list[int] = []
+
+	gc.collect()
+	tracemalloc.start()
+	try:
+		base = tracemalloc.get_traced_memory()[0]
+		start = perf_counter()
+		for quarter in range(1, SECONDS * 4 + 1):
+			while perf_counter() - start < quarter / 4:
+				for _ in range(per_tick):
+					# Payload is per update, like `Update` & handler data
+					data = {'event_from_user': USER, 'bot': None, 'payload': bytearray(256)}
+					task = asyncio.create_task(middleware(handler, None, data))  # type: ignore
+					tasks.add(task)
+					task.add_done_callback(tasks.discard)
+				await asyncio.sleep(TICK)
+			samples.append(tracemalloc.get_traced_memory()[0] - base)
+		gauges = middleware.queue_gauges()
+	finally:
+		tracemalloc.stop()
+		for task in tasks:
+			task.cancel()
+		await asyncio.gather(*tasks, return_exceptions=True)
+	return samples, gauges
+
+
+@pytest.mark.parametrize('policy', ['drop_newest', 'drop_oldest', 'reject'])
+def test_bounded_queue_memory_is_flat(policy: str) -> None:
+	samples, gauges = asyncio.run(flood(max_queue=MAX_QUEUE, queue_policy=policy))
+	assert gauges['max_depth'] <= MAX_QUEUE
+	assert gauges['dropped'] > 0
+	assert max(samples) <= MEMORY_BOUND, samples
+	# Flat: the 2nd second doesn't hold more than the 1st one did
+	half = len(samples) // 2
+	assert max(samples[half:]) <= max(samples[:half]) + MEMORY_BOUND // 4, samples
+
+
+def test_unbounded_queue_memory_grows() -> None:
+	# Check of the check: without `max_queue` the same flood is over the bound
+	samples, gauges = asyncio.run(flood())
+	assert gauges['max_depth'] > MAX_QUEUE
+	assert max(samples) > MEMORY_BOUND, samples
+
+
+@pytest.mark.parametrize(
+	'cache_factory',
+	[None, partial(LazyDeadlineCache, sweep_interval=1), partial(ShardedLazyCache, shards=4)],
+	ids=['loop timers', 'deadline', 'sharded'],
+)
+def test_queue_gauges(cache_factory: Any) -> None:
+	async def gauges() -> dict[str, int]:
+		middleware = RateMiddleware(
+			period_sec=20, after_handle_count=2, sem_period=10,
+			throttling_mode=True, cooldown_message=None, calmed_message=None,
+			max_queue=10, cache_factory=cache_factory,
+		)
+		flooders = [(User(id=1, is_bot=False, first_name='Flooder'), 5)]
+		flooders.append((User(id=2, is_bot=False, first_name='Flooder'), 3))
+		tasks = [
+			asyncio.create_task(middleware(handler, None, {'event_from_user': user, 'bot': None}))
+			for user, count in flooders for _ in range(count)
+		]
+		await asyncio.sleep(0)
+		try:
+			return middleware.queue_gauges()
+		finally:
+			for task in tasks:
+				task.cancel()
+			await asyncio.gather(*tasks, return_exceptions=True)
+
+	# 2 slots per user, the rest are waiting
+	assert asyncio.run(gauges()) == {'queued': 3 + 1, 'max_depth': 3, 'dropped': 0}
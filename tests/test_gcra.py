@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater.extensions import gcra
+
+if TYPE_CHECKING:
+	from typing import Any, Callable
+
+PERIOD = 1
+COUNT = 4  # Emission interval is 0.25 sec, burst tolerance is 0.75 sec
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+	"""Monotonic time of the algorithm, moved by hand."""
+	now = [100.0]
+	monkeypatch.setattr(gcra, 'monotonic', lambda: now[0])
+	return now
+
+
+def check(func: Callable[[Any], None], **options: Any) -> None:
+	"""Run against the rater in the loop (cache timers are bound to it, TTLs don't fire here)."""
+
+	async def main() -> None:
+		func(RateMiddleware(
+			period_sec=PERIOD, after_handle_count=COUNT, throttling_mode='gcra', **options,
+		))
+
+	asyncio.run(main())
+
+
+def tat_of(rater: Any, key: int) -> float:
+	return rater._cache.get(key)
+
+
+def test_burst(clock: list[float]) -> None:
+	def run(rater: Any) -> None:
+		# Whole limit at once is allowed without delays, each one moves TAT by the interval
+		for i in range(1, COUNT + 1):
+			assert rater.reserve(1) == (True, 0.0)
+			assert tat_of(rater, 1) == pytest.approx(clock[0] + i * rater.interval)
+		# Spent limit is restored by one update per interval
+		clock[0] += rater.interval
+		assert rater.reserve(1) == (True, 0.0)
+		assert rater.reserve(1)[0] is False
+		# Users are apart
+		assert rater.reserve(2) == (True, 0.0)
+
+	check(run, max_delay=0)
+
+
+def test_reject(clock: list[float]) -> None:
+	def run(rater: Any) -> None:
+		for _ in range(COUNT):
+			rater.reserve(1)
+		tat = tat_of(rater, 1)
+		# Retry-after is the time till TAT is within tolerance again
+		assert rater.reserve(1) == (False, pytest.approx(rater.interval))
+		clock[0] += 0.1
+		assert rater.reserve(1) == (False, pytest.approx(rater.interval - 0.1))
+		# Rejected ones aren't counted
+		assert tat_of(rater, 1) == tat
+
+	check(run, max_delay=0)
+
+
+def test_delay(clock: list[float]) -> None:
+	def run(rater: Any) -> None:
+		for _ in range(COUNT):
+			rater.reserve(1)
+		# Over-limit ones are spaced by the interval, till delay is over `max_delay`
+		assert rater.reserve(1) == (True, pytest.approx(0.25))
+		assert rater.reserve(1) == (True, pytest.approx(0.5))
+		tat = tat_of(rater, 1)
+		assert rater.reserve(1) == (False, pytest.approx(0.75))
+		assert tat_of(rater, 1) == tat
+
+	check(run, max_delay=0.5)
+
+
+def test_delay_is_bounded_by_default(clock: list[float]) -> None:
+	def run(rater: Any) -> None:
+		assert rater.max_delay is not None
+		delays = []
+		while True:
+			is_allowed, delay = rater.reserve(1)
+			if not is_allowed:
+				break
+			delays.append(delay)
+		assert max(delays) <= rater.max_delay
+		assert len(delays) == COUNT + int(rater.max_delay / rater.interval)
+
+	check(run)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+
+CODE = (
+	'import sys, aiogram_middlewares; aiogram_middlewares.RateMiddleware(); '
+	"print('\\n'.join(sys.modules))"
+)
+OPTIONAL = (
+	'aiogram_middlewares.serializers',
+	'aiogram_middlewares.rater.prefilter',
+	'aiogram_middlewares.rater.scopes',
+	'aiogram_middlewares.rater.caches.backend',
+	'aiogram_middlewares.rater.caches.bounded',
+	'aiogram_middlewares.rater.caches.lazy_deadline',
+	'aiogram_middlewares.rater.caches.redis_backend',
+	'aiogram_middlewares.rater.caches.sharded',
+	'aiogram_middlewares.rater.caches.shm_backend',
+	'aiogram_middlewares.rater.caches.stats',
+	'aiogram_middlewares.rater.caches.timer_wheel',
+	'aiogram_middlewares.rater.extensions.backend',
+	'aiogram_middlewares.rater.extensions.gcra',
+	'aiogram_middlewares.rater.extensions.serializable',
+	'aiogram_middlewares.rater.extensions.sliding',
+	'aiogram_middlewares.rater.extensions.throttling',
+)
+
+
+def imported_modules() -> list[str]:
+	"""Return modules imported by a fresh interpreter with plain middleware."""
+	env = dict(os.environ)
+	env['PYTHONPATH'] = os.pathsep.join(filter(None, (str(SRC), env.get('PYTHONPATH'))))
+	result = subprocess.run(  # noqa: S603
+		[sys.executable, '-c', CODE],
+		capture_output=True, text=True, check=True, env=env,
+	)
+	return result.stdout.split()
+
+
+def test_plain_middleware_skips_optional_parts() -> None:
+	# Import time itself depends on the machine, so only the lazy parts are checked
+	eager = [
+		module for module in imported_modules()
+		if any(module == name or module.startswith(f'{name}.') for name in OPTIONAL)
+	]
+	assert not eager
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from aiogram_middlewares.rater.extensions.throttling.locks import (
+	LeakScheduler,
+	ThrottleQueueFull,
+	ThrottleSemaphore,
+)
+
+if TYPE_CHECKING:
+	from typing import Any
+
+DELAY = 0.05  # Leak period of one permit
+EPS = 0.005  # Loop clock granularity
+
+
+def make_sem(max_rate: int = 1, delay: float = DELAY, **options: Any) -> ThrottleSemaphore:
+	return ThrottleSemaphore(max_rate, delay * max_rate, **options)
+
+
+def test_leak_scheduler_one_timer() -> None:
+	async def main() -> None:
+		scheduler = LeakScheduler.of(asyncio.get_running_loop())
+		fast = [make_sem() for _ in range(3)]
+		slow = make_sem(delay=4 * DELAY)
+		for sem in (*fast, slow):
+			assert sem.try_acquire()
+			assert not sem.try_acquire()
+		# Entry per busy semaphore, single timer for the soonest one
+		assert len(scheduler) == 4  # noqa: PLR2004
+		assert scheduler._timer_when == pytest.approx(scheduler._heap[0][0])
+
+		await asyncio.sleep(2 * DELAY)
+		assert all(not sem.locked() for sem in fast)
+		assert slow.locked()
+		assert len(scheduler) == 1
+
+		await asyncio.sleep(3 * DELAY)
+		# Idle ones have nothing scheduled
+		assert not slow.locked()
+		assert len(scheduler) == 0
+		assert scheduler._timer is None
+
+	asyncio.run(main())
+
+
+def test_leak_pacing() -> None:
+	async def main() -> None:
+		loop = asyncio.get_running_loop()
+		sem = make_sem(max_rate=2)
+		times = []
+
+		async def job() -> None:
+			await sem.acquire()
+			times.append(loop.time())
+
+		start = loop.time()
+		await asyncio.gather(*(job() for _ in range(5)))
+		# Burst of `max_rate`, then one per leak period
+		assert [when - start < EPS for when in times] == [True, True, False, False, False]
+		assert min(b - a for a, b in zip(times[1:], times[2:])) >= DELAY - EPS
+
+	asyncio.run(main())
+
+
+async def fill_queue(sem: ThrottleSemaphore) -> list[asyncio.Task[Any]]:
+	"""Take the permit & queue waiters till the queue is full."""
+	assert sem.try_acquire()
+	waiters = [asyncio.create_task(sem.acquire()) for _ in range(sem.max_queue or 0)]
+	await asyncio.sleep(0)
+	assert sem.is_queue_full()
+	return waiters
+
+
+@pytest.mark.parametrize('policy', ['drop_newest', 'reject'])
+def test_queue_drop_newest(policy: str) -> None:
+	async def main() -> None:
+		sem = make_sem(max_queue=2, queue_policy=policy)
+		waiters = await fill_queue(sem)
+		with pytest.raises(ThrottleQueueFull):
+			await sem.acquire()
+		assert await asyncio.gather(*waiters) == [True, True]
+		assert sem.queued() == 0
+
+	asyncio.run(main())
+
+
+def test_queue_drop_oldest() -> None:
+	async def main() -> None:
+		sem = make_sem(max_queue=2, queue_policy='drop_oldest')
+		oldest, waiter = await fill_queue(sem)
+		newest = asyncio.create_task(sem.acquire())
+		await asyncio.sleep(0)
+		with pytest.raises(ThrottleQueueFull):
+			await oldest
+		assert sem.queued() == 2  # noqa: PLR2004
+		assert await asyncio.gather(waiter, newest) == [True, True]
+
+	asyncio.run(main())
+
+
+def test_leak_done_and_reuse() -> None:
+	async def main() -> None:
+		done = []
+		sem = make_sem()
+		sem.on_leak_done_callback(lambda: done.append(sem.queued()))
+
+		# Busy one finishes pending jobs first
+		assert sem.try_acquire()
+		waiter = asyncio.create_task(sem.acquire())
+		await asyncio.sleep(0)
+		sem.set_leak_done()
+		await waiter
+		await asyncio.sleep(2 * DELAY)
+		assert done == [0]
+
+		# Permit of the last job isn't leaked after done, so it's leaked before done again
+		assert sem.locked()
+		sem.set_leak_done()
+		await asyncio.sleep(2 * DELAY)
+		assert not sem.locked()
+		assert done == [0, 0]
+
+		# Idle one finishes soon
+		sem.set_leak_done()
+		await asyncio.sleep(0)
+		assert done == [0, 0, 0]
+
+		# Reused one leaks again & can be finished again
+		for _ in range(2):
+			assert sem.try_acquire()
+			await asyncio.sleep(2 * DELAY)
+			assert not sem.locked()
+		sem.set_leak_done()
+		await asyncio.sleep(DELAY)
+		assert done == [0, 0, 0, 0]
+
+	asyncio.run(main())
+
+
+def test_copy() -> None:
+	sem = make_sem(max_rate=3, max_queue=5, queue_policy='drop_oldest')
+	copy = sem.copy()
+	assert copy is not sem
+	assert (copy._max_rate, copy._delay_time, copy.max_queue, copy.queue_policy) == (
+		3, pytest.approx(DELAY), 5, 'drop_oldest',
+	)
+	assert not copy.locked()
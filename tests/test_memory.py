@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import sys
+import tracemalloc
+from typing import TYPE_CHECKING
+
+import pytest
+
+from aiogram_middlewares.rater.caches import CacheItem, LazyDeadlineCache, LazyMemoryCache
+from aiogram_middlewares.rater.models import RateData
+
+if TYPE_CHECKING:
+	from typing import Callable
+
+USERS = 20_000
+PERIOD = 60
+# Bytes per user of `LazyMemoryCache` before items were slotted (CPython 3.11, set + expire)
+BASELINE = 829
+
+pytestmark = pytest.mark.skipif(
+	sys.version_info < (3, 10) or sys.implementation.name != 'cpython',
+	reason='Slotted dataclasses & sizes are of CPython 3.10+',
+)
+
+
+async def _per_user(factory: Callable[..., LazyMemoryCache]) -> float:
+	user_ids = list(range(10**9, 10**9 + USERS))  # Ids are owned by updates, not by cache
+	cache = factory(ttl=PERIOD)
+	gc.collect()
+	tracemalloc.start()
+	try:
+		before = tracemalloc.get_traced_memory()[0]
+		for user_id in user_ids:
+			# Like trigger + debouncing
+			cache.set(user_id, RateData(), ttl=PERIOD)
+			cache.expire(user_id, PERIOD)
+		gc.collect()
+		used = tracemalloc.get_traced_memory()[0] - before
+	finally:
+		tracemalloc.stop()
+	return used / USERS
+
+
+def per_user(factory: Callable[..., LazyMemoryCache]) -> float:
+	return asyncio.run(_per_user(factory))
+
+
+def test_items_are_slotted() -> None:
+	assert not hasattr(CacheItem(handle=None), '__dict__')
+	assert not hasattr(RateData(), '__dict__')
+
+
+def test_lazy_memory_cache() -> None:
+	# Loop timer per item (handle & its args) is most of it, so it's 1.5x, not 3x
+	assert per_user(LazyMemoryCache) <= BASELINE / 1.5
+
+
+def test_lazy_deadline_cache() -> None:
+	assert per_user(LazyDeadlineCache) <= BASELINE / 3
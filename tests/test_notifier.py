@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from aiogram_middlewares.rater.notifier import NotifyScheduler
+
+if TYPE_CHECKING:
+	from typing import Any, Awaitable, Callable
+
+EPS = 0.005  # Loop clock granularity
+
+
+class FakeBot:
+	"""Logs sends as `(loop time, bot id, chat id, text)`, raises `TelegramRetryAfter` if asked."""
+
+	def __init__(
+		self: FakeBot, bot_id: int, log: list[tuple[float, int, int, str]],
+		retry_after: int = 0, failures: int = 0,
+	) -> None:
+		self.id = bot_id
+		self.log = log
+		self.retry_after = retry_after
+		self.failures = failures
+
+
+	async def send_message(self: FakeBot, chat_id: int, text: str) -> None:
+		if self.failures:
+			self.failures -= 1
+			raise TelegramRetryAfter(
+				SendMessage(chat_id=chat_id, text=text), 'Flood control', self.retry_after,
+			)
+		self.log.append((asyncio.get_running_loop().time(), self.id, chat_id, text))
+
+
+def run(main: Callable[[list[tuple[float, int, int, str]]], Awaitable[Any]]) -> Any:
+	return asyncio.run(main([]))
+
+
+def test_rate_pacing() -> None:
+	async def main(log: list[tuple[float, int, int, str]]) -> None:
+		notifier = NotifyScheduler(rate=20, chat_interval=0)
+		bot = FakeBot(1, log)
+		for chat_id in range(6):
+			assert notifier.send(bot, chat_id, 'Calm down!')
+		await notifier.join()
+		assert [chat_id for _, _, chat_id, _ in log] == list(range(6))
+		times = [when for when, *_ in log]
+		assert min(b - a for a, b in zip(times, times[1:])) >= 1 / 20 - EPS
+		assert notifier.sent == 6  # noqa: PLR2004
+
+	run(main)
+
+
+def test_chat_interval_and_coalescing() -> None:
+	async def main(log: list[tuple[float, int, int, str]]) -> None:
+		notifier = NotifyScheduler(rate=100, chat_interval=0.3)
+		bot = FakeBot(1, log)
+		notifier.send(bot, 1, 'first')
+		await asyncio.sleep(0.05)
+		# Chat 1 waits for its interval, others aren't blocked by it
+		notifier.send(bot, 1, 'stale')
+		assert not notifier.send(bot, 1, 'latest')
+		notifier.send(bot, 2, 'other')
+		await notifier.join()
+
+		assert [(chat_id, text) for _, _, chat_id, text in log] == [
+			(1, 'first'), (2, 'other'), (1, 'latest'),
+		]
+		assert log[2][0] - log[0][0] >= 0.3 - EPS
+		assert log[1][0] - log[0][0] < 0.3  # noqa: PLR2004
+		assert notifier.coalesced == 1
+
+	run(main)
+
+
+def test_notices_of_bots_are_apart() -> None:
+	async def main(log: list[tuple[float, int, int, str]]) -> None:
+		notifier = NotifyScheduler(rate=100)
+		# Same user in two bots
+		assert notifier.send(FakeBot(1, log), 10, 'Calm down!')
+		assert notifier.send(FakeBot(2, log), 10, 'Calm down!')
+		await notifier.join()
+		assert sorted((bot_id, chat_id) for _, bot_id, chat_id, _ in log) == [(1, 10), (2, 10)]
+		assert notifier.coalesced == 0
+
+	run(main)
+
+
+def test_retry_after_pauses_queue() -> None:
+	async def main(log: list[tuple[float, int, int, str]]) -> None:
+		notifier = NotifyScheduler(rate=100, chat_interval=0)
+		start = asyncio.get_running_loop().time()
+		notifier.send(FakeBot(1, log, retry_after=1, failures=1), 1, 'retried')
+		notifier.send(FakeBot(2, log), 2, 'paused')
+		await notifier.join()
+
+		# Retried notice goes first, whole queue waits for the pause
+		assert [chat_id for _, _, chat_id, _ in log] == [1, 2]
+		assert log[0][0] - start >= 1 - EPS
+		assert (notifier.sent, notifier.retried, notifier.failed) == (2, 1, 0)
+
+	run(main)
+
+
+def test_retries_are_over() -> None:
+	async def main(log: list[tuple[float, int, int, str]]) -> None:
+		notifier = NotifyScheduler(rate=100, max_retries=0)
+		notifier.send(FakeBot(1, log, retry_after=1, failures=1), 1, 'lost')
+		await notifier.join()
+		assert not log
+		assert (notifier.sent, notifier.retried, notifier.failed) == (0, 0, 1)
+
+	run(main)
+
+
+def test_chat_next_is_pruned_while_sending() -> None:
+	async def main(log: list[tuple[float, int, int, str]]) -> None:
+		notifier = NotifyScheduler(rate=200, chat_interval=0.05, max_pending=1000)
+		bot = FakeBot(1, log)
+		for chat_id in range(200):
+			notifier.send(bot, chat_id, 'Calm down!')
+		await asyncio.sleep(0.5)
+		# Sent ones are forgotten once their interval is over, not when the queue drains
+		assert len(log) > 40  # noqa: PLR2004
+		assert len(notifier._chat_next) <= 2 * 0.05 * 200 + 1
+		await notifier.close()
+
+	run(main)
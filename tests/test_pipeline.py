@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+from aiogram.types import User
+
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater.notifier import NotifyScheduler
+
+if TYPE_CHECKING:
+	from typing import Any
+
+USERS = {user_id: User(id=user_id, is_bot=False, first_name='User') for user_id in (1, 2)}
+
+# Mode options & updates as `(user id, pause after it)`, pauses are far from leak/TAT times
+MODES: dict[str, tuple[dict[str, Any], list[tuple[int, float]]]] = {
+	'antiflood': (
+		{'period_sec': 1, 'after_handle_count': 2, 'warnings_count': 2},
+		[(1, 0), (1, 0), (2, 0), (1, 0), (1, 0), (1, 0), (2, 0), (2, 0.1), (2, 0)],
+	),
+	'throttle': (
+		{
+			'period_sec': 2, 'after_handle_count': 2, 'sem_period': 1,
+			'throttling_mode': True, 'max_queue': 2,
+		},
+		[(1, 0), (1, 0), (1, 0), (1, 0), (1, 0), (2, 0.2), (2, 0), (2, 0)],
+	),
+	'gcra': (
+		{'period_sec': 1, 'after_handle_count': 2, 'throttling_mode': 'gcra', 'max_delay': 0.3},
+		[(1, 0), (1, 0), (1, 0), (1, 0), (1, 0), (2, 0.1), (2, 0), (2, 0)],
+	),
+}
+SETTLE = 1.5  # Till all queued updates are handled & calmed notices are sent
+
+
+class Recorder(NotifyScheduler):
+	"""Notifier which only logs notices (in the order they are enqueued)."""
+
+	def __init__(self: Recorder, log: list[tuple[str, int]]) -> None:
+		super().__init__()
+		self.log = log
+
+
+	def send(self: Recorder, bot: Any, chat_id: int, text: str) -> bool:
+		self.log.append(('warned', chat_id))
+		return True
+
+
+	def defer(self: Recorder, bot: Any, chat_id: int, text: str) -> None:
+		self.log.append(('calmed', chat_id))
+
+
+async def run(options: dict[str, Any], updates: list[tuple[int, float]]) -> list[tuple[str, int]]:
+	log: list[tuple[str, int]] = []
+
+	async def handler(event: Any, data: dict[str, Any]) -> bool:
+		log.append(('handled', data['event_from_user'].id))
+		return True
+
+	middleware = RateMiddleware(**options, notifier=Recorder(log))
+
+	async def update(user_id: int) -> None:
+		data = {'event_from_user': USERS[user_id], 'bot': None}
+		if await middleware(handler, None, data) is None:  # type: ignore
+			log.append(('dropped', user_id))
+
+	tasks = []
+	for user_id, pause in updates:
+		tasks.append(asyncio.create_task(update(user_id)))
+		await asyncio.sleep(pause)
+	await asyncio.gather(*tasks)
+	await asyncio.sleep(SETTLE)
+	return log
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_compiled_equals_generic(mode: str) -> None:
+	options, updates = MODES[mode]
+	compiled = asyncio.run(run({**options, 'compiled': True}, updates))
+	generic = asyncio.run(run({**options, 'compiled': False}, updates))
+	assert compiled == generic
+	kinds = {kind for kind, _ in compiled}
+	assert {'handled', 'dropped', 'warned', 'calmed'} <= kinds, compiled
+
+
+def test_compiled_flag() -> None:
+	async def is_generic(**options: Any) -> bool:
+		middleware = RateMiddleware(period_sec=1, after_handle_count=2, **options)
+		return middleware._pipeline == middleware._call
+
+	assert not asyncio.run(is_generic())
+	assert asyncio.run(is_generic(compiled=False))
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from aiogram_middlewares.rater.prefilter import user_id_of
+
+USER = {'id': 42, 'is_bot': False, 'first_name': 'User'}
+REPLIED_USER = {'id': 777, 'is_bot': False, 'first_name': 'Other'}
+CHANNEL = {'id': -1001234567890, 'title': 'Some channel', 'type': 'channel'}
+GROUP = {'id': -1009876543210, 'title': 'Some group', 'type': 'supergroup'}
+
+
+def reply_to_user() -> dict:
+	return {
+		'message_id': 1, 'from': REPLIED_USER, 'chat': GROUP, 'date': 1697057916,
+		'text': 'some "from": {"id": 5} text',
+	}
+
+
+UPDATES = {
+	'message': (
+		{'update_id': 1, 'message': {
+			'message_id': 2, 'from': USER, 'chat': GROUP, 'date': 1697057916, 'text': 'hi',
+		}},
+		42,
+	),
+	'message replying to other user': (
+		{'update_id': 2, 'message': {
+			'message_id': 3, 'chat': GROUP, 'date': 1697057916,
+			'reply_to_message': reply_to_user(), 'from': USER, 'text': 'hi',
+		}},
+		42,
+	),
+	'channel post replying to user': (
+		{'update_id': 3, 'channel_post': {
+			'message_id': 4, 'sender_chat': CHANNEL, 'chat': CHANNEL, 'date': 1697057916,
+			'reply_to_message': reply_to_user(), 'text': 'post',
+		}},
+		None,
+	),
+	'callback query': (
+		{'update_id': 4, 'callback_query': {
+			'id': '1', 'from': USER, 'message': reply_to_user(), 'chat_instance': '1',
+		}},
+		42,
+	),
+	'poll without sender': (
+		{'update_id': 5, 'poll': {'id': '1', 'question': 'from?', 'options': []}},
+		None,
+	),
+}
+
+
+@pytest.mark.parametrize(('update', 'expected'), UPDATES.values(), ids=UPDATES.keys())
+def test_user_id_of_dict(update: dict, expected: int | None) -> None:
+	assert user_id_of(update) == expected
+
+
+@pytest.mark.parametrize(('update', 'expected'), UPDATES.values(), ids=UPDATES.keys())
+@pytest.mark.parametrize('indent', [None, 2])
+def test_user_id_of_raw(update: dict, expected: int | None, indent: int | None) -> None:
+	# Compact (as Telegram sends) & pretty printed JSON, as bytes & str
+	raw = json.dumps(update, indent=indent, separators=None if indent else (',', ':'))
+	assert user_id_of(raw) == expected
+	assert user_id_of(raw.encode()) == expected
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+from aiogram.types import Chat, User
+
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater import scopes
+from aiogram_middlewares.rater.caches import lazy_deadline
+from aiogram_middlewares.rater.scopes import ScopeLimits
+
+if TYPE_CHECKING:
+	from typing import Any, Callable
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+	"""Monotonic time of the scopes & their caches, moved by hand."""
+	now = [100.0]
+	monkeypatch.setattr(scopes, 'monotonic', lambda: now[0])
+	monkeypatch.setattr(lazy_deadline, 'monotonic', lambda: now[0])
+	return now
+
+
+def check(func: Callable[[], None]) -> None:
+	"""Run in the loop (scope caches sweep on it)."""
+
+	async def main() -> None:
+		func()
+
+	asyncio.run(main())
+
+
+def test_chat_limit(clock: list[float]) -> None:
+	def run() -> None:
+		limits = ScopeLimits(chat_limit=(10, 2))
+		# Chat is shared by its users, chats are apart
+		assert [limits.admit(user_id, 1) for user_id in (1, 2, 3)] == [True, True, False]
+		assert limits.admit(3, 2)
+		assert limits.dropped_chat == 1
+
+		clock[0] += 10
+		assert limits.admit(3, 1)
+
+	check(run)
+
+
+def test_user_chat_limit(clock: list[float]) -> None:
+	def run() -> None:
+		limits = ScopeLimits(user_chat_limit=(10, 1))
+		assert limits.admit(1, 1)
+		assert not limits.admit(1, 1)
+		# Same user in other chat & other user in the chat
+		assert limits.admit(1, 2)
+		assert limits.admit(2, 1)
+		assert limits.as_dict() == {'dropped_user_chat': 1, 'dropped_chat': 0, 'dropped_global': 0}
+
+		clock[0] += 10
+		assert limits.admit(1, 1)
+
+	check(run)
+
+
+def test_global_limit(clock: list[float]) -> None:
+	def run() -> None:
+		limits = ScopeLimits(global_limit=(1, 3))
+		# Updates without chat are counted only there
+		assert [limits.admit(1, None), limits.admit(2, 1), limits.admit(3, 2)] == [True] * 3
+		assert not limits.admit(4, None)
+		assert not limits.admit(4, 3)
+		assert limits.dropped_global == 2  # noqa: PLR2004
+
+		clock[0] += 1
+		assert limits.admit(4, 3)
+
+	check(run)
+
+
+def test_dropped_update_is_not_charged(clock: list[float]) -> None:
+	def run() -> None:
+		limits = ScopeLimits(user_chat_limit=(10, 1), chat_limit=(10, 2), global_limit=(10, 3))
+		assert limits.admit(1, 1)
+		# Dropped by the user's scope, so chat & global ones keep the room
+		for _ in range(3):
+			assert not limits.admit(1, 1)
+		assert limits.admit(2, 1)
+		assert not limits.admit(3, 1)
+		assert limits.admit(3, 2)
+		assert not limits.admit(4, 3)
+		assert limits.as_dict() == {'dropped_user_chat': 3, 'dropped_chat': 1, 'dropped_global': 1}
+
+	check(run)
+
+
+def test_invalid_limit() -> None:
+	with pytest.raises(ValueError, match='chat_limit'):
+		ScopeLimits(chat_limit=(0, 1))
+	with pytest.raises(ValueError, match='global_limit'):
+		ScopeLimits(global_limit=(1, 0))
+
+
+@pytest.mark.parametrize('compiled', [True, False], ids=['compiled', 'generic'])
+def test_middleware_raid(clock: list[float], compiled: bool) -> None:  # noqa: FBT001
+	handled: list[int] = []
+	chat = Chat(id=-100, type='supergroup')
+
+	async def handler(event: Any, data: dict[str, Any]) -> None:
+		handled.append(data['event_from_user'].id)
+
+	async def main() -> None:
+		middleware = RateMiddleware(
+			period_sec=10, after_handle_count=2, chat_limit=(10, 3),
+			cooldown_message=None, calmed_message=None, compiled=compiled,
+		)
+		# Raid of fresh users, each one is far from its own limit
+		for user_id in range(1, 6):
+			user = User(id=user_id, is_bot=False, first_name='User')
+			data = {'event_from_user': user, 'event_chat': chat, 'bot': None}
+			await middleware(handler, None, data)  # type: ignore
+		assert handled == [1, 2, 3]
+		assert middleware.scopes.dropped_chat == 2  # type: ignore  # noqa: PLR2004
+
+	asyncio.run(main())
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+from aiogram.types import User
+
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater.caches import ShardedLazyCache
+
+if TYPE_CHECKING:
+	from typing import Any, Iterator
+
+THREADS = 8
+CALLS = 5_000  # By each thread
+USER = User(id=1, is_bot=False, first_name='User')
+
+
+@pytest.fixture(autouse=True)
+def contended() -> Iterator[None]:
+	"""Switch threads as often as possible, so unlocked read-modify-write loses counts."""
+	interval = sys.getswitchinterval()
+	sys.setswitchinterval(1e-6)
+	yield
+	sys.setswitchinterval(interval)
+
+
+def hammer(cache: ShardedLazyCache, limit: int, algorithm: str) -> int:
+	"""Flood the user from threads (own loops & raters, shared cache), return handled count."""
+	handled = [0] * THREADS
+	barrier = threading.Barrier(THREADS)
+
+	async def handler(event: Any, data: dict[str, Any]) -> bool:
+		return True
+
+	async def worker(i: int) -> None:
+		middleware = RateMiddleware(
+			period_sec=60, after_handle_count=limit,
+			cooldown_message=None, calmed_message=None, algorithm=algorithm,
+			cache_factory=lambda ttl: cache,
+		)
+		data = {'event_from_user': USER, 'bot': None}
+		barrier.wait()
+		for _ in range(CALLS):
+			if await middleware(handler, None, data):  # type: ignore
+				handled[i] += 1
+
+	threads = [
+		threading.Thread(target=asyncio.run, args=(worker(i),)) for i in range(THREADS)
+	]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	return sum(handled)
+
+
+# Sliding log scans the whole ring buffer, so it's only hammered against low limit
+@pytest.mark.parametrize('algorithm', ['fixed', 'sliding_window'])
+def test_no_lost_increments(algorithm: str) -> None:
+	cache = ShardedLazyCache(ttl=60, shards=4, sweep_interval=60)
+	assert hammer(cache, THREADS * CALLS, algorithm) == THREADS * CALLS
+	assert cache.get(USER.id).rate == THREADS * CALLS
+
+
+@pytest.mark.parametrize('algorithm', ['fixed', 'sliding_window', 'sliding_log'])
+def test_exact_limit(algorithm: str) -> None:
+	limit = CALLS // 2
+	cache = ShardedLazyCache(ttl=60, shards=4, sweep_interval=60)
+	assert hammer(cache, limit, algorithm) == limit
+	assert cache.get(USER.id).rate == limit
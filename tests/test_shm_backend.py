@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import pickle
+from typing import TYPE_CHECKING
+
+import pytest
+
+from aiogram_middlewares.rater.caches import HitVerdict, SharedMemoryRateBackend
+
+if TYPE_CHECKING:
+	from multiprocessing.queues import Queue
+
+WORKERS = 4
+CALLS = 500  # By each worker
+LIMIT = 700
+
+
+def hammer(backend: SharedMemoryRateBackend, keys: list[int], results: Queue[int]) -> None:
+	"""Hit keys in the worker process, report count of passed hits."""
+
+	async def main() -> int:
+		hits = [await backend.hit(key, ttl=60, limit=LIMIT) for _ in range(CALLS) for key in keys]
+		return sum(hit.verdict is HitVerdict.PASS for hit in hits)
+
+	results.put(asyncio.run(main()))
+
+
+@pytest.mark.parametrize('method', ['fork', 'spawn'])
+def test_shared_by_processes(method: str) -> None:
+	if method not in multiprocessing.get_all_start_methods():
+		pytest.skip(f'No `{method}` start method')
+	context = multiprocessing.get_context(method)
+	backend = SharedMemoryRateBackend(capacity=256, stripes=4, mp_context=context)
+	results = context.Queue()
+	try:
+		workers = [
+			context.Process(target=hammer, args=(backend, [1, 2], results))
+			for _ in range(WORKERS)
+		]
+		for worker in workers:
+			worker.start()
+		passed = [results.get(timeout=60) for _ in workers]
+		for worker in workers:
+			worker.join(timeout=60)
+			assert worker.exitcode == 0
+		# No lost or extra counts between processes, per key
+		assert sum(passed) == 2 * LIMIT
+		for key in (1, 2):
+			assert asyncio.run(backend.get(key)).rate == LIMIT  # type: ignore
+	finally:
+		asyncio.run(backend.close())
+
+
+def test_full_window_rejects() -> None:
+	async def main() -> None:
+		backend = SharedMemoryRateBackend(capacity=4, stripes=1, max_probe=4)
+		try:
+			for key in range(1, 5):
+				assert (await backend.hit(key, ttl=0.3, limit=10)).verdict is HitVerdict.PASS
+			# Live users aren't evicted by the new one
+			hit = await backend.hit(5, ttl=0.3, limit=10)
+			assert hit.verdict is HitVerdict.DROP
+			assert backend.full_rejects == 1
+			assert await backend.get(5) is None
+			for key in range(1, 5):
+				assert (await backend.get(key)).rate == 1  # type: ignore
+
+			# Slots of expired ones are reused
+			await asyncio.sleep(0.4)
+			assert (await backend.hit(5, ttl=0.3, limit=10)).verdict is HitVerdict.PASS
+			assert backend.full_rejects == 1
+		finally:
+			await backend.close()
+
+	asyncio.run(main())
+
+
+def test_not_picklable_out_of_spawning() -> None:
+	backend = SharedMemoryRateBackend(capacity=16, stripes=1)
+	try:
+		with pytest.raises(TypeError, match='worker processes'):
+			pickle.dumps(backend)
+	finally:
+		asyncio.run(backend.close())
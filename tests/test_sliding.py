@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+from aiogram.types import User
+
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater import models
+from aiogram_middlewares.rater.models import MultiWindowCounter, SlidingLog, SlidingWindowCounter
+from aiogram_middlewares.rater.notifier import NotifyScheduler
+
+if TYPE_CHECKING:
+	from typing import Any
+
+USER = User(id=1, is_bot=False, first_name='User')
+
+
+class Clock:
+	"""Monotonic time of the counters, moved by hand."""
+
+	def __init__(self: Clock) -> None:
+		self.now = 0.0
+
+
+	def __call__(self: Clock) -> float:
+		return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+	clock = Clock()
+	monkeypatch.setattr(models, 'monotonic', clock)
+	return clock
+
+
+def test_sliding_window_counter(clock: Clock) -> None:
+	counter = SlidingWindowCounter(10)
+	for _ in range(5):
+		counter.rate += 1
+	assert counter.rate == 5  # noqa: PLR2004
+
+	# Previous window is weighted by its overlap with the sliding one
+	clock.now = 10
+	assert counter.rate == 5  # noqa: PLR2004
+	clock.now = 15
+	assert counter.rate == pytest.approx(2.5)
+	counter.rate += 1
+	assert (counter.previous, counter.current) == (5, 1)
+	assert counter.rate == pytest.approx(3.5)
+
+	clock.now = 25
+	assert counter.rate == pytest.approx(0.5)
+	# Idle for whole window - nothing is left
+	clock.now = 40
+	assert counter.rate == 0
+
+
+def test_sliding_log(clock: Clock) -> None:
+	log = SlidingLog(10, 3)
+	for now in (0, 4, 8):
+		clock.now = now
+		log.rate += 1
+	clock.now = 9.9
+	assert log.rate == 3  # noqa: PLR2004
+
+	# Exactly the updates of the last window are counted
+	clock.now = 10.5
+	assert log.rate == 2  # noqa: PLR2004
+	log.rate += 1
+	assert log.rate == 3  # noqa: PLR2004
+	clock.now = 14.5
+	assert log.rate == 2  # noqa: PLR2004
+	clock.now = 30
+	assert log.rate == 0
+
+
+@pytest.mark.parametrize(
+	('algorithm', 'handled_at'),
+	[
+		# Window starts with the first update, the burst still weighs 0.9 of the limit at 19
+		('sliding_window', [8, 8, 8, 19]),
+		# The burst is out of the log's window
+		('sliding_log', [8, 8, 8, 19, 19, 19]),
+	],
+)
+def test_burst_over_window_boundary(clock: Clock, algorithm: str, handled_at: list[int]) -> None:
+	handled: list[float] = []
+
+	async def handler(event: Any, data: dict[str, Any]) -> None:
+		handled.append(clock.now)
+
+	async def main() -> None:
+		middleware = RateMiddleware(
+			period_sec=10, after_handle_count=3, algorithm=algorithm,
+			cooldown_message=None, calmed_message=None,
+		)
+		data = {'event_from_user': USER, 'bot': None}
+		for now in (8, 8, 8, 9, 17, 19, 19, 19, 19):
+			clock.now = now
+			await middleware(handler, None, data)  # type: ignore
+
+	asyncio.run(main())
+	assert handled == handled_at
+
+
+def test_multi_window_counter(clock: Clock) -> None:
+	counter = MultiWindowCounter(((10, 2), (60, 3)), 3)
+	for _ in range(2):
+		counter.rate += 1
+	# Burst window is full, gap to the base is the worst window's one
+	assert counter.rate == 3  # noqa: PLR2004
+	clock.now = 4
+	assert counter.allowed_in() == 6  # noqa: PLR2004
+	assert counter.counted_in() == 56  # noqa: PLR2004
+
+	clock.now = 10
+	assert counter.rate == 2  # noqa: PLR2004
+	counter.rate += 1
+	# Sustained window is full till its end
+	assert counter.rate == 3  # noqa: PLR2004
+	clock.now = 30
+	assert counter.allowed_in() == 30  # noqa: PLR2004
+	clock.now = 60
+	# Gap of the empty burst window
+	assert counter.rate == 1
+	assert list(counter.counts) == [0, 0]
+	assert counter.counted_in() == 0
+
+
+class Calmed(NotifyScheduler):
+	"""Notifier which logs calmed notices with loop time."""
+
+	def __init__(self: Calmed, log: list[float]) -> None:
+		super().__init__()
+		self.log = log
+
+
+	def defer(self: Calmed, bot: Any, chat_id: int, text: str) -> None:
+		self.log.append(asyncio.get_running_loop().time())
+
+
+@pytest.mark.parametrize('compiled', [True, False], ids=['compiled', 'generic'])
+def test_multi_window_calmed_on_allowed(compiled: bool) -> None:  # noqa: FBT001
+	handled: list[float] = []
+	calmed: list[float] = []
+
+	async def handler(event: Any, data: dict[str, Any]) -> None:
+		handled.append(asyncio.get_running_loop().time())
+
+	async def main() -> None:
+		middleware = RateMiddleware(
+			windows=[(0.3, 2), (1, 4)], cooldown_message=None, calmed_message='Calmed',
+			notifier=Calmed(calmed), compiled=compiled,
+		)
+		data = {'event_from_user': USER, 'bot': None}
+
+		async def burst() -> None:
+			for _ in range(3):
+				await middleware(handler, None, data)  # type: ignore
+
+		start = asyncio.get_running_loop().time()
+		await burst()
+		# Notice is on the burst window's end, not the longest one's
+		await asyncio.sleep(0.4)
+		assert len(handled) == 2  # noqa: PLR2004
+		assert len(calmed) == 1
+		assert 0.3 <= calmed[0] - start < 0.4  # noqa: PLR2004
+
+		# Sustained window still counts the user, so it's calmed on its end
+		await burst()
+		assert len(handled) == 4  # noqa: PLR2004
+		await asyncio.sleep(0.35)
+		assert len(calmed) == 1
+		await asyncio.sleep(0.35)
+		assert len(calmed) == 2  # noqa: PLR2004
+		assert 1 <= calmed[1] - start < 1.1  # noqa: PLR2004
+
+		await burst()
+		assert len(handled) == 6  # noqa: PLR2004
+
+	asyncio.run(main())
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from aiogram.types import User
+
+from aiogram_middlewares import RateMiddleware
+from aiogram_middlewares.rater.caches import (
+	LazyDeadlineCache,
+	LazyMemoryCache,
+	ShardedLazyCache,
+	TimerWheel,
+)
+from aiogram_middlewares.rater.models import RateData
+
+if TYPE_CHECKING:
+	from pathlib import Path
+	from typing import Any, Callable
+
+SHORT = 0.3
+LONG = 30
+DOWNTIME = 0.1
+USER = User(id=1, is_bot=False, first_name='User')
+
+# Made in the running loop (timers are bound to it)
+CACHES: dict[str, Callable[[], Any]] = {
+	'loop timers': lambda: LazyMemoryCache(ttl=LONG),
+	'timer wheel': lambda: LazyMemoryCache(ttl=LONG, timer_wheel=TimerWheel(tick=0.01)),
+	'deadline': lambda: LazyDeadlineCache(ttl=LONG, sweep_interval=0.05),
+	'sharded': lambda: ShardedLazyCache(ttl=LONG, shards=4, sweep_interval=0.05),
+}
+
+
+async def handler(event: Any, data: dict[str, Any]) -> bool:
+	return True
+
+
+@pytest.mark.parametrize('make_cache', CACHES.values(), ids=CACHES.keys())
+def test_cache_round_trip(tmp_path: Path, make_cache: Callable[[], Any]) -> None:
+	path = tmp_path / 'rater.snapshot'
+
+	async def save() -> None:
+		cache = make_cache()
+		cache.set(1, RateData(rate=3, sent_warning_count=1), ttl=SHORT)
+		cache.set(2, RateData(rate=1), ttl=LONG)
+		cache.set(3, RateData(rate=5), ttl=0.05)  # Expires before the snapshot
+		cache.set('chat', RateData(rate=1), ttl=LONG)  # Only int keys are saved
+		await asyncio.sleep(0.1)
+		assert cache.snapshot(path) == 2  # noqa: PLR2004
+
+	async def load() -> None:
+		cache = make_cache()
+		assert sorted(cache.restore(path)) == [1, 2]
+		assert cache.get(1) == RateData(rate=3, sent_warning_count=1)
+		# Downtime between the loops is taken off
+		assert 0 < cache.remaining_of(1) <= SHORT - DOWNTIME
+		assert LONG - 1 < cache.remaining_of(2) <= LONG - DOWNTIME
+
+		await asyncio.sleep(SHORT)
+		# Expiry is re-armed in the new loop
+		assert cache.get_item(1) is None
+		assert cache.get(2) == RateData(rate=1)
+
+		# Restored item lives by the new ttl once touched
+		cache.expire(2, SHORT / 2)
+		await asyncio.sleep(SHORT)
+		assert cache.get_item(2) is None
+
+	asyncio.run(save())
+	time.sleep(DOWNTIME)
+	asyncio.run(load())
+
+
+def test_throttle_round_trip(tmp_path: Path) -> None:
+	path = tmp_path / 'rater.snapshot'
+	options: dict[str, Any] = {
+		'period_sec': 1, 'after_handle_count': 3, 'sem_period': 0.6,
+		'throttling_mode': True, 'cooldown_message': None, 'calmed_message': None,
+	}
+	data = {'event_from_user': USER, 'bot': None}
+
+	async def save() -> None:
+		middleware = RateMiddleware(**options)
+		for _ in range(2):
+			assert await middleware(handler, None, data)  # type: ignore
+		assert middleware._cache.get_obj(USER.id).queue_depth() == 2  # noqa: PLR2004
+		assert middleware.snapshot(path) == 1
+
+	async def load() -> None:
+		middleware = RateMiddleware(**options)
+		assert middleware.restore(path) == 1
+		sem = middleware._cache.get_obj(USER.id)
+		# Slots taken before the restart are busy till they leak
+		assert sem.queue_depth() == 2  # noqa: PLR2004
+		assert sem.try_acquire()
+		assert not sem.try_acquire()
+
+		await asyncio.sleep(0.7)  # 3 leaks by 0.2 sec
+		assert sem.queue_depth() == 0
+		# Semaphore is reused till the item expiry, then the user is forgotten
+		await asyncio.sleep(0.5)
+		assert middleware._cache.get_obj(USER.id) is None
+
+	asyncio.run(save())
+	asyncio.run(load())